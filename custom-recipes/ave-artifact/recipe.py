@@ -0,0 +1,35 @@
+import dataiku
+from dataiku.customrecipe import get_recipe_config, get_input_names_for_role, get_output_names_for_role
+
+from generalized_linear_models.dku_glm import BaseGLM
+from glm_summary.artifact import save_ave_artifact
+from glm_summary.dku_utils import get_ave_data, get_summary_context, get_model_metrics
+from glm_summary.graph_utils import get_ave_grouped
+
+# define inputs
+model = dataiku.Model(get_input_names_for_role('input_model')[0])
+output_folder = dataiku.Folder(get_output_names_for_role('output_folder')[0])
+recipe_config = get_recipe_config()
+
+version_id = recipe_config.get("version_id")
+if not version_id:
+    active_versions = [version['versionId'] for version in model.list_versions() if version.get('active')]
+    if len(active_versions) == 0:
+        raise ValueError('The saved model has no active version, please select a version')
+    version_id = active_versions[0]
+
+# the same configuration as a webapp built on this model version
+model_config = {"modelId": model.get_id(), "versionId": version_id}
+
+context = get_summary_context(model_config)
+if not isinstance(context.predictor._clf, BaseGLM):
+    raise ValueError('GLM Summary is only available for GLMs')
+
+# computes the summary
+ave_data, target, weight, class_map = get_ave_data(context)
+metrics = get_model_metrics(context)
+context.release_data()
+ave_grouped = get_ave_grouped(ave_data, target, weight, class_map)
+
+# Write recipe outputs
+save_ave_artifact(output_folder.get_path(), context.full_model_id, ave_grouped, target, metrics)
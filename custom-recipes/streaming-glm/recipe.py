@@ -0,0 +1,125 @@
+import pickle
+import dataiku
+import numpy as np
+from dataiku.customrecipe import get_recipe_config, get_input_names_for_role, get_output_names_for_role
+from dku_config import DkuConfig
+
+from generalized_linear_models.dku_glm import RegressionGLM
+from generalized_linear_models.streaming import StreamingIRLS
+
+# define inputs
+input_dataset = dataiku.Dataset(get_input_names_for_role('input_dataset')[0])
+output_folder = dataiku.Folder(get_output_names_for_role('output_folder')[0])
+recipe_config = get_recipe_config()
+dataset_columns = [column['name'] for column in input_dataset.read_schema()]
+
+dku_config = DkuConfig()
+
+# define variables
+dku_config.add_param(
+    name="target_column",
+    value=recipe_config.get("target_column"),
+    checks=[{
+        "type": "in",
+        "op": dataset_columns
+    }],
+    required=True
+)
+
+for name in ["feature_columns", "offset_columns", "exposure_columns"]:
+    columns = recipe_config.get(name) or []
+    for i, column in enumerate(columns):
+        dku_config.add_param(
+            name=name + "_" + str(i),
+            value=column,
+            checks=[{
+                "type": "in",
+                "op": dataset_columns
+            }],
+            required=True
+        )
+    setattr(dku_config, name, columns)
+
+if len(dku_config.feature_columns) == 0:
+    raise ValueError('At least one feature column should be selected')
+
+dku_config.add_param(
+    name="weight_column",
+    value=recipe_config.get("weight_column"),
+    required=False
+)
+
+dku_config.add_param(
+    name="penalty",
+    value=recipe_config.get("penalty"),
+    checks=[{
+        "type": "sup_eq",
+        "op": 0
+    }],
+    required=True
+)
+
+for name in ["chunk_size", "max_iter"]:
+    dku_config.add_param(
+        name=name,
+        value=recipe_config.get(name),
+        checks=[{
+            "type": "sup_eq",
+            "op": 1
+        }],
+        required=True
+    )
+
+dku_config.add_param(
+    name="tol",
+    value=recipe_config.get("tol"),
+    checks=[{
+        "type": "sup",
+        "op": 0
+    }],
+    required=True
+)
+
+if dku_config.exposure_columns:
+    offset_mode = 'OFFSETS/EXPOSURES'
+elif dku_config.offset_columns:
+    offset_mode = 'OFFSETS'
+else:
+    offset_mode = 'BASIC'
+
+# the design matrix holds the features, then the offsets and exposures
+column_labels = dku_config.feature_columns + dku_config.offset_columns + dku_config.exposure_columns
+read_columns = column_labels + [dku_config.target_column]
+if dku_config.weight_column:
+    read_columns.append(dku_config.weight_column)
+
+family_params = {name: recipe_config[name] for name in
+                 ["family_name", "binomial_link", "gamma_link", "gaussian_link", "inverse_gaussian_link",
+                  "poisson_link", "negative_binomial_link", "tweedie_link", "alpha", "power", "var_power"]
+                 if recipe_config.get(name) is not None}
+
+regression_model = RegressionGLM(penalty=dku_config.penalty, l1_ratio=0, offset_mode=offset_mode,
+                                 offset_columns=dku_config.offset_columns,
+                                 exposure_columns=dku_config.exposure_columns, column_labels=column_labels,
+                                 **family_params)
+
+
+def get_chunks():
+    """
+    reads the training dataset chunk by chunk, it is read again at each iteration
+    """
+    for df in input_dataset.iter_dataframes(chunksize=dku_config.chunk_size, columns=read_columns):
+        if df[read_columns].isnull().values.any():
+            raise ValueError('The training dataset contains missing values, please fill or remove them beforehand')
+        sample_weight = df[dku_config.weight_column].to_numpy(dtype=np.float64) if dku_config.weight_column else None
+        yield (df[column_labels].to_numpy(dtype=np.float64), df[dku_config.target_column].to_numpy(dtype=np.float64),
+               sample_weight)
+
+
+# fits the model
+streaming_irls = StreamingIRLS(regression_model, max_iter=dku_config.max_iter, tol=dku_config.tol)
+streaming_irls.fit(get_chunks, len(column_labels))
+
+# Write recipe outputs
+with output_folder.get_writer('model.pkl') as writer:
+    writer.write(pickle.dumps(regression_model))
@@ -160,6 +160,37 @@ def check_params(params):
 
     dku_config.l1_ratio = [dku_config.get("l1_ratio" + str(i)) for i in range(len(params.get('l1_ratio')))]
 
+    dku_config.add_param(
+        name="dtype",
+        value=params.get('dtype', 'float64'),
+        checks=[{
+            "type": "in",
+            "op": ["float64", "float32"]
+        }],
+        required=True
+    )
+
+    if params.get('regularization_path'):
+        dku_config.add_param(
+            name="path_criterion",
+            value=params.get('path_criterion'),
+            checks=[{
+                "type": "in",
+                "op": ["aic", "bic"]
+            }],
+            required=True
+        )
+        for name in ['n_jobs', 'blas_threads']:
+            dku_config.add_param(
+                name=name,
+                value=params.get(name, 1),
+                checks=[{
+                    "type": "sup_eq",
+                    "op": 1
+                }],
+                required=True
+            )
+
     if params.get('family_name') == 'tweedie':
         dku_config.add_param(
             name="var_power",
@@ -8,8 +8,70 @@ from glum import PoissonDistribution
 from glum import NegativeBinomialDistribution
 
 import numpy as np
+import pandas as pd
+from scipy import sparse
 from sklearn.base import BaseEstimator, ClassifierMixin
 import generalized_linear_models.link as link
+from generalized_linear_models.parallel import fit_grid_parallel
+from generalized_linear_models.scorer import GLMScorer, SmallBatchScorer, SMALL_BATCH_MAX_ROWS, NEGATIVE_EXPOSURE_MESSAGE
+
+# the rounding of float32 gradients keeps them above the default gradient
+# tolerance of glum, 1e-4, which stalls the solver until max_iter
+FLOAT32_GRADIENT_TOL = 3e-4
+
+
+class ColumnPlan:
+    """
+    Indices of the offset, exposure and removed columns of the design matrix.
+    Built once at fit time and only read afterwards, so that scoring does not
+    depend on the previous calls
+    """
+    def __init__(self, offset_indices, exposure_indices, removed_indices, n_columns):
+        self.offset_indices = self.freeze(np.array(offset_indices, dtype=np.intp))
+        self.exposure_indices = self.freeze(np.array(exposure_indices, dtype=np.intp))
+        self.removed_indices = self.freeze(np.unique(np.array(removed_indices, dtype=np.intp)))
+        kept_mask = np.ones(n_columns, dtype=bool)
+        kept_mask[self.removed_indices] = False
+        self.kept_mask = self.freeze(kept_mask)
+        self.kept_indices = self.freeze(np.flatnonzero(kept_mask))
+        self.n_columns = n_columns
+
+    def __setstate__(self, state):
+        # pickling does not preserve the read-only flag
+        self.__dict__.update(state)
+        for value in state.values():
+            if isinstance(value, np.ndarray):
+                self.freeze(value)
+
+    @staticmethod
+    def freeze(array):
+        array.setflags(write=False)
+        return array
+
+    def get_columns(self, X, column_indices):
+        """
+        returns the dense values of the columns at the given indices
+        """
+        if len(column_indices) == 0:
+            return []
+        column_values = X[:, column_indices]
+        if sparse.issparse(column_values):
+            # offsets and exposures are a handful of columns, densifying them is cheap
+            column_values = column_values.toarray()
+        return column_values
+
+    def get_offsets_and_exposures(self, X):
+        return self.get_columns(X, self.offset_indices), self.get_columns(X, self.exposure_indices)
+
+    def remove_fixed_columns(self, X):
+        """
+        removes the offset, exposure and N/A columns, without densifying
+        sparse matrices
+        """
+        if len(self.removed_indices) == 0:
+            return X
+        return X[:, self.kept_indices]
+
 
 class BaseGLM(BaseEstimator, ClassifierMixin):
     """
@@ -19,7 +81,8 @@ class BaseGLM(BaseEstimator, ClassifierMixin):
     def __init__(self, family_name="gaussian", binomial_link="logit", gamma_link="inverse_power", gaussian_link="identity", inverse_gaussian_link="inverse_squared",
                  poisson_link="log", negative_binomial_link="log", tweedie_link="log", alpha=1, power=1, penalty=0.0, l1_ratio=0.5,
                  var_power=1, offset_mode="BASIC", training_dataset=None, offset_columns=None, exposure_columns=None,
-                 column_labels=None):
+                 column_labels=None, regularization_path=False, penalty_path=None, path_criterion="bic", n_jobs=1,
+                 blas_threads=1, compress_rows=False, dtype="float64"):
 
         self.family_name = family_name
         self.binomial_link = binomial_link
@@ -49,6 +112,26 @@ class BaseGLM(BaseEstimator, ClassifierMixin):
             if penalty < 0:
                 raise ValueError('penalty should be positive')
         self.penalty = penalty
+        for p in penalty_path or []:
+            if p < 0:
+                raise ValueError('penalty should be positive')
+        self.regularization_path = regularization_path
+        self.penalty_path = penalty_path
+        if path_criterion not in ['aic', 'bic']:
+            raise ValueError('path_criterion should be aic or bic, current value of ' + str(path_criterion) +
+                             ' unsupported')
+        self.path_criterion = path_criterion
+        if n_jobs < 1:
+            raise ValueError('n_jobs should be at least 1, current value of ' + str(n_jobs) + ' unsupported')
+        self.n_jobs = n_jobs
+        if blas_threads < 1:
+            raise ValueError('blas_threads should be at least 1, current value of ' + str(blas_threads) +
+                             ' unsupported')
+        self.blas_threads = blas_threads
+        self.compress_rows = compress_rows
+        if dtype not in ['float64', 'float32']:
+            raise ValueError('dtype should be float64 or float32, current value of ' + str(dtype) + ' unsupported')
+        self.dtype = dtype
         if family_name == 'tweedie':
             if not isinstance(var_power, (int, float)):
                 raise ValueError('var_power should be defined with a numeric value, current value of ' + str(
@@ -76,6 +159,10 @@ class BaseGLM(BaseEstimator, ClassifierMixin):
         self.column_labels = column_labels
         self.training_dataset = training_dataset
         self.removed_indices = None
+        self.column_plan = None
+        self.scorer = None
+        self.small_batch_scorer = None
+        self.path_solutions_ = None
         self.assign_family()
         self.assign_family_glum_class()
 
@@ -158,13 +245,13 @@ class BaseGLM(BaseEstimator, ClassifierMixin):
             return InverseGaussianDistribution()
 
         elif self.family_name == "negative_binomial":
-            return NegativeBinomialDistribution()
+            return NegativeBinomialDistribution(theta=self.alpha)
 
         elif self.family_name == "poisson":
             return PoissonDistribution()
 
         elif self.family_name == "tweedie":
-            return TweedieDistribution()
+            return TweedieDistribution(power=self.var_power)
         else:
             raise ValueError("Unsupported family")
     def assign_family_glum_class(self):
@@ -178,26 +265,55 @@ class BaseGLM(BaseEstimator, ClassifierMixin):
         self.link = self.get_link_function()
         self.family = self.get_family()
 
-    def get_columns(self, X, important_columns):
+    def get_column_indices(self, important_columns, label_indices):
         """
-        returns an array of values specified by column names provided
+        returns the indices of the column names provided
         by the user
         """
         if important_columns is None:
             important_columns = []
-        if len(important_columns) == 0:
-            column_values = []
-            column_indices = []
-        else:
-            for important_column in important_columns:
-                if important_column not in self.column_labels:
-                    raise ValueError(
-                        f'The column names provided: [{important_column}], is not present in the list of columns from the dataset. Please check that the column is selected in feature handing.')
+        for important_column in important_columns:
+            if important_column not in label_indices:
+                raise ValueError(
+                    f'The column names provided: [{important_column}], is not present in the list of columns from the dataset. Please check that the column is selected in feature handing.')
 
-            column_indices = [self.column_labels.index(important_column) for important_column in important_columns]
-            column_values = X[:, column_indices]
+        return [label_indices[important_column] for important_column in important_columns]
 
-        return column_values, column_indices
+    def build_column_plan(self, n_columns=None):
+        """
+        computes once the indices of the offset, exposure and N/A columns
+        from the column labels
+        """
+        if n_columns is None:
+            n_columns = len(self.column_labels)
+        label_indices = {label: index for index, label in enumerate(self.column_labels)}
+        offset_indices = []
+        exposure_indices = []
+        if self.offset_mode == 'OFFSETS':
+            offset_indices = self.get_column_indices(self.offset_columns, label_indices)
+            if len(offset_indices) == 0:
+                raise ValueError('OFFSETS mode is selected but no offset column is defined')
+        elif self.offset_mode == 'OFFSETS/EXPOSURES':
+            offset_indices = self.get_column_indices(self.offset_columns, label_indices)
+            exposure_indices = self.get_column_indices(self.exposure_columns, label_indices)
+            if len(offset_indices) == 0 and len(exposure_indices) == 0:
+                raise ValueError('OFFSETS/EXPOSURES mode is selected but neither offset nor exposure columns are '
+                                 'defined')
+
+        na_indices = [index for index, label in enumerate(self.column_labels) if self.is_NA_column(label)]
+        removed_indices = offset_indices + exposure_indices + na_indices
+
+        return ColumnPlan(offset_indices, exposure_indices, removed_indices, n_columns)
+
+    def get_column_plan(self):
+        """
+        returns the column plan computed at fit time, models trained
+        before the plan existed get a fresh one
+        """
+        column_plan = getattr(self, 'column_plan', None)
+        if column_plan is None:
+            column_plan = self.build_column_plan()
+        return column_plan
 
     def compute_aggregate_offset(self, offsets, exposures):
         offset_output = None
@@ -207,7 +323,7 @@ class BaseGLM(BaseEstimator, ClassifierMixin):
 
         if len(exposures) > 0:
             if (exposures <= 0).any():
-                raise ValueError('Exposure columns contains some negative values. Please make sure that the exposure column is not rescaled in feature handling.')
+                raise ValueError(NEGATIVE_EXPOSURE_MESSAGE)
             exposures = np.log(exposures)
             exposures = exposures.sum(axis=1)
             if offset_output is None:
@@ -222,19 +338,171 @@ class BaseGLM(BaseEstimator, ClassifierMixin):
         fits a GLM model
         """
         self.classes_ = list(set(y))
+        X = self.cast_design_matrix(X)
+        # glum expects the target and weights in the dtype of X
+        y = np.asarray(y, dtype=X.dtype)
+        if sample_weight is not None:
+            sample_weight = np.asarray(sample_weight, dtype=X.dtype)
+        self.column_plan = self.build_column_plan(X.shape[1])
+        self.offset_indices = self.column_plan.offset_indices.tolist()
+        self.exposure_indices = self.column_plan.exposure_indices.tolist()
+        self.removed_indices = self.column_plan.removed_indices.tolist()
         offsets, exposures = self.get_offsets_and_exposures(X)
 
         X = self.process_fixed_columns(X)
 
         offset_output = self.compute_aggregate_offset(offsets, exposures)
 
+        fit_data = (X, y, sample_weight, offset_output)
+        if self.compress_rows and not sparse.issparse(X):
+            fit_data = self.compress_duplicate_rows(X, y, sample_weight, offset_output)
+
         #  fits and stores glum glm
-        model = GeneralizedLinearRegressor(alpha=self.penalty, l1_ratio=self.l1_ratio, fit_intercept=True,
-                                            family=self.family, link=self.link)
-        self.fitted_model = model.fit(X, y, sample_weight=sample_weight, offset=offset_output)
-        
+        if self.regularization_path:
+            self.fitted_model = self.fit_path(*fit_data, criterion_data=(X, y, sample_weight, offset_output))
+        else:
+            X_fit, y_fit, sample_weight_fit, offset_fit = fit_data
+            model = GeneralizedLinearRegressor(alpha=self.penalty, l1_ratio=self.l1_ratio, fit_intercept=True,
+                                                family=self.family, link=self.link, **self.get_solver_params())
+            self.fitted_model = model.fit(X_fit, y_fit, sample_weight=sample_weight_fit, offset=offset_fit)
+
         self.compute_coefs(prediction_is_classification)
-        
+
+    def cast_design_matrix(self, X):
+        """
+        converts X to the dtype of the estimator, offsets and exposures
+        computed from its columns then keep the same dtype
+        """
+        if X.dtype == self.get_dtype():
+            return X
+        return X.astype(self.get_dtype())
+
+    def get_dtype(self):
+        # models trained before the dtype option existed are float64
+        return np.dtype(getattr(self, 'dtype', 'float64'))
+
+    def get_solver_params(self):
+        """
+        returns the glum solver parameters depending on the dtype
+        """
+        if self.get_dtype() == np.float32:
+            return {'gradient_tol': FLOAT32_GRADIENT_TOL}
+        return {}
+
+    def compress_duplicate_rows(self, X, y, sample_weight, offset):
+        """
+        merges the rows sharing the same features and offset into one row
+        weighted by their summed weights, whose response is their weighted
+        mean response: the deviance of every family only depends on the
+        response linearly, so the fitted coefficients are unchanged
+        """
+        y = np.asarray(y, dtype=np.float64)
+        sample_weight = np.ones(len(y)) if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)
+        keys = [X[:, index] for index in range(X.shape[1])] + ([] if offset is None else [offset])
+        # the hashed codes of the columns are combined in mixed radix, and hashed
+        # again only when the next combination could overflow
+        row_groups = np.zeros(len(y), dtype=np.int64)
+        n_groups = 1
+        for column in keys:
+            # the bit patterns of the floats hash faster than the floats
+            codes, uniques = pd.factorize(np.ascontiguousarray(column, dtype=np.float64).view(np.int64))
+            if n_groups * len(uniques) >= np.iinfo(np.int64).max:
+                row_groups, group_uniques = pd.factorize(row_groups)
+                n_groups = len(group_uniques)
+            row_groups = row_groups * len(uniques) + codes
+            n_groups *= len(uniques)
+        row_groups, group_uniques = pd.factorize(row_groups)
+        # the rows of a group are identical, any of them represents it
+        group_rows = np.empty(len(group_uniques), dtype=np.int64)
+        group_rows[row_groups] = np.arange(len(y))
+        group_weights = np.bincount(row_groups, weights=sample_weight)
+        group_responses = np.bincount(row_groups, weights=sample_weight * y)
+        # groups with a null total weight do not contribute to the fit
+        kept_groups = group_weights > 0
+        group_responses = group_responses[kept_groups] / group_weights[kept_groups]
+        group_rows = group_rows[kept_groups]
+        group_offset = None if offset is None else offset[group_rows]
+        # glum expects the target and weights in the dtype of X
+        return (X[group_rows], group_responses.astype(X.dtype), group_weights[kept_groups].astype(X.dtype),
+                group_offset)
+
+    def get_path_penalties(self):
+        """
+        returns the penalties of the regularization path in descending order,
+        the penalty grid replaces the single grid point when it is defined
+        """
+        penalties = self.penalty_path if self.penalty_path else self.penalty
+        if not isinstance(penalties, list):
+            penalties = [penalties]
+        return sorted(set(penalties), reverse=True)
+
+    def compute_information_criterion(self, X, y, sample_weight, offset, coef, intercept):
+        """
+        computes the AIC or BIC of a solution, taking the offsets into
+        account and counting the nonzero coefficients as degrees of freedom,
+        on the rows before any compression
+        """
+        mu = GLMScorer(coef, intercept, self.link, dtype=self.get_dtype()).predict(X, offset)
+        log_likelihood = self.family_glum_class.log_likelihood(y, mu, sample_weight=sample_weight)
+        n_params = np.sum(np.abs(coef) > np.finfo(coef.dtype).eps) + 1
+        if self.path_criterion == 'aic':
+            return -2 * log_likelihood + 2 * n_params
+        return -2 * log_likelihood + np.log(X.shape[0]) * n_params
+
+    def fit_path_segments(self, X, y, sample_weight, offset, l1_ratios, penalties):
+        """
+        fits the penalties in descending order for each l1_ratio, in a pool
+        of n_jobs processes when more than one job is requested, and returns
+        the (l1_ratio, penalties, fitted model) of every fitted segment
+        """
+        if self.n_jobs > 1:
+            return fit_grid_parallel(X, y, sample_weight, offset, l1_ratios, penalties, self.family, self.link,
+                                     self.n_jobs, self.blas_threads, self.get_solver_params())
+        fits = []
+        for l1_ratio in l1_ratios:
+            model = GeneralizedLinearRegressor(alpha=penalties, alpha_search=True, l1_ratio=l1_ratio,
+                                               fit_intercept=True, family=self.family, link=self.link,
+                                               **self.get_solver_params())
+            model.fit(X, y, sample_weight=sample_weight, offset=offset)
+            fits.append((l1_ratio, penalties, model))
+        return fits
+
+    def fit_path(self, X, y, sample_weight, offset, criterion_data=None):
+        """
+        fits the penalties in descending order for each l1_ratio, glum starting
+        each fit from the coefficients of the previous one, records every
+        solution and returns the model set to the lowest information criterion,
+        computed on criterion_data when the fitted rows are compressed
+        """
+        if criterion_data is None:
+            criterion_data = (X, y, sample_weight, offset)
+        l1_ratios = self.l1_ratio if isinstance(self.l1_ratio, list) else [self.l1_ratio]
+        penalties = self.get_path_penalties()
+        self.path_solutions_ = []
+        best_model = None
+        best_solution = None
+        for l1_ratio, segment_penalties, model in self.fit_path_segments(X, y, sample_weight, offset, l1_ratios,
+                                                                         penalties):
+            for index, penalty in enumerate(segment_penalties):
+                coef = np.array(model.coef_path_[index])
+                intercept = float(model.intercept_path_[index])
+                solution = {
+                    'penalty': penalty,
+                    'l1_ratio': l1_ratio,
+                    'coef': coef,
+                    'intercept': intercept,
+                    self.path_criterion: self.compute_information_criterion(*criterion_data, coef, intercept)
+                }
+                self.path_solutions_.append(solution)
+                if best_solution is None or solution[self.path_criterion] < best_solution[self.path_criterion]:
+                    best_model = model
+                    best_solution = solution
+
+        # glum predicts with coef_ and intercept_, which hold the last solution of the path
+        best_model.coef_ = best_solution['coef']
+        best_model.intercept_ = best_solution['intercept']
+        return best_model
+
     def compute_coefs(self, prediction_is_classification):
         """
         adds attributes for explainability
@@ -249,13 +517,47 @@ class BaseGLM(BaseEstimator, ClassifierMixin):
         # the column labels include offsets and exposures
         # so we need to insert 0 coefs for these columns to ensure consistency
         if self.removed_indices is not None:
-            self.removed_indices = list(set(self.removed_indices))
             # 0 are inserted one by one in ascending order
             # because inserting a value at index = len + 1 fails
             for index in sorted(self.removed_indices):
                 self.coef_ = np.insert(self.coef_, index, 0)
         if prediction_is_classification:
             self.coef_ = np.array([self.coef_])
+        self.scorer = self.build_scorer()
+        self.small_batch_scorer = self.build_small_batch_scorer()
+
+    def build_scorer(self):
+        """
+        builds the NumPy scorer from the coefficients fitted by glum
+        """
+        return GLMScorer(self.fitted_model.coef_, self.fitted_model.intercept_, self.link, dtype=self.get_dtype())
+
+    def build_small_batch_scorer(self):
+        """
+        builds the scorer of small batches, whose coefficients are
+        laid out on all the columns of the design matrix
+        """
+        column_plan = self.get_column_plan()
+        coef = np.zeros(column_plan.n_columns)
+        coef[column_plan.kept_indices] = self.fitted_model.coef_
+        return SmallBatchScorer(coef, self.fitted_model.intercept_, self.link,
+                                column_plan.offset_indices, column_plan.exposure_indices, dtype=self.get_dtype())
+
+    def get_scorer(self):
+        """
+        returns the scorer built at fit time, models trained
+        before the scorer existed get a fresh one
+        """
+        scorer = getattr(self, 'scorer', None)
+        if scorer is None:
+            scorer = self.build_scorer()
+        return scorer
+
+    def get_small_batch_scorer(self):
+        small_batch_scorer = getattr(self, 'small_batch_scorer', None)
+        if small_batch_scorer is None:
+            small_batch_scorer = self.build_small_batch_scorer()
+        return small_batch_scorer
 
     def set_column_labels(self, column_labels):
         # in order to preserve the attribute `column_labels` when cloning
@@ -270,52 +572,76 @@ class BaseGLM(BaseEstimator, ClassifierMixin):
         return label.endswith('N/A')
 
     def process_fixed_columns(self, X):
-        self.removed_indices = None
-        if self.offset_indices is not None:
-            self.removed_indices = self.offset_indices
-        if self.exposure_indices is not None:
-            if self.removed_indices is not None:
-                self.removed_indices.extend(self.exposure_indices)
-            else:
-                self.removed_indices = self.exposure_indices
-        
-        for label in self.column_labels:
-            if self.is_NA_column(label):
-                _, [column_index] = self.get_columns(X, [label])
-                self.removed_indices.append(column_index)
-
-        if self.removed_indices is not None:
-            self.removed_indices = list(set(self.removed_indices))
-
-            X = np.delete(X, self.removed_indices, axis=1)
+        """
+        removes the offset, exposure and N/A columns
+        """
+        return self.get_column_plan().remove_fixed_columns(X)
 
-        return X
-    
     def get_offsets_and_exposures(self, X):
-        offsets = []
-        exposures = []
-        if self.offset_mode == 'OFFSETS':
-            offsets, self.offset_indices = self.get_columns(X, self.offset_columns)
-            if len(offsets) == 0:
-                raise ValueError('OFFSETS mode is selected but no offset column is defined')
-        elif self.offset_mode == 'OFFSETS/EXPOSURES':
-            offsets, self.offset_indices = self.get_columns(X, self.offset_columns)
-            exposures, self.exposure_indices = self.get_columns(X, self.exposure_columns)
-            if len(offsets) == 0 and len(exposures) == 0:
-                raise ValueError('OFFSETS/EXPOSURES mode is selected but neither offset nor exposure columns are '
-                                 'defined')
-
-        return offsets, exposures
+        return self.get_column_plan().get_offsets_and_exposures(X)
 
     def predict_target(self, X):
-        offsets, exposures = self.get_offsets_and_exposures(X)
-        X = self.process_fixed_columns(X)
+        """
+        scores X without modifying the estimator, so that a fitted
+        instance can be shared by concurrent scoring threads
+        """
+        if not sparse.issparse(X) and X.shape[0] <= SMALL_BATCH_MAX_ROWS:
+            return self.get_small_batch_scorer().predict(X)
+
+        # casts and removes the fixed columns one chunk of rows at a time,
+        # so that no copy of the whole of X is made in either dtype
+        if sparse.issparse(X):
+            X = sparse.csr_matrix(X)
+        column_plan = self.get_column_plan()
+        scorer = self.get_scorer()
+        y_pred = np.empty(X.shape[0], dtype=self.get_dtype())
+        for start in range(0, X.shape[0], scorer.chunk_size):
+            rows = slice(start, start + scorer.chunk_size)
+            X_chunk = self.cast_design_matrix(X[rows])
+            offsets, exposures = column_plan.get_offsets_and_exposures(X_chunk)
+            offset_output = self.compute_aggregate_offset(offsets, exposures)
+            scorer.predict(column_plan.remove_fixed_columns(X_chunk), offset_output, out=y_pred[rows])
+        return y_pred
 
-        offset_output = self.compute_aggregate_offset(offsets, exposures)
+    def predict_base_targets(self, X, X_base, column_groups):
+        """
+        predicts, for each group of columns of X, the target when all the
+        other columns are at their values in the single row X_base, in one
+        matrix product instead of one scoring of X per group
+        """
+        column_plan = self.get_column_plan()
+        coef = np.ravel(self.coef_)
+        X_base = X_base.toarray() if sparse.issparse(X_base) else np.asarray(X_base, dtype=np.float64)
+        X_base = X_base.reshape(1, -1)
+        group_coef = np.zeros((len(coef), len(column_groups)))
+        column_group_indices = dict()
+        for group_index, column_indices in enumerate(column_groups):
+            group_coef[column_indices, group_index] = coef[column_indices]
+            column_group_indices.update({column_index: group_index for column_index in column_indices})
+
+        # the linear predictor of the base row, then the contribution of each group moved from the base row
+        base_offsets, base_exposures = column_plan.get_offsets_and_exposures(X_base)
+        base_offset = self.compute_aggregate_offset(base_offsets, base_exposures)
+        base_eta = float(X_base[0] @ coef) + float(np.ravel(self.intercept_)[0])
+        if base_offset is not None:
+            base_eta += float(base_offset[0])
+        eta = np.asarray(X @ group_coef) - X_base @ group_coef + base_eta
+
+        offsets, exposures = column_plan.get_offsets_and_exposures(X)
+        for position, column_index in enumerate(column_plan.offset_indices):
+            if column_index in column_group_indices:
+                eta[:, column_group_indices[column_index]] += offsets[:, position] - base_offsets[0, position]
+        if len(column_plan.exposure_indices) > 0 and (exposures <= 0).any():
+            raise ValueError(NEGATIVE_EXPOSURE_MESSAGE)
+        for position, column_index in enumerate(column_plan.exposure_indices):
+            if column_index in column_group_indices:
+                eta[:, column_group_indices[column_index]] += (np.log(exposures[:, position]) -
+                                                               np.log(base_exposures[0, position]))
+
+        eta = np.ascontiguousarray(eta)
+        self.get_scorer().inverse_link(eta.reshape(-1))
+        return eta
 
-        # makes predictions and converts to DSS accepted format
-        y_pred = np.array(self.fitted_model.predict(X, offset=offset_output))
-        return y_pred
 
 
 class BinaryClassificationGLM(BaseGLM):
@@ -3,11 +3,14 @@ Defines the link functions to be used with GLM and GEE families.
 """
 
 import numpy as np
+import scipy.special
 import scipy.stats
 import warnings
 from glum import Link
+from generalized_linear_models import link_kernels
 
 FLOAT_EPS = np.finfo(float).eps
+SQRT_2PI = np.sqrt(2. * np.pi)
 
 
 def _link_deprecation_warning(old, new):
@@ -19,6 +22,58 @@ def _link_deprecation_warning(old, new):
     # raise
 
 
+def _get_out(x, out=None):
+    """
+    Returns out, or a new floating point array of the shape of x, in which
+    the link methods chain their operations instead of allocating a
+    temporary array per operation
+    """
+    if out is None:
+        x = np.asarray(x)
+        out = np.empty(x.shape, dtype=np.result_type(x, 1.))
+    return out
+
+
+def _unwrap(out):
+    """
+    Returns 0-d results as scalars, as NumPy ufuncs do
+    """
+    return out if out.ndim else out[()]
+
+
+def _copy_to(out, values):
+    out[...] = values
+    return _unwrap(out)
+
+
+def _fill(out, value):
+    out.fill(value)
+    return _unwrap(out)
+
+
+def _run_kernel(name, x, out, *params):
+    """
+    Returns the result of the compiled kernel of name when link_kernels
+    has one for x, else None. The parameters are cast to the dtype of x
+    so that float32 arrays are computed in float32
+    """
+    x = np.asarray(x)
+    dtype = np.result_type(x, 1.)
+    return link_kernels.run_kernel(name, x, [dtype.type(param) for param in params], out)
+
+
+def _cauchy_ppf(p, out=None):
+    """
+    Inverse of the standard Cauchy CDF, -1 / tan(pi * p) computed on p - 1
+    above 0.5 so that the tails keep their precision, as scipy.stats.cauchy
+    """
+    out = _get_out(p, out)
+    np.copyto(out, p)
+    np.subtract(out, 1., out=out, where=out >= 0.5)
+    out *= np.pi
+    np.tan(out, out=out)
+    return np.divide(-1., out, out=out)
+
 
 
 class Logit(Link):
@@ -34,7 +89,7 @@ class Logit(Link):
     logit = Logit()
     """
 
-    def _clean(self, p):
+    def _clean(self, p, out=None):
         """
         Clip logistic values to range (eps, 1-eps)
 
@@ -42,15 +97,20 @@ class Logit(Link):
         ----------
         p : array_like
             Probabilities
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
         pclip : ndarray
             Clipped probabilities
         """
-        return np.clip(p, FLOAT_EPS, 1. - FLOAT_EPS)
+        out = _get_out(p, out)
+        np.clip(p, FLOAT_EPS, 1. - FLOAT_EPS, out=out)
+        return out
 
-    def link(self, p):
+    def link(self, p, out=None):
         """
         The logit transform
 
@@ -58,6 +118,9 @@ class Logit(Link):
         ----------
         p : array_like
             Probabilities
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
@@ -68,12 +131,14 @@ class Logit(Link):
         -----
         g(p) = log(p / (1 - p))
         """
-        p = self._clean(p)
-        return np.log(p / (1. - p))
+        p = self._clean(p, out)
+        t = 1. - p
+        np.divide(p, t, out=p)
+        return _unwrap(np.log(p, out=p))
 
 
 
-    def inverse(self, z):
+    def inverse(self, z, out=None):
         """
         Inverse of the logit transform
 
@@ -81,6 +146,9 @@ class Logit(Link):
         ----------
         z : array_like
             The value of the logit transform at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
@@ -91,14 +159,15 @@ class Logit(Link):
         -----
         g^(-1)(z) = exp(z)/(1+exp(z))
         """
-        z = np.asarray(z)
-        t = np.exp(-z)
-        return 1. / (1. + t)
+        out = np.negative(z, out=_get_out(z, out))
+        np.exp(out, out=out)
+        out += 1.
+        return _unwrap(np.divide(1., out, out=out))
 
 
 
 
-    def derivative(self, p):
+    def derivative(self, p, out=None):
         """
         Derivative of the logit transform
 
@@ -106,6 +175,9 @@ class Logit(Link):
         ----------
         p : array_like
             Probabilities
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
@@ -119,13 +191,15 @@ class Logit(Link):
         Alias for `Logit`:
         logit = Logit()
         """
-        p = self._clean(p)
-        return 1. / (p * (1 - p))
+        p = self._clean(p, out)
+        t = 1. - p
+        p *= t
+        return _unwrap(np.divide(1., p, out=p))
 
 
 
 
-    def inverse_derivative(self, z):
+    def inverse_derivative(self, z, out=None):
         """
         Derivative of the inverse of the logit transform
 
@@ -133,19 +207,53 @@ class Logit(Link):
         ----------
         z : array_like
             `z` is usually the linear predictor for a GLM or GEE model.
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
         g'^(-1)(z) : ndarray
             The value of the derivative of the inverse of the logit function
         """
-        t = np.exp(z)
-        return t / (1 + t) ** 2
+        out = np.exp(z, out=_get_out(z, out))
+        t = np.add(out, 1., out=_get_out(out))
+        np.square(t, out=t)
+        return _unwrap(np.divide(out, t, out=out))
+
+
+
+
+    def inverse_derivative2(self, z, out=None):
+        """
+        Second derivative of the inverse of the logit transform
+
+        Parameters
+        ----------
+        z : array_like
+            `z` is usually the linear predictor for a GLM or GEE model.
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
+
+        Returns
+        -------
+        g^(-1)''(z) : ndarray
+            The value of the second derivative of the inverse of the logit
+            function
+        """
+        p = _get_out(z, out)
+        self.inverse(z, out=p)
+        t = 1. - p
+        t *= p
+        p *= -2.
+        p += 1.
+        return _unwrap(np.multiply(p, t, out=p))
 
 
 
 
-    def derivative2(self, p):
+    def derivative2(self, p, out=None):
         """
         Second derivative of the logit function.
 
@@ -153,14 +261,54 @@ class Logit(Link):
         ----------
         p : array_like
             probabilities
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
         g''(z) : ndarray
             The value of the second derivative of the logit function
         """
-        v = p * (1 - p)
-        return (2 * p - 1) / v ** 2
+        p = np.asarray(p)
+        v = np.subtract(1., p, out=_get_out(p))
+        v *= p
+        np.square(v, out=v)
+        out = np.multiply(p, 2., out=_get_out(p, out))
+        out -= 1.
+        return _unwrap(np.divide(out, v, out=out))
+
+
+
+
+    def inverse_and_derivative(self, z, out=None, derivative_out=None):
+        """
+        Inverse of the link function and its derivative
+
+        Parameters
+        ----------
+        z : array_like
+            `z` is usually the linear predictor for a GLM or GEE model.
+        out : ndarray, optional
+            Array of the shape of `z` the inverse is written to, not
+            sharing memory with `z`
+        derivative_out : ndarray, optional
+            Array of the shape of `z` the derivative is written to, not
+            sharing memory with `z`
+
+        Returns
+        -------
+        p : ndarray
+            The value of the inverse of the link function at `z`
+        g^(-1)'(z) : ndarray
+            The value of the derivative of the inverse of the link function
+
+        Notes
+        -----
+        Calls inverse and inverse_derivative, links sharing work
+        between the two override it
+        """
+        return self.inverse(z, out=out), self.inverse_derivative(z, out=derivative_out)
 
 
 
@@ -187,7 +335,14 @@ class Power(Link):
     def __init__(self, power=1.):
         self.power = power
 
-    def link(self, p):
+    def _run_kernel(self, method, x, out):
+        # link_kernels compiles the inverse and inverse squared links only
+        name = link_kernels.POWER_KERNELS.get(self.power)
+        if name is None:
+            return None
+        return _run_kernel(name + '_' + method, x, out)
+
+    def link(self, p, out=None):
         """
         Power transform link function
 
@@ -195,6 +350,9 @@ class Power(Link):
         ----------
         p : array_like
             Mean parameters
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
@@ -206,13 +364,16 @@ class Power(Link):
         g(p) = x**self.power
         """
         if self.power == 1:
-            return p
+            return p if out is None else _copy_to(out, p)
         else:
-            return np.power(p, self.power)
+            result = self._run_kernel('link', p, out)
+            if result is not None:
+                return result
+            return _unwrap(np.power(p, self.power, out=_get_out(p, out)))
 
 
 
-    def inverse(self, z):
+    def inverse(self, z, out=None):
         """
         Inverse of the power transform link function
 
@@ -220,6 +381,9 @@ class Power(Link):
         ----------
         `z` : array_like
             Value of the transformed mean parameters at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
@@ -231,14 +395,17 @@ class Power(Link):
         g^(-1)(z`) = `z`**(1/`power`)
         """
         if self.power == 1:
-            return z
+            return z if out is None else _copy_to(out, z)
         else:
-            return np.power(z, 1. / self.power)
+            result = self._run_kernel('inverse', z, out)
+            if result is not None:
+                return result
+            return _unwrap(np.power(z, 1. / self.power, out=_get_out(z, out)))
 
 
 
 
-    def derivative(self, p):
+    def derivative(self, p, out=None):
         """
         Derivative of the power transform
 
@@ -246,6 +413,9 @@ class Power(Link):
         ----------
         p : array_like
             Mean parameters
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
@@ -257,14 +427,19 @@ class Power(Link):
         g'(`p`) = `power` * `p`**(`power` - 1)
         """
         if self.power == 1:
-            return np.ones_like(p)
+            return _fill(_get_out(p, out), 1.)
         else:
-            return self.power * np.power(p, self.power - 1)
+            result = self._run_kernel('derivative', p, out)
+            if result is not None:
+                return result
+            out = np.power(p, self.power - 1, out=_get_out(p, out))
+            out *= self.power
+            return _unwrap(out)
 
 
 
 
-    def derivative2(self, p):
+    def derivative2(self, p, out=None):
         """
         Second derivative of the power transform
 
@@ -272,6 +447,9 @@ class Power(Link):
         ----------
         p : array_like
             Mean parameters
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
@@ -283,14 +461,16 @@ class Power(Link):
         g''(`p`) = `power` * (`power` - 1) * `p`**(`power` - 2)
         """
         if self.power == 1:
-            return np.zeros_like(p)
+            return _fill(_get_out(p, out), 0.)
         else:
-            return self.power * (self.power - 1) * np.power(p, self.power - 2)
+            out = np.power(p, self.power - 2, out=_get_out(p, out))
+            out *= self.power * (self.power - 1)
+            return _unwrap(out)
 
 
 
 
-    def inverse_derivative(self, z):
+    def inverse_derivative(self, z, out=None):
         """
         Derivative of the inverse of the power transform
 
@@ -298,6 +478,9 @@ class Power(Link):
         ----------
         z : array_like
             `z` is usually the linear predictor for a GLM or GEE model.
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
@@ -306,14 +489,19 @@ class Power(Link):
         function
         """
         if self.power == 1:
-            return np.ones_like(z)
+            return _fill(_get_out(z, out), 1.)
         else:
-            return np.power(z, (1 - self.power) / self.power) / self.power
+            result = self._run_kernel('inverse_derivative', z, out)
+            if result is not None:
+                return result
+            out = np.power(z, (1 - self.power) / self.power, out=_get_out(z, out))
+            out /= self.power
+            return _unwrap(out)
 
 
 
 
-    def inverse_derivative2(self, z):
+    def inverse_derivative2(self, z, out=None):
         """
         Second derivative of the inverse of the power transform
 
@@ -321,6 +509,9 @@ class Power(Link):
         ----------
         z : array_like
             `z` is usually the linear predictor for a GLM or GEE model.
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
@@ -329,10 +520,53 @@ class Power(Link):
         function
         """
         if self.power == 1:
-            return np.zeros_like(z)
+            return _fill(_get_out(z, out), 0.)
         else:
-            return ((1 - self.power) *
-                    np.power(z, (1 - 2*self.power)/self.power) / self.power**2)
+            out = np.power(z, (1 - 2*self.power)/self.power, out=_get_out(z, out))
+            out *= (1 - self.power) / self.power**2
+            return _unwrap(out)
+
+
+
+
+    def inverse_and_derivative(self, z, out=None, derivative_out=None):
+        """
+        Inverse of the power transform and its derivative
+
+        Parameters
+        ----------
+        z : array_like
+            `z` is usually the linear predictor for a GLM or GEE model.
+        out : ndarray, optional
+            Array of the shape of `z` the inverse is written to, not
+            sharing memory with `z`
+        derivative_out : ndarray, optional
+            Array of the shape of `z` the derivative is written to, not
+            sharing memory with `z`
+
+        Returns
+        -------
+        p : ndarray
+            The value of the inverse of the link function at `z`
+        g^(-1)'(z) : ndarray
+            The value of the derivative of the inverse of the link function
+
+        Notes
+        -----
+        For negative powers, g^(-1)'(z) = g^(-1)(z) / (`power` * `z`) saves
+        the second power. It is undefined at `z` = 0 for positive powers,
+        whose derivative is computed separately
+        """
+        if self.power == 1:
+            return (z if out is None else _copy_to(out, z)), _fill(_get_out(z, derivative_out), 1.)
+        mu = self._run_kernel('inverse', z, out)
+        if mu is not None:
+            return mu, self.inverse_derivative(z, out=derivative_out)
+        mu = np.power(z, 1. / self.power, out=_get_out(z, out))
+        if self.power > 0:
+            return _unwrap(mu), self.inverse_derivative(z, out=derivative_out)
+        d = np.multiply(z, self.power, out=_get_out(z, derivative_out))
+        return _unwrap(mu), _unwrap(np.divide(mu, d, out=d))
 
 
 
@@ -417,10 +651,12 @@ class Log(Link):
     machine epsilon so that p is in (0,1). log is an alias of Log.
     """
 
-    def _clean(self, x):
-        return np.clip(x, FLOAT_EPS, np.inf)
+    def _clean(self, x, out=None):
+        out = _get_out(x, out)
+        np.clip(x, FLOAT_EPS, np.inf, out=out)
+        return out
 
-    def link(self, p, **extra):
+    def link(self, p, out=None, **extra):
         """
         Log transform link function
 
@@ -428,6 +664,9 @@ class Log(Link):
         ----------
         x : array_like
             Mean parameters
+        out : ndarray, optional
+            Array of the shape of `x` the result is written to,
+            which can be `x` itself
 
         Returns
         -------
@@ -438,12 +677,12 @@ class Log(Link):
         -----
         g(p) = log(p)
         """
-        x = self._clean(p)
-        return np.log(x)
+        x = self._clean(p, out)
+        return _unwrap(np.log(x, out=x))
 
 
 
-    def inverse(self, z):
+    def inverse(self, z, out=None):
         """
         Inverse of log transform link function
 
@@ -451,6 +690,9 @@ class Log(Link):
         ----------
         z : ndarray
             The inverse of the link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
@@ -461,12 +703,12 @@ class Log(Link):
         -----
         g^{-1}(z) = exp(z)
         """
-        return np.exp(z)
+        return _unwrap(np.exp(z, out=_get_out(z, out)))
 
 
 
 
-    def derivative(self, p):
+    def derivative(self, p, out=None):
         """
         Derivative of log transform link function
 
@@ -474,6 +716,9 @@ class Log(Link):
         ----------
         p : array_like
             Mean parameters
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
@@ -484,13 +729,13 @@ class Log(Link):
         -----
         g'(x) = 1/x
         """
-        p = self._clean(p)
-        return 1. / p
+        p = self._clean(p, out)
+        return _unwrap(np.divide(1., p, out=p))
 
 
 
 
-    def derivative2(self, p):
+    def derivative2(self, p, out=None):
         """
         Second derivative of the log transform link function
 
@@ -498,6 +743,9 @@ class Log(Link):
         ----------
         p : array_like
             Mean parameters
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
@@ -508,13 +756,14 @@ class Log(Link):
         -----
         g''(x) = -1/x^2
         """
-        p = self._clean(p)
-        return -1. / p ** 2
+        p = self._clean(p, out)
+        np.square(p, out=p)
+        return _unwrap(np.divide(-1., p, out=p))
 
 
 
 
-    def inverse_derivative(self, z):
+    def inverse_derivative(self, z, out=None):
         """
         Derivative of the inverse of the log transform link function
 
@@ -522,6 +771,9 @@ class Log(Link):
         ----------
         z : ndarray
             The inverse of the link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
@@ -529,7 +781,62 @@ class Log(Link):
             The value of the derivative of the inverse of the log function,
             the exponential function
         """
-        return np.exp(z)
+        return _unwrap(np.exp(z, out=_get_out(z, out)))
+
+
+
+
+    def inverse_derivative2(self, z, out=None):
+        """
+        Second derivative of the inverse of the log transform link function
+
+        Parameters
+        ----------
+        z : ndarray
+            The inverse of the link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
+
+        Returns
+        -------
+        g^(-1)''(z) : ndarray
+            The value of the second derivative of the inverse of the log
+            function, the exponential function
+        """
+        return _unwrap(np.exp(z, out=_get_out(z, out)))
+
+
+
+
+    def inverse_and_derivative(self, z, out=None, derivative_out=None):
+        """
+        Inverse of the log transform and its derivative
+
+        Parameters
+        ----------
+        z : array_like
+            `z` is usually the linear predictor for a GLM or GEE model.
+        out : ndarray, optional
+            Array of the shape of `z` the inverse is written to, not
+            sharing memory with `z`
+        derivative_out : ndarray, optional
+            Array of the shape of `z` the derivative is written to, not
+            sharing memory with `z`
+
+        Returns
+        -------
+        p : ndarray
+            The value of the inverse of the link function at `z`
+        g^(-1)'(z) : ndarray
+            The value of the derivative of the inverse of the link function
+
+        Notes
+        -----
+        g^(-1)(z) = g^(-1)'(z) = exp(z), computed once
+        """
+        mu = np.exp(z, out=_get_out(z, out))
+        return _unwrap(mu), _copy_to(_get_out(z, derivative_out), mu)
 
 
 
@@ -545,10 +852,12 @@ class LogC(Link):
     machine epsilon so that p is in (0,1). logc is an alias of LogC.
     """
 
-    def _clean(self, x):
-        return np.clip(x, FLOAT_EPS, 1. - FLOAT_EPS)
+    def _clean(self, x, out=None):
+        out = _get_out(x, out)
+        np.clip(x, FLOAT_EPS, 1. - FLOAT_EPS, out=out)
+        return out
 
-    def link(self, p, **extra):
+    def link(self, p, out=None, **extra):
         """
         Log-complement transform link function
 
@@ -556,6 +865,9 @@ class LogC(Link):
         ----------
         x : array_like
             Mean parameters
+        out : ndarray, optional
+            Array of the shape of `x` the result is written to,
+            which can be `x` itself
 
         Returns
         -------
@@ -566,12 +878,13 @@ class LogC(Link):
         -----
         g(p) = log(1-p)
         """
-        x = self._clean(p)
-        return np.log(1 - x)
+        x = self._clean(p, out)
+        np.subtract(1, x, out=x)
+        return _unwrap(np.log(x, out=x))
 
 
 
-    def inverse(self, z):
+    def inverse(self, z, out=None):
         """
         Inverse of log-complement transform link function
 
@@ -579,6 +892,9 @@ class LogC(Link):
         ----------
         z : ndarray
             The inverse of the link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
@@ -589,12 +905,13 @@ class LogC(Link):
         -----
         g^{-1}(z) = 1 - exp(z)
         """
-        return 1 - np.exp(z)
+        out = np.exp(z, out=_get_out(z, out))
+        return _unwrap(np.subtract(1, out, out=out))
 
 
 
 
-    def derivative(self, p):
+    def derivative(self, p, out=None):
         """
         Derivative of log-complement transform link function
 
@@ -602,6 +919,9 @@ class LogC(Link):
         ----------
         p : array_like
             Mean parameters
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
@@ -612,13 +932,14 @@ class LogC(Link):
         -----
         g'(x) = -1/(1 - x)
         """
-        p = self._clean(p)
-        return -1. / (1. - p)
+        p = self._clean(p, out)
+        np.subtract(1., p, out=p)
+        return _unwrap(np.divide(-1., p, out=p))
 
 
 
 
-    def derivative2(self, p):
+    def derivative2(self, p, out=None):
         """
         Second derivative of the log-complement transform link function
 
@@ -626,6 +947,9 @@ class LogC(Link):
         ----------
         p : array_like
             Mean parameters
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
@@ -636,13 +960,15 @@ class LogC(Link):
         -----
         g''(x) = -(-1/(1 - x))^2
         """
-        p = self._clean(p)
-        return -1 * np.power(-1. / (1. - p), 2)
+        p = self._clean(p, out)
+        np.subtract(1., p, out=p)
+        np.square(p, out=p)
+        return _unwrap(np.divide(-1., p, out=p))
 
 
 
 
-    def inverse_derivative(self, z):
+    def inverse_derivative(self, z, out=None):
         """
         Derivative of the inverse of the log-complement transform link
         function
@@ -651,6 +977,9 @@ class LogC(Link):
         ----------
         z : ndarray
             The inverse of the link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
@@ -658,12 +987,13 @@ class LogC(Link):
             The value of the derivative of the inverse of the log-complement
             function.
         """
-        return -np.exp(z)
+        out = np.exp(z, out=_get_out(z, out))
+        return _unwrap(np.negative(out, out=out))
 
 
 
 
-    def inverse_derivative2(self, z):
+    def inverse_derivative2(self, z, out=None):
         """
         Second derivative of the inverse link function g^(-1)(z).
 
@@ -671,6 +1001,9 @@ class LogC(Link):
         ----------
         z : array_like
             The inverse of the link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
@@ -678,11 +1011,43 @@ class LogC(Link):
             The value of the second derivative of the inverse of the
             log-complement function.
         """
-        return -np.exp(z)
+        out = np.exp(z, out=_get_out(z, out))
+        return _unwrap(np.negative(out, out=out))
+
 
 
 
-# TODO: the CDFLink is untested
+    def inverse_and_derivative(self, z, out=None, derivative_out=None):
+        """
+        Inverse of the log-complement transform and its derivative
+
+        Parameters
+        ----------
+        z : array_like
+            `z` is usually the linear predictor for a GLM or GEE model.
+        out : ndarray, optional
+            Array of the shape of `z` the inverse is written to, not
+            sharing memory with `z`
+        derivative_out : ndarray, optional
+            Array of the shape of `z` the derivative is written to, not
+            sharing memory with `z`
+
+        Returns
+        -------
+        p : ndarray
+            The value of the inverse of the link function at `z`
+        g^(-1)'(z) : ndarray
+            The value of the derivative of the inverse of the link function
+
+        Notes
+        -----
+        g^(-1)(z) = 1 - exp(z) and g^(-1)'(z) = -exp(z), with exp(z)
+        computed once
+        """
+        mu = np.exp(z, out=_get_out(z, out))
+        d = np.negative(mu, out=_get_out(z, derivative_out))
+        np.add(d, 1, out=mu)
+        return _unwrap(mu), _unwrap(d)
 
 
 class CDFLink(Logit):
@@ -696,16 +1061,12 @@ class CDFLink(Logit):
     ----------
     dbn : scipy.stats distribution
         Default is dbn=scipy.stats.norm
-
-    Notes
-    -----
-    The CDF link is untested.
     """
 
     def __init__(self, dbn=scipy.stats.norm):
         self.dbn = dbn
 
-    def link(self, p):
+    def link(self, p, out=None):
         """
         CDF link function
 
@@ -713,6 +1074,9 @@ class CDFLink(Logit):
         ----------
         p : array_like
             Mean parameters
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
@@ -723,12 +1087,13 @@ class CDFLink(Logit):
         -----
         g(`p`) = `dbn`.ppf(`p`)
         """
-        p = self._clean(p)
-        return self.dbn.ppf(p)
+        p = self._clean(p, out)
+        p[...] = self.dbn.ppf(p)
+        return _unwrap(p)
 
 
 
-    def inverse(self, z):
+    def inverse(self, z, out=None):
         """
         The inverse of the CDF link
 
@@ -736,6 +1101,9 @@ class CDFLink(Logit):
         ----------
         z : array_like
             The value of the inverse of the link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
@@ -746,12 +1114,12 @@ class CDFLink(Logit):
         -----
         g^(-1)(`z`) = `dbn`.cdf(`z`)
         """
-        return self.dbn.cdf(z)
+        return _copy_to(_get_out(z, out), self.dbn.cdf(z))
 
 
 
 
-    def derivative(self, p):
+    def derivative(self, p, out=None):
         """
         Derivative of CDF link
 
@@ -759,6 +1127,9 @@ class CDFLink(Logit):
         ----------
         p : array_like
             mean parameters
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
@@ -769,40 +1140,44 @@ class CDFLink(Logit):
         -----
         g'(`p`) = 1./ `dbn`.pdf(`dbn`.ppf(`p`))
         """
-        p = self._clean(p)
-        return 1. / self.dbn.pdf(self.dbn.ppf(p))
+        p = self._clean(p, out)
+        p[...] = self.dbn.pdf(self.dbn.ppf(p))
+        return _unwrap(np.divide(1., p, out=p))
 
 
 
 
-    def derivative2(self, p):
+    def derivative2(self, p, out=None):
         """
         Second derivative of the link function g''(p)
 
-        implemented through numerical differentiation
-        """
-        p = self._clean(p)
-        linpred = self.dbn.ppf(p)
-        return - self.inverse_derivative2(linpred) / self.dbn.pdf(linpred) ** 3
-
-
-
+        Parameters
+        ----------
+        p : array_like
+            mean parameters
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
-    def derivative2_numdiff(self, p):
-        """
-        Second derivative of the link function g''(p)
+        Returns
+        -------
+        g''(p) : ndarray
+            The second derivative of the CDF transform at `p`
 
-        implemented through numerical differentiation
+        Notes
+        -----
+        g''(`p`) = - g^(-1)''(g(`p`)) / `dbn`.pdf(g(`p`)) ** 3
         """
-        from statsmodels.tools.numdiff import _approx_fprime_scalar
-        p = np.atleast_1d(p)
-        # Note: special function for norm.ppf does not support complex
-        return _approx_fprime_scalar(p, self.deriv, centered=True)
+        p = self._clean(p, out)
+        linpred = self.dbn.ppf(p)
+        p[...] = self.dbn.pdf(linpred)
+        p **= 3
+        return _unwrap(np.divide(-self.inverse_derivative2(linpred), p, out=p))
 
 
 
 
-    def inverse_derivative(self, z):
+    def inverse_derivative(self, z, out=None):
         """
         Derivative of the inverse link function
 
@@ -810,6 +1185,9 @@ class CDFLink(Logit):
         ----------
         z : ndarray
             The inverse of the link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
@@ -817,12 +1195,12 @@ class CDFLink(Logit):
             The value of the derivative of the inverse of the logit function.
             This is just the pdf in a CDFLink,
         """
-        return self.dbn.pdf(z)
+        return _copy_to(_get_out(z, out), self.dbn.pdf(z))
 
 
 
 
-    def inverse_derivative2(self, z):
+    def inverse_derivative2(self, z, out=None):
         """
         Second derivative of the inverse link function g^(-1)(z).
 
@@ -830,6 +1208,9 @@ class CDFLink(Logit):
         ----------
         z : array_like
             `z` is usually the linear predictor for a GLM or GEE model.
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
@@ -839,15 +1220,16 @@ class CDFLink(Logit):
 
         Notes
         -----
-        This method should be overwritten by subclasses.
-
-        The inherited method is implemented through numerical differentiation.
+        The derivative of the pdf of an arbitrary distribution has no closed
+        form, it is computed as a centered finite difference of the pdf, with
+        the step of statsmodels numdiff. Subclasses override it with the closed
+        form of their distribution.
         """
-        from statsmodels.tools.numdiff import _approx_fprime_scalar
-        z = np.atleast_1d(z)
-
-        # Note: special function for norm.ppf does not support complex
-        return _approx_fprime_scalar(z, self.inverse_deriv, centered=True)
+        z = np.asarray(z, dtype=float)
+        step = FLOAT_EPS ** (1. / 3) * np.maximum(np.abs(z), 0.1)
+        # makes the step exactly representable around z
+        step = (z + step) - z
+        return _copy_to(_get_out(z, out), (self.dbn.pdf(z + step) - self.dbn.pdf(z - step)) / (2. * step))
 
 
 
@@ -862,30 +1244,184 @@ class Probit(CDFLink):
     g(p) = scipy.stats.norm.ppf(p)
 
     probit is an alias of CDFLink.
+
+    The link, its inverse and their derivatives call the scipy.special
+    ufuncs ndtri and ndtr directly rather than the methods of
+    scipy.stats.norm, which parse and broadcast their arguments on each call.
     """
 
+    def link(self, p, out=None):
+        """
+        The probit transform
+
+        Parameters
+        ----------
+        p : array_like
+            Probabilities
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
+
+        Returns
+        -------
+        z : ndarray
+            Inverse of the standard normal CDF at `p`
+
+        Notes
+        -----
+        g(p) = ndtri(p)
+        """
+        p = self._clean(p, out)
+        return _unwrap(scipy.special.ndtri(p, out=p))
+
+
+
+    def inverse(self, z, out=None):
+        """
+        Inverse of the probit transform
+
+        Parameters
+        ----------
+        z : array_like
+            The value of the inverse of the link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
+
+        Returns
+        -------
+        p : ndarray
+            Standard normal CDF at `z`
+
+        Notes
+        -----
+        g^(-1)(z) = ndtr(z)
+        """
+        return _unwrap(scipy.special.ndtr(z, out=_get_out(z, out)))
+
+
+
+    def derivative(self, p, out=None):
+        """
+        Derivative of the probit transform
+
+        Parameters
+        ----------
+        p : array_like
+            Probabilities
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
+
+        Returns
+        -------
+        g'(p) : ndarray
+            Value of the derivative of the probit function at `p`
+
+        Notes
+        -----
+        g'(p) = 1 / pdf(z) = sqrt(2 * pi) * exp(z ** 2 / 2), with z = ndtri(p)
+        """
+        p = self._clean(p, out)
+        scipy.special.ndtri(p, out=p)
+        np.square(p, out=p)
+        p *= 0.5
+        np.exp(p, out=p)
+        p *= SQRT_2PI
+        return _unwrap(p)
 
 
-    def inverse_derivative2(self, z):
+
+    def inverse_derivative(self, z, out=None):
+        """
+        Derivative of the inverse of the probit transform
+
+        Parameters
+        ----------
+        z : array_like
+            The value of the inverse of the link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
+
+        Returns
+        -------
+        g^(-1)'(z) : ndarray
+            Standard normal pdf at `z`
+
+        Notes
+        -----
+        g^(-1)'(z) = exp(-z ** 2 / 2) / sqrt(2 * pi)
+        """
+        out = np.square(z, out=_get_out(z, out))
+        out *= -0.5
+        np.exp(out, out=out)
+        out /= SQRT_2PI
+        return _unwrap(out)
+
+
+
+    def inverse_derivative2(self, z, out=None):
         """
         Second derivative of the inverse link function
 
         This is the derivative of the pdf in a CDFLink
 
+        Parameters
+        ----------
+        z : array_like
+            The value of the inverse of the link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
+
+        Returns
+        -------
+        g^(-1)''(z) : ndarray
+            The value of the second derivative of the inverse of the probit
+            function
+
+        Notes
+        -----
+        g^(-1)''(z) = - z * exp(-z ** 2 / 2) / sqrt(2 * pi)
         """
-        return - z * self.dbn.pdf(z)
+        t = np.square(z, out=_get_out(z))
+        t *= -0.5
+        np.exp(t, out=t)
+        t /= -SQRT_2PI
+        return _unwrap(np.multiply(z, t, out=_get_out(z, out)))
 
 
 
 
-    def derivative2(self, p):
+    def derivative2(self, p, out=None):
         """
         Second derivative of the link function g''(p)
 
+        Parameters
+        ----------
+        p : array_like
+            Probabilities
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
+
+        Returns
+        -------
+        g''(p) : ndarray
+            Value of the second derivative of the probit function at `p`
+
+        Notes
+        -----
+        g''(p) = z / pdf(z) ** 2 = 2 * pi * z * exp(z ** 2), with z = g(p)
         """
-        p = self._clean(p)
-        linpred = self.dbn.ppf(p)
-        return linpred / self.dbn.pdf(linpred) ** 2
+        p = self._clean(p, out)
+        linpred = scipy.special.ndtri(p, out=p)
+        t = np.square(linpred, out=_get_out(linpred))
+        np.exp(t, out=t)
+        linpred *= t
+        linpred *= 2. * np.pi
+        return _unwrap(linpred)
 
 
 
@@ -900,14 +1436,130 @@ class Cauchy(CDFLink):
     g(p) = scipy.stats.cauchy.ppf(p)
 
     cauchy is an alias of CDFLink with dbn=scipy.stats.cauchy
+
+    The link, its inverse and their derivatives are closed-form tan and
+    arctan expressions rather than calls to the methods of scipy.stats.cauchy.
     """
 
     def __init__(self):
         super().__init__(dbn=scipy.stats.cauchy)
 
+    def link(self, p, out=None):
+        """
+        The Cauchy transform
+
+        Parameters
+        ----------
+        p : array_like
+            Probabilities
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
+
+        Returns
+        -------
+        z : ndarray
+            Inverse of the standard Cauchy CDF at `p`
+
+        Notes
+        -----
+        g(p) = tan(pi * (p - 0.5))
+        """
+        p = self._clean(p, out)
+        return _unwrap(_cauchy_ppf(p, out=p))
+
+
+
+    def inverse(self, z, out=None):
+        """
+        Inverse of the Cauchy transform
+
+        Parameters
+        ----------
+        z : array_like
+            The value of the inverse of the link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
+
+        Returns
+        -------
+        p : ndarray
+            Standard Cauchy CDF at `z`
+
+        Notes
+        -----
+        g^(-1)(z) = 0.5 + arctan(z) / pi
+        """
+        out = np.arctan(z, out=_get_out(z, out))
+        out /= np.pi
+        out += 0.5
+        return _unwrap(out)
+
+
+
+    def derivative(self, p, out=None):
+        """
+        Derivative of the Cauchy transform
+
+        Parameters
+        ----------
+        p : array_like
+            Probabilities
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
+
+        Returns
+        -------
+        g'(p) : ndarray
+            Value of the derivative of the Cauchy link function at `p`
+
+        Notes
+        -----
+        g'(p) = pi * (1 + t ** 2), with t = tan(pi * (p - 0.5))
+        """
+        p = self._clean(p, out)
+        t = _cauchy_ppf(p, out=p)
+        np.square(t, out=t)
+        t += 1.
+        t *= np.pi
+        return _unwrap(t)
+
+
+
+    def inverse_derivative(self, z, out=None):
+        """
+        Derivative of the inverse of the Cauchy transform
+
+        Parameters
+        ----------
+        z : array_like
+            The value of the inverse of the link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
+
+        Returns
+        -------
+        g^(-1)'(z) : ndarray
+            Standard Cauchy pdf at `z`
+
+        Notes
+        -----
+        g^(-1)'(z) = 1 / (pi * (1 + z ** 2))
+        """
+        result = _run_kernel('cauchy_inverse_derivative', z, out)
+        if result is not None:
+            return result
+        out = np.square(z, out=_get_out(z, out))
+        out += 1.
+        out *= np.pi
+        return _unwrap(np.divide(1., out, out=out))
+
 
 
-    def derivative2(self, p):
+    def derivative2(self, p, out=None):
         """
         Second derivative of the Cauchy link function.
 
@@ -915,22 +1567,59 @@ class Cauchy(CDFLink):
         ----------
         p : array_like
             Probabilities
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
         g''(p) : ndarray
             Value of the second derivative of Cauchy link function at `p`
+
+        Notes
+        -----
+        g''(p) = 2 * pi ** 2 * sin(a) / cos(a) ** 3 = 2 * pi ** 2 * t * (1 + t ** 2),
+        with a = pi * (p - 0.5) and t = tan(a)
         """
-        p = self._clean(p)
-        a = np.pi * (p - 0.5)
-        d2 = 2 * np.pi ** 2 * np.sin(a) / np.cos(a) ** 3
-        return d2
+        p = self._clean(p, out)
+        t = _cauchy_ppf(p, out=p)
+        s = np.square(t)
+        s += 1.
+        t *= s
+        t *= 2 * np.pi ** 2
+        return _unwrap(t)
 
 
 
 
-    def inverse_derivative2(self, z):
-        return - 2 * z / (np.pi * (z ** 2 + 1) ** 2)
+    def inverse_derivative2(self, z, out=None):
+        """
+        Second derivative of the inverse of the Cauchy link function.
+
+        Parameters
+        ----------
+        z : array_like
+            The value of the inverse of the link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
+
+        Returns
+        -------
+        g^(-1)''(z) : ndarray
+            The value of the second derivative of the inverse of the Cauchy
+            link function
+
+        Notes
+        -----
+        g^(-1)''(z) = - 2 * z / (pi * (1 + z ** 2) ** 2)
+        """
+        d = np.square(z, out=_get_out(z))
+        d += 1
+        np.square(d, out=d)
+        d *= np.pi
+        out = np.multiply(z, - 2, out=_get_out(z, out))
+        return _unwrap(np.divide(out, d, out=out))
 
 
 
@@ -942,13 +1631,9 @@ class CLogLog(Logit):
 
     CLogLog inherits from Logit in order to have access to its _clean method
     for the link and its derivative.
-
-    Notes
-    -----
-    CLogLog is untested.
     """
 
-    def link(self, p):
+    def link(self, p, out=None):
         """
         C-Log-Log transform link function
 
@@ -956,6 +1641,9 @@ class CLogLog(Logit):
         ----------
         p : ndarray
             Mean parameters
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
@@ -966,12 +1654,15 @@ class CLogLog(Logit):
         -----
         g(p) = log(-log(1-p))
         """
-        p = self._clean(p)
-        return np.log(-np.log(1 - p))
+        p = self._clean(p, out)
+        np.subtract(1, p, out=p)
+        np.log(p, out=p)
+        np.negative(p, out=p)
+        return _unwrap(np.log(p, out=p))
 
 
 
-    def inverse(self, z):
+    def inverse(self, z, out=None):
         """
         Inverse of C-Log-Log transform link function
 
@@ -980,6 +1671,9 @@ class CLogLog(Logit):
         ----------
         z : array_like
             The value of the inverse of the CLogLog link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
@@ -990,12 +1684,15 @@ class CLogLog(Logit):
         -----
         g^(-1)(`z`) = 1-exp(-exp(`z`))
         """
-        return 1 - np.exp(-np.exp(z))
+        out = np.exp(z, out=_get_out(z, out))
+        np.negative(out, out=out)
+        np.expm1(out, out=out)
+        return _unwrap(np.negative(out, out=out))
 
 
 
 
-    def derivative(self, p):
+    def derivative(self, p, out=None):
         """
         Derivative of C-Log-Log transform link function
 
@@ -1003,6 +1700,9 @@ class CLogLog(Logit):
         ----------
         p : array_like
             Mean parameters
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
@@ -1013,13 +1713,16 @@ class CLogLog(Logit):
         -----
         g'(p) = - 1 / ((p-1)*log(1-p))
         """
-        p = self._clean(p)
-        return 1. / ((p - 1) * (np.log(1 - p)))
+        p = self._clean(p, out)
+        np.subtract(1, p, out=p)
+        fl = np.log(p)
+        p *= fl
+        return _unwrap(np.divide(-1., p, out=p))
 
 
 
 
-    def derivative2(self, p):
+    def derivative2(self, p, out=None):
         """
         Second derivative of the C-Log-Log ink function
 
@@ -1027,22 +1730,28 @@ class CLogLog(Logit):
         ----------
         p : array_like
             Mean parameters
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
         g''(p) : ndarray
             The second derivative of the CLogLog link function
         """
-        p = self._clean(p)
-        fl = np.log(1 - p)
-        d2 = -1 / ((1 - p) ** 2 * fl)
-        d2 *= 1 + 1 / fl
-        return d2
+        p = self._clean(p, out)
+        np.subtract(1, p, out=p)
+        fl = np.log(p)
+        p *= fl
+        np.square(p, out=p)
+        fl += 1
+        np.divide(fl, p, out=p)
+        return _unwrap(np.negative(p, out=p))
 
 
 
 
-    def inverse_derivative(self, z):
+    def inverse_derivative(self, z, out=None):
         """
         Derivative of the inverse of the C-Log-Log transform link function
 
@@ -1050,13 +1759,83 @@ class CLogLog(Logit):
         ----------
         z : array_like
             The value of the inverse of the CLogLog link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
         g^(-1)'(z) : ndarray
             The derivative of the inverse of the CLogLog link function
         """
-        return np.exp(z - np.exp(z))
+        t = np.exp(z)
+        out = np.subtract(z, t, out=_get_out(z, out))
+        return _unwrap(np.exp(out, out=out))
+
+
+
+
+    def inverse_derivative2(self, z, out=None):
+        """
+        Second derivative of the inverse of the C-Log-Log transform link
+        function
+
+        Parameters
+        ----------
+        z : array_like
+            The value of the inverse of the CLogLog link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
+
+        Returns
+        -------
+        g^(-1)''(z) : ndarray
+            The second derivative of the inverse of the CLogLog link function
+        """
+        t = np.exp(z, out=_get_out(z))
+        np.subtract(z, t, out=t)
+        np.exp(t, out=t)
+        out = np.expm1(z, out=_get_out(z, out))
+        out *= t
+        return _unwrap(np.negative(out, out=out))
+
+
+
+
+    def inverse_and_derivative(self, z, out=None, derivative_out=None):
+        """
+        Inverse of the C-Log-Log transform and its derivative
+
+        Parameters
+        ----------
+        z : array_like
+            `z` is usually the linear predictor for a GLM or GEE model.
+        out : ndarray, optional
+            Array of the shape of `z` the inverse is written to, not
+            sharing memory with `z`
+        derivative_out : ndarray, optional
+            Array of the shape of `z` the derivative is written to, not
+            sharing memory with `z`
+
+        Returns
+        -------
+        p : ndarray
+            The value of the inverse of the link function at `z`
+        g^(-1)'(z) : ndarray
+            The value of the derivative of the inverse of the link function
+
+        Notes
+        -----
+        g^(-1)(z) = 1 - exp(-t) and g^(-1)'(z) = exp(z - t), with t = exp(z)
+        computed once
+        """
+        t = np.exp(z, out=_get_out(z, out))
+        d = np.subtract(z, t, out=_get_out(z, derivative_out))
+        np.exp(d, out=d)
+        np.negative(t, out=t)
+        np.expm1(t, out=t)
+        return _unwrap(np.negative(t, out=t)), _unwrap(d)
 
 
 
@@ -1070,7 +1849,7 @@ class LogLog(Logit):
     for the link and its derivative.
     """
 
-    def link(self, p):
+    def link(self, p, out=None):
         """
         Log-Log transform link function
 
@@ -1078,6 +1857,9 @@ class LogLog(Logit):
         ----------
         p : ndarray
             Mean parameters
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
@@ -1088,12 +1870,15 @@ class LogLog(Logit):
         -----
         g(p) = -log(-log(p))
         """
-        p = self._clean(p)
-        return -np.log(-np.log(p))
+        p = self._clean(p, out)
+        np.log(p, out=p)
+        np.negative(p, out=p)
+        np.log(p, out=p)
+        return _unwrap(np.negative(p, out=p))
 
 
 
-    def inverse(self, z):
+    def inverse(self, z, out=None):
         """
         Inverse of Log-Log transform link function
 
@@ -1102,6 +1887,9 @@ class LogLog(Logit):
         ----------
         z : array_like
             The value of the inverse of the LogLog link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
@@ -1112,12 +1900,15 @@ class LogLog(Logit):
         -----
         g^(-1)(`z`) = exp(-exp(-`z`))
         """
-        return np.exp(-np.exp(-z))
+        out = np.negative(z, out=_get_out(z, out))
+        np.exp(out, out=out)
+        np.negative(out, out=out)
+        return _unwrap(np.exp(out, out=out))
 
 
 
 
-    def derivative(self, p):
+    def derivative(self, p, out=None):
         """
         Derivative of Log-Log transform link function
 
@@ -1125,6 +1916,9 @@ class LogLog(Logit):
         ----------
         p : array_like
             Mean parameters
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
@@ -1135,13 +1929,14 @@ class LogLog(Logit):
         -----
         g'(p) = - 1 /(p * log(p))
         """
-        p = self._clean(p)
-        return -1. / (p * (np.log(p)))
+        p = self._clean(p, out)
+        p *= np.log(p)
+        return _unwrap(np.divide(-1., p, out=p))
 
 
 
 
-    def derivative2(self, p):
+    def derivative2(self, p, out=None):
         """
         Second derivative of the Log-Log link function
 
@@ -1149,20 +1944,26 @@ class LogLog(Logit):
         ----------
         p : array_like
             Mean parameters
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
         g''(p) : ndarray
             The second derivative of the LogLog link function
         """
-        p = self._clean(p)
-        d2 = (1 + np.log(p)) / (p * (np.log(p))) ** 2
-        return d2
+        p = self._clean(p, out)
+        t = np.log(p)
+        p *= t
+        np.square(p, out=p)
+        t += 1
+        return _unwrap(np.divide(t, p, out=p))
 
 
 
 
-    def inverse_derivative(self, z):
+    def inverse_derivative(self, z, out=None):
         """
         Derivative of the inverse of the Log-Log transform link function
 
@@ -1170,18 +1971,25 @@ class LogLog(Logit):
         ----------
         z : array_like
             The value of the inverse of the LogLog link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
         g^(-1)'(z) : ndarray
             The derivative of the inverse of the LogLog link function
         """
-        return np.exp(-np.exp(-z) - z)
+        t = np.negative(z, out=_get_out(z))
+        np.exp(t, out=t)
+        out = np.add(t, z, out=_get_out(z, out))
+        np.negative(out, out=out)
+        return _unwrap(np.exp(out, out=out))
 
 
 
 
-    def inverse_derivative2(self, z):
+    def inverse_derivative2(self, z, out=None):
         """
         Second derivative of the inverse of the Log-Log transform link function
 
@@ -1189,13 +1997,61 @@ class LogLog(Logit):
         ----------
         z : array_like
             The value of the inverse of the LogLog link function at `p`
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
         g^(-1)''(z) : ndarray
             The second derivative of the inverse of the LogLog link function
         """
-        return self.inverse_derivative(z) * (np.exp(-z) - 1)
+        t = np.negative(z, out=_get_out(z))
+        np.exp(t, out=t)
+        t -= 1
+        out = _get_out(z, out)
+        self.inverse_derivative(z, out=out)
+        out *= t
+        return _unwrap(out)
+
+
+
+
+    def inverse_and_derivative(self, z, out=None, derivative_out=None):
+        """
+        Inverse of the Log-Log transform and its derivative
+
+        Parameters
+        ----------
+        z : array_like
+            `z` is usually the linear predictor for a GLM or GEE model.
+        out : ndarray, optional
+            Array of the shape of `z` the inverse is written to, not
+            sharing memory with `z`
+        derivative_out : ndarray, optional
+            Array of the shape of `z` the derivative is written to, not
+            sharing memory with `z`
+
+        Returns
+        -------
+        p : ndarray
+            The value of the inverse of the link function at `z`
+        g^(-1)'(z) : ndarray
+            The value of the derivative of the inverse of the link function
+
+        Notes
+        -----
+        g^(-1)(z) = exp(-t) and g^(-1)'(z) = t * g^(-1)(z), with t = exp(-z)
+        bounded by the largest float so that their product stays 0 where
+        g^(-1)(z) underflows
+        """
+        t = np.negative(z, out=_get_out(z, derivative_out))
+        np.minimum(t, np.log(np.finfo(t.dtype).max), out=t)
+        np.exp(t, out=t)
+        mu = np.negative(t, out=_get_out(z, out))
+        np.exp(mu, out=mu)
+        t *= mu
+        return _unwrap(mu), _unwrap(t)
 
 
 
@@ -1216,10 +2072,12 @@ class NegativeBinomial(Link):
     def __init__(self, alpha=1.):
         self.alpha = alpha
 
-    def _clean(self, x):
-        return np.clip(x, FLOAT_EPS, np.inf)
+    def _clean(self, x, out=None):
+        out = _get_out(x, out)
+        np.clip(x, FLOAT_EPS, np.inf, out=out)
+        return out
 
-    def link(self, p):
+    def link(self, p, out=None):
         """
         Negative Binomial transform link function
 
@@ -1227,6 +2085,9 @@ class NegativeBinomial(Link):
         ----------
         p : array_like
             Mean parameters
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
@@ -1237,12 +2098,14 @@ class NegativeBinomial(Link):
         -----
         g(p) = log(p/(p + 1/alpha))
         """
-        p = self._clean(p)
-        return np.log(p / (p + 1 / self.alpha))
+        p = self._clean(p, out)
+        t = p + 1 / self.alpha
+        np.divide(p, t, out=p)
+        return _unwrap(np.log(p, out=p))
 
 
 
-    def inverse(self, z):
+    def inverse(self, z, out=None):
         """
         Inverse of the negative binomial transform
 
@@ -1250,6 +2113,9 @@ class NegativeBinomial(Link):
         ----------
         z : array_like
             The value of the inverse of the negative binomial link at `p`.
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
@@ -1260,12 +2126,16 @@ class NegativeBinomial(Link):
         -----
         g^(-1)(z) = exp(z)/(alpha*(1-exp(z)))
         """
-        return -1 / (self.alpha * (1 - np.exp(-z)))
+        out = np.negative(z, out=_get_out(z, out))
+        np.exp(out, out=out)
+        np.subtract(1, out, out=out)
+        out *= self.alpha
+        return _unwrap(np.divide(-1, out, out=out))
 
 
 
 
-    def derivative(self, p):
+    def derivative(self, p, out=None):
         """
         Derivative of the negative binomial transform
 
@@ -1273,6 +2143,9 @@ class NegativeBinomial(Link):
         ----------
         p : array_like
             Mean parameters
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
@@ -1283,12 +2156,18 @@ class NegativeBinomial(Link):
         -----
         g'(x) = 1/(x+alpha*x^2)
         """
-        return 1 / (p + self.alpha * p ** 2)
+        result = _run_kernel('negative_binomial_derivative', p, out, self.alpha)
+        if result is not None:
+            return result
+        t = np.multiply(p, self.alpha, out=_get_out(p))
+        t *= p
+        t += p
+        return _unwrap(np.divide(1, t, out=_get_out(p, out)))
 
 
 
 
-    def derivative2(self, p):
+    def derivative2(self, p, out=None):
         """
         Second derivative of the negative binomial link function.
 
@@ -1296,6 +2175,9 @@ class NegativeBinomial(Link):
         ----------
         p : array_like
             Mean parameters
+        out : ndarray, optional
+            Array of the shape of `p` the result is written to,
+            which can be `p` itself
 
         Returns
         -------
@@ -1307,14 +2189,19 @@ class NegativeBinomial(Link):
         -----
         g''(x) = -(1+2*alpha*x)/(x+alpha*x^2)^2
         """
-        numer = -(1 + 2 * self.alpha * p)
-        denom = (p + self.alpha * p ** 2) ** 2
-        return numer / denom
+        t = np.multiply(p, self.alpha, out=_get_out(p))
+        t *= p
+        t += p
+        np.square(t, out=t)
+        out = np.multiply(p, 2 * self.alpha, out=_get_out(p, out))
+        out += 1
+        np.divide(out, t, out=out)
+        return _unwrap(np.negative(out, out=out))
 
 
 
 
-    def inverse_derivative(self, z):
+    def inverse_derivative(self, z, out=None):
         """
         Derivative of the inverse of the negative binomial transform
 
@@ -1322,6 +2209,9 @@ class NegativeBinomial(Link):
         ----------
         z : array_like
             Usually the linear predictor for a GLM or GEE model
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
 
         Returns
         -------
@@ -1329,10 +2219,76 @@ class NegativeBinomial(Link):
             The value of the derivative of the inverse of the negative
             binomial link
         """
-        t = np.exp(z)
-        return t / (self.alpha * (1 - t) ** 2)
+        out = np.exp(z, out=_get_out(z, out))
+        d = np.subtract(1, out, out=_get_out(out))
+        np.square(d, out=d)
+        d *= self.alpha
+        return _unwrap(np.divide(out, d, out=out))
+
+
 
 
+    def inverse_derivative2(self, z, out=None):
+        """
+        Second derivative of the inverse of the negative binomial transform
+
+        Parameters
+        ----------
+        z : array_like
+            Usually the linear predictor for a GLM or GEE model
+        out : ndarray, optional
+            Array of the shape of `z` the result is written to,
+            which can be `z` itself
+
+        Returns
+        -------
+        g^(-1)''(z) : ndarray
+            The value of the second derivative of the inverse of the negative
+            binomial link
+        """
+        out = np.exp(z, out=_get_out(z, out))
+        d = np.subtract(1, out, out=_get_out(out))
+        np.power(d, 3, out=d)
+        d *= self.alpha
+        out *= out + 1
+        return _unwrap(np.divide(out, d, out=out))
+
+
+
+
+    def inverse_and_derivative(self, z, out=None, derivative_out=None):
+        """
+        Inverse of the negative binomial transform and its derivative
+
+        Parameters
+        ----------
+        z : array_like
+            `z` is usually the linear predictor for a GLM or GEE model.
+        out : ndarray, optional
+            Array of the shape of `z` the inverse is written to, not
+            sharing memory with `z`
+        derivative_out : ndarray, optional
+            Array of the shape of `z` the derivative is written to, not
+            sharing memory with `z`
+
+        Returns
+        -------
+        p : ndarray
+            The value of the inverse of the link function at `z`
+        g^(-1)'(z) : ndarray
+            The value of the derivative of the inverse of the link function
+
+        Notes
+        -----
+        g^(-1)(z) = t / (alpha * (1 - t)) and g^(-1)'(z) = g^(-1)(z) / (1 - t),
+        with t = exp(z) computed once
+        """
+        t = np.exp(z, out=_get_out(z, out))
+        s = np.subtract(1, t, out=_get_out(z, derivative_out))
+        t /= s
+        t /= self.alpha
+        return _unwrap(t), _unwrap(np.divide(t, s, out=s))
+
 
 # TODO: Deprecated aliases, remove after 0.15
 class logit(Logit):
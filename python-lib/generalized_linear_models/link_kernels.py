@@ -0,0 +1,166 @@
+"""
+Compiled kernels of the custom links of link.py: when Numba is installed,
+the link, inverse and derivatives of the inverse power and inverse squared
+links, and the derivatives of Cauchy and NegativeBinomial, which are chains
+of arithmetic only, are compiled on first use into a single loop over the
+data instead of NumPy operations each going through the whole array. Large
+arrays are split into blocks run by a pool of threads, the compiled loops
+releasing the GIL. The kernels are compiled for a single thread rather than
+with the parallel target of Numba, whose default threading layer is neither
+thread safe nor fork safe, the links being called from the threads of the
+webapps and before the process pool of parallel.py forks.
+Numba is only imported when the first kernel is compiled, so importing
+link.py does not pay for it. Without Numba, or when compiling fails, ENABLED
+is False and the links keep their NumPy implementations. Forked processes
+run the kernels on a single thread, the pool of parallel.py giving its
+workers the threads of their BLAS instead.
+"""
+
+import os
+import math
+import logging
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ENABLED = importlib.util.find_spec('numba') is not None
+# smaller arrays, or blocks, do not amortize dispatching the call
+MIN_SIZE = 50000
+N_THREADS = os.cpu_count() or 1
+
+UNARY_SIGNATURES = ['float64(float64)', 'float32(float32)']
+BINARY_SIGNATURES = ['float64(float64, float64)', 'float32(float32, float32)']
+
+
+def cauchy_inverse_derivative(z):
+    return 1. / (math.pi * (1. + z * z))
+
+
+def negative_binomial_derivative(p, alpha):
+    return 1. / (p * alpha * p + p)
+
+
+def inverse_power_link(p):
+    return 1. / p
+
+
+def inverse_power_inverse(z):
+    return 1. / z
+
+
+def inverse_power_derivative(p):
+    return -1. / (p * p)
+
+
+def inverse_power_inverse_derivative(z):
+    return -1. / (z * z)
+
+
+def inverse_squared_link(p):
+    return 1. / (p * p)
+
+
+def inverse_squared_inverse(z):
+    return 1. / math.sqrt(z)
+
+
+def inverse_squared_derivative(p):
+    return -2. / (p * p * p)
+
+
+def inverse_squared_inverse_derivative(z):
+    return -0.5 / (z * math.sqrt(z))
+
+
+# only the arithmetic chains: the loops calling exp, log, tan or arctan are
+# slower than the SIMD loops of NumPy for these functions
+KERNELS = {
+    'cauchy_inverse_derivative': (cauchy_inverse_derivative, UNARY_SIGNATURES),
+    'negative_binomial_derivative': (negative_binomial_derivative, BINARY_SIGNATURES),
+    'inverse_power_link': (inverse_power_link, UNARY_SIGNATURES),
+    'inverse_power_inverse': (inverse_power_inverse, UNARY_SIGNATURES),
+    'inverse_power_derivative': (inverse_power_derivative, UNARY_SIGNATURES),
+    'inverse_power_inverse_derivative': (inverse_power_inverse_derivative, UNARY_SIGNATURES),
+    'inverse_squared_link': (inverse_squared_link, UNARY_SIGNATURES),
+    'inverse_squared_inverse': (inverse_squared_inverse, UNARY_SIGNATURES),
+    'inverse_squared_derivative': (inverse_squared_derivative, UNARY_SIGNATURES),
+    'inverse_squared_inverse_derivative': (inverse_squared_inverse_derivative, UNARY_SIGNATURES),
+}
+# names of the kernels of Power by power
+POWER_KERNELS = {-1: 'inverse_power', -2: 'inverse_squared'}
+
+compiled_kernels = dict()
+compile_lock = threading.Lock()
+thread_pool = None
+
+
+def reset_thread_pool():
+    # the threads of the pool do not survive a fork, and the processes
+    # forked by a pool would otherwise each start cpu_count threads
+    global thread_pool, N_THREADS
+    thread_pool = None
+    N_THREADS = 1
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset_thread_pool)
+
+
+def get_thread_pool():
+    global thread_pool
+    with compile_lock:
+        if thread_pool is None:
+            thread_pool = ThreadPoolExecutor(max_workers=N_THREADS, thread_name_prefix='link-kernels')
+        return thread_pool
+
+
+def get_kernel(name):
+    """
+    returns the kernel of name compiled as a NumPy ufunc, which accepts
+    out and scalar parameters as the NumPy implementations, or None
+    when Numba is not available
+    """
+    global ENABLED
+    with compile_lock:
+        if not ENABLED:
+            return None
+        if name not in compiled_kernels:
+            function, signatures = KERNELS[name]
+            try:
+                import numba
+                compiled_kernels[name] = numba.vectorize(signatures)(function)
+            except Exception as e:
+                logger.warning('Could not compile the link kernels, using NumPy instead: ' + str(e))
+                ENABLED = False
+                return None
+        return compiled_kernels[name]
+
+
+def run_kernel(name, x, params, out=None):
+    """
+    returns the kernel of name applied to the array x and the scalar
+    params, in blocks of contiguous rows run by the thread pool, or None
+    when x is too small or there is no such kernel, the caller then
+    running its NumPy implementation
+    """
+    if not ENABLED or name not in KERNELS or x.size < MIN_SIZE:
+        return None
+    kernel = get_kernel(name)
+    if kernel is None:
+        return None
+    if out is None:
+        out = np.empty(x.shape, dtype=np.result_type(x, 1.))
+    # Numba would otherwise pick the float64 loop for float32 arrays
+    dtype = out.dtype
+    n_blocks = min(N_THREADS, x.size // MIN_SIZE)
+    if n_blocks <= 1 or x.ndim != 1 or out.ndim != 1:
+        return kernel(x, *params, out=out, dtype=dtype)
+    bounds = np.linspace(0, len(x), n_blocks + 1).astype(int)
+    blocks = [slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+    futures = [get_thread_pool().submit(kernel, x[block], *params, out=out[block], dtype=dtype) for block in blocks]
+    for future in futures:
+        future.result()
+    return out
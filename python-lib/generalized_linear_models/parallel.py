@@ -0,0 +1,145 @@
+"""
+Fits the points of a penalty grid in a pool of processes, sharing the
+design matrix, target, weights and offset through shared memory instead of
+copying them into every worker.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from scipy import sparse
+from threadpoolctl import threadpool_limits
+from glum import GeneralizedLinearRegressor
+from generalized_linear_models import link_kernels
+
+# arrays attached by each worker of the pool, keyed by name
+_worker_arrays = {}
+_worker_memory = []
+
+
+class SharedArrays:
+    """
+    Copies arrays once into shared memory blocks and releases
+    them when leaving the context
+    """
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.memory_blocks = []
+        self.specs = {}
+
+    def __enter__(self):
+        for name, array in self.arrays.items():
+            if array is None:
+                self.specs[name] = None
+                continue
+            array = np.ascontiguousarray(array)
+            memory_block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            self.memory_blocks.append(memory_block)
+            shared_array = np.ndarray(array.shape, dtype=array.dtype, buffer=memory_block.buf)
+            shared_array[...] = array
+            self.specs[name] = (memory_block.name, array.shape, array.dtype.str)
+        return self.specs
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for memory_block in self.memory_blocks:
+            memory_block.close()
+            memory_block.unlink()
+
+
+def split_design_matrix(X):
+    """
+    returns the arrays to share for X and a description to rebuild it
+    """
+    if sparse.issparse(X):
+        X = sparse.csc_matrix(X)
+        return {'X_data': X.data, 'X_indices': X.indices, 'X_indptr': X.indptr}, ('csc', X.shape)
+    return {'X': X}, ('dense', X.shape)
+
+
+def attach_arrays(specs, blas_threads):
+    """
+    initializer of the pool workers, maps the shared arrays and caps
+    the BLAS threads of the worker, and the threads of the link kernels
+    """
+    threadpool_limits(limits=blas_threads)
+    link_kernels.N_THREADS = blas_threads
+    for name, spec in specs.items():
+        if spec is None:
+            _worker_arrays[name] = None
+            continue
+        memory_name, shape, dtype = spec
+        memory_block = shared_memory.SharedMemory(name=memory_name)
+        _worker_memory.append(memory_block)
+        _worker_arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=memory_block.buf)
+
+
+def get_worker_design_matrix(layout):
+    kind, shape = layout
+    if kind == 'csc':
+        return sparse.csc_matrix((_worker_arrays['X_data'], _worker_arrays['X_indices'], _worker_arrays['X_indptr']),
+                                 shape=shape, copy=False)
+    return _worker_arrays['X']
+
+
+def fit_grid_task(task):
+    """
+    fits the penalties of one task, in descending order with warm starts,
+    on the arrays shared with the pool, the first penalty starting from
+    start_params when given
+    """
+    layout, l1_ratio, penalties, family, link, solver_params, start_params = task
+    model = GeneralizedLinearRegressor(alpha=penalties, alpha_search=True, l1_ratio=l1_ratio,
+                                       fit_intercept=True, family=family, link=link, start_params=start_params,
+                                       **solver_params)
+    model.fit(get_worker_design_matrix(layout), _worker_arrays['y'], sample_weight=_worker_arrays['sample_weight'],
+              offset=_worker_arrays['offset'])
+    return l1_ratio, penalties, model
+
+
+def split_penalties(penalties, n_segments):
+    """
+    splits the descending penalties into contiguous segments,
+    each of them being fitted as a warm started path
+    """
+    n_segments = max(1, min(n_segments, len(penalties)))
+    return [[float(penalty) for penalty in segment] for segment in np.array_split(penalties, n_segments)]
+
+
+def get_segment_start_params(coarse_model):
+    """
+    returns the intercept and coefficients of each penalty of a coarse
+    path, in the layout of the start_params of glum
+    """
+    return [np.concatenate([[intercept], coef])
+            for intercept, coef in zip(coarse_model.intercept_path_, coarse_model.coef_path_)]
+
+
+def fit_grid_parallel(X, y, sample_weight, offset, l1_ratios, penalties, family, link, n_jobs, blas_threads=1,
+                      solver_params=None):
+    """
+    fits every l1_ratio and penalty of the grid in a pool of n_jobs processes,
+    and returns the (l1_ratio, penalties, fitted glum model) of every task.
+    The path of each l1_ratio is split into segments: a coarse path over
+    the first penalty of every segment is fitted first, so that each segment
+    starts warm from its solution instead of from zero coefficients
+    """
+    n_segments = max(1, n_jobs // len(l1_ratios))
+    arrays, layout = split_design_matrix(X)
+    arrays.update({'y': np.asarray(y, dtype=X.dtype), 'sample_weight': sample_weight, 'offset': offset})
+    solver_params = solver_params or {}
+    segments = split_penalties(penalties, n_segments)
+
+    with SharedArrays(arrays) as specs:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=attach_arrays,
+                                 initargs=(specs, blas_threads)) as executor:
+            start_params = {l1_ratio: [None] * len(segments) for l1_ratio in l1_ratios}
+            if len(segments) > 1:
+                coarse_tasks = [(layout, l1_ratio, [segment[0] for segment in segments], family, link, solver_params,
+                                 None)
+                                for l1_ratio in l1_ratios]
+                for l1_ratio, _, coarse_model in executor.map(fit_grid_task, coarse_tasks):
+                    start_params[l1_ratio] = get_segment_start_params(coarse_model)
+            tasks = [(layout, l1_ratio, segment, family, link, solver_params, start_params[l1_ratio][index])
+                     for l1_ratio in l1_ratios
+                     for index, segment in enumerate(segments)]
+            return list(executor.map(fit_grid_task, tasks))
@@ -0,0 +1,144 @@
+"""
+Scores fitted GLMs with NumPy directly from their coefficients,
+without the input validation overhead of glum predict.
+"""
+
+import math
+import numpy as np
+from scipy import sparse
+import generalized_linear_models.link as link
+
+FLOAT_EPS = np.finfo(float).eps
+
+DEFAULT_CHUNK_SIZE = 65536
+SMALL_BATCH_MAX_ROWS = 64
+NEGATIVE_EXPOSURE_MESSAGE = ('Exposure columns contains some negative values. Please make sure that the exposure '
+                             'column is not rescaled in feature handling.')
+
+# glum clips the inverse of these links away from 0 and 1
+BOUNDED_LINKS = ['logit', 'cloglog']
+
+
+def get_link_instance(glm_link):
+    """
+    returns the link object of link.py matching the
+    link given to glum, either a name or a link object
+    """
+    if isinstance(glm_link, link.Link):
+        return glm_link
+    named_links = {
+        'identity': link.Identity,
+        'log': link.Log,
+        'logit': link.Logit,
+        'cloglog': link.CLogLog
+    }
+    if glm_link not in named_links:
+        raise ValueError("Unsupported link")
+    return named_links[glm_link]()
+
+
+class GLMScorer:
+    """
+    Computes g^(-1)(X . coef + intercept + offset) in a single preallocated
+    buffer of the given dtype, applying the inverse link chunk by chunk so
+    that its temporaries stay small whatever the number of rows
+    """
+    def __init__(self, coef, intercept, glm_link, chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        self.coef = np.ascontiguousarray(coef, dtype=self.dtype)
+        self.intercept = float(intercept)
+        self.link = get_link_instance(glm_link)
+        self.bounded = isinstance(glm_link, str) and glm_link in BOUNDED_LINKS
+        self.chunk_size = chunk_size
+
+    def linear_predictor(self, X, offset=None, out=None):
+        """
+        computes X . coef + intercept + offset, in out when provided
+        """
+        if out is None:
+            out = np.empty(X.shape[0], dtype=self.dtype)
+        if sparse.issparse(X) or X.dtype != out.dtype:
+            out[:] = X @ self.coef
+        else:
+            np.dot(X, self.coef, out=out)
+        out += self.intercept
+        if offset is not None:
+            out += offset
+        return out
+
+    def inverse_link(self, eta):
+        """
+        applies the inverse link in place, one chunk at a time
+        """
+        for start in range(0, len(eta), self.chunk_size):
+            chunk = eta[start:start + self.chunk_size]
+            self.link.inverse(chunk, out=chunk)
+            if self.bounded:
+                eps50 = 50 * np.finfo(chunk.dtype).eps
+                np.clip(chunk, eps50, 1 - eps50, out=chunk)
+        return eta
+
+    def predict(self, X, offset=None, out=None):
+        """
+        returns the predicted mean of each row of X, where X only holds
+        the columns used by the fitted coefficients, in out when provided
+        """
+        return self.inverse_link(self.linear_predictor(X, offset, out))
+
+
+class SmallBatchScorer:
+    """
+    Scores a few dense rows, as sent by real-time API calls, straight from the
+    full design matrix: the offset, exposure and N/A columns are read in place
+    instead of being removed, and only the columns with a nonzero coefficient
+    enter the dot product. Rows are scored in float64, the predictions
+    being returned in the given dtype
+    """
+    def __init__(self, coef, intercept, glm_link, offset_indices, exposure_indices, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        coef = np.asarray(coef, dtype=np.float64)
+        self.nonzero_indices = np.flatnonzero(coef)
+        self.nonzero_coef = np.ascontiguousarray(coef[self.nonzero_indices])
+        self.intercept = float(intercept)
+        self.link = get_link_instance(glm_link)
+        self.bounded = isinstance(glm_link, str) and glm_link in BOUNDED_LINKS
+        self.offset_indices = [int(index) for index in offset_indices]
+        self.exposure_indices = [int(index) for index in exposure_indices]
+
+    def scalar_inverse_link(self, eta):
+        mu = float(self.link.inverse(eta))
+        if self.bounded:
+            eps50 = 50 * FLOAT_EPS
+            mu = min(max(mu, eps50), 1 - eps50)
+        return mu
+
+    def predict_row(self, row):
+        eta = self.intercept + float(np.dot(row[self.nonzero_indices], self.nonzero_coef))
+        for index in self.offset_indices:
+            eta += row[index]
+        for index in self.exposure_indices:
+            if row[index] <= 0:
+                raise ValueError(NEGATIVE_EXPOSURE_MESSAGE)
+            eta += math.log(row[index])
+        return self.scalar_inverse_link(np.float64(eta))
+
+    def predict(self, X):
+        """
+        returns the predicted mean of each row of X, where X holds
+        all the columns of the design matrix
+        """
+        if X.shape[0] == 1:
+            return np.array([self.predict_row(X[0])], dtype=self.dtype)
+        eta = X[:, self.nonzero_indices] @ self.nonzero_coef
+        eta += self.intercept
+        for index in self.offset_indices:
+            eta += X[:, index]
+        for index in self.exposure_indices:
+            if (X[:, index] <= 0).any():
+                raise ValueError(NEGATIVE_EXPOSURE_MESSAGE)
+            eta += np.log(X[:, index])
+        mu = self.link.inverse(eta)
+        if self.bounded:
+            eps50 = 50 * FLOAT_EPS
+            mu = np.clip(mu, eps50, 1 - eps50)
+        return mu.astype(self.dtype, copy=False)
@@ -0,0 +1,215 @@
+"""
+Fits GLMs by iteratively reweighted least squares over chunks of rows,
+so that datasets larger than memory can be trained: each iteration streams
+the data once and only keeps the weighted Gram matrix X'WX and the score
+X'Wz, whose size depends on the number of columns and not on the number of rows.
+"""
+
+import warnings
+import numpy as np
+from scipy import sparse
+from sklearn.exceptions import ConvergenceWarning
+from generalized_linear_models.scorer import get_link_instance, BOUNDED_LINKS, FLOAT_EPS
+
+DEFAULT_MAX_ITER = 100
+DEFAULT_TOL = 1e-8
+# each halving streams the data once more
+MAX_STEP_HALVINGS = 20
+
+
+class StreamingFit:
+    """
+    Result of a streaming fit, exposing the coefficients
+    under the same names as a fitted glum model
+    """
+    def __init__(self, coef, intercept, n_iter, deviance, converged):
+        self.coef_ = coef
+        self.intercept_ = intercept
+        self.n_iter_ = n_iter
+        self.deviance_ = deviance
+        self.converged_ = converged
+
+
+class StreamingIRLS:
+    """
+    Fits the family, link, offsets and exposures of a GLM estimator with
+    IRLS, reading the training data from a function returning a fresh
+    iterator of (X, y, sample_weight) chunks at each call, sample_weight
+    being optional. X holds all the columns of the design matrix, including
+    the offset and exposure columns.
+    The penalty of the estimator is applied as a ridge penalty, scaled like the
+    penalty of glum, the lasso part of the elastic net needs the whole data
+    at once and is not supported
+    """
+    def __init__(self, glm_model, max_iter=DEFAULT_MAX_ITER, tol=DEFAULT_TOL):
+        self.glm_model = glm_model
+        self.link = get_link_instance(glm_model.link)
+        self.bounded = isinstance(glm_model.link, str) and glm_model.link in BOUNDED_LINKS
+        self.family = glm_model.family_glum_class
+        self.penalty = self.get_ridge_penalty()
+        self.max_iter = max_iter
+        self.tol = tol
+
+    def get_ridge_penalty(self):
+        penalty = self.glm_model.penalty
+        l1_ratio = self.glm_model.l1_ratio
+        if isinstance(penalty, list):
+            if len(penalty) != 1:
+                raise ValueError('streaming fit takes a single penalty, current values of ' + str(penalty) +
+                                 ' unsupported')
+            penalty = penalty[0]
+        if isinstance(l1_ratio, list):
+            if len(l1_ratio) != 1:
+                raise ValueError('streaming fit takes a single l1_ratio, current values of ' + str(l1_ratio) +
+                                 ' unsupported')
+            l1_ratio = l1_ratio[0]
+        if penalty > 0 and l1_ratio > 0:
+            raise ValueError('streaming fit only supports a ridge penalty, l1_ratio should be 0')
+        return penalty
+
+    def prepare_chunk(self, X, y, sample_weight, column_plan):
+        """
+        splits a chunk into the fitted columns, the target,
+        the weights and the aggregated offset, the normal
+        equations being accumulated in float64 whatever the dtype of X
+        """
+        X = self.glm_model.cast_design_matrix(X)
+        offsets, exposures = column_plan.get_offsets_and_exposures(X)
+        offset = self.glm_model.compute_aggregate_offset(offsets, exposures)
+        X = column_plan.remove_fixed_columns(X)
+        y = np.asarray(y, dtype=np.float64)
+        if sample_weight is None:
+            sample_weight = np.ones(len(y))
+        else:
+            sample_weight = np.asarray(sample_weight, dtype=np.float64)
+        if offset is None:
+            offset = np.zeros(len(y))
+        return X, y, sample_weight, offset
+
+    def iter_chunks(self, get_chunks, column_plan):
+        for chunk in get_chunks():
+            X, y = chunk[0], chunk[1]
+            sample_weight = chunk[2] if len(chunk) > 2 else None
+            yield self.prepare_chunk(X, y, sample_weight, column_plan)
+
+    def clip_mean(self, mu):
+        if self.bounded:
+            eps50 = 50 * FLOAT_EPS
+            return np.clip(mu, eps50, 1 - eps50)
+        return mu
+
+    def accumulate(self, get_chunks, column_plan, coef, intercept):
+        """
+        streams the data once, accumulating the normal equations of the
+        weighted least squares step and the deviance at the current coefficients
+        """
+        n_features = len(coef)
+        gram = np.zeros((n_features + 1, n_features + 1))
+        score = np.zeros(n_features + 1)
+        weight_sum = 0.
+        deviance = 0.
+        for X, y, sample_weight, offset in self.iter_chunks(get_chunks, column_plan):
+            eta = X @ coef + intercept + offset
+            mu, mu_derivative = self.link.inverse_and_derivative(eta)
+            mu = self.clip_mean(mu)
+            working_weight = sample_weight * mu_derivative ** 2 / self.family.unit_variance(mu)
+            working_response = eta - offset + (y - mu) / mu_derivative
+
+            weighted_X = X.multiply(working_weight[:, None]).tocsc() if sparse.issparse(X) else \
+                X * working_weight[:, None]
+            gram[0, 0] += working_weight.sum()
+            column_weights = np.asarray(weighted_X.sum(axis=0)).ravel()
+            gram[0, 1:] += column_weights
+            gram[1:, 0] += column_weights
+            cross_product = X.T @ weighted_X
+            gram[1:, 1:] += cross_product.toarray() if sparse.issparse(cross_product) else cross_product
+            score[0] += working_weight @ working_response
+            score[1:] += weighted_X.T @ working_response
+            weight_sum += sample_weight.sum()
+            deviance += self.family.deviance(y, mu, sample_weight=sample_weight)
+        return gram, score, weight_sum, deviance
+
+    def solve(self, gram, score, weight_sum):
+        """
+        solves the weighted least squares step, the intercept
+        being left out of the ridge penalty
+        """
+        penalty_diagonal = np.full(len(score), weight_sum * self.penalty)
+        penalty_diagonal[0] = 0
+        solution = np.linalg.solve(gram + np.diag(penalty_diagonal), score)
+        return solution[1:], solution[0]
+
+    def get_objective(self, deviance, coef, weight_sum):
+        """
+        deviance with the ridge penalty, on the scale of the normal equations
+        """
+        return deviance + weight_sum * self.penalty * coef @ coef
+
+    def take_step(self, get_chunks, column_plan, coef, intercept, new_coef, new_intercept, objective):
+        """
+        returns the coefficients, accumulated normal equations, deviance and
+        objective at the end of the step towards new_coef, halving the step
+        while the objective is not finite or increases, as the non-canonical
+        links can leave the domain of the family, or None when it still
+        increases after MAX_STEP_HALVINGS halvings
+        """
+        for _ in range(MAX_STEP_HALVINGS + 1):
+            with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+                gram, score, weight_sum, deviance = self.accumulate(get_chunks, column_plan, new_coef, new_intercept)
+            new_objective = self.get_objective(deviance, new_coef, weight_sum)
+            if np.isfinite(new_objective) and (not np.isfinite(objective) or
+                                               new_objective <= objective + self.tol * (abs(objective) + self.tol)):
+                return new_coef, new_intercept, gram, score, weight_sum, deviance, new_objective
+            new_coef = (coef + new_coef) / 2
+            new_intercept = (intercept + new_intercept) / 2
+        return None
+
+    def get_initial_intercept(self, get_chunks, column_plan):
+        """
+        starts from the weighted mean of the target, the
+        first iteration then accounts for the offsets
+        """
+        weighted_sum = 0.
+        weight_sum = 0.
+        for X, y, sample_weight, offset in self.iter_chunks(get_chunks, column_plan):
+            weighted_sum += sample_weight @ y
+            weight_sum += sample_weight.sum()
+        return float(self.link.link(self.clip_mean(np.array([weighted_sum / weight_sum])))[0])
+
+    def fit(self, get_chunks, n_columns, prediction_is_classification=False):
+        """
+        fits the estimator on the streamed data and sets its coefficients
+        so that it scores like an estimator fitted in memory
+        """
+        glm_model = self.glm_model
+        column_plan = glm_model.build_column_plan(n_columns)
+        glm_model.column_plan = column_plan
+        glm_model.offset_indices = column_plan.offset_indices.tolist()
+        glm_model.exposure_indices = column_plan.exposure_indices.tolist()
+        glm_model.removed_indices = column_plan.removed_indices.tolist()
+
+        coef = np.zeros(len(column_plan.kept_indices))
+        intercept = self.get_initial_intercept(get_chunks, column_plan)
+        gram, score, weight_sum, deviance = self.accumulate(get_chunks, column_plan, coef, intercept)
+        objective = self.get_objective(deviance, coef, weight_sum)
+        converged = False
+        n_iter = 0
+        while n_iter < self.max_iter:
+            new_coef, new_intercept = self.solve(gram, score, weight_sum)
+            n_iter += 1
+            step = self.take_step(get_chunks, column_plan, coef, intercept, new_coef, new_intercept, objective)
+            if step is None:
+                break
+            previous_deviance = deviance
+            coef, intercept, gram, score, weight_sum, deviance, objective = step
+            if abs(previous_deviance - deviance) <= self.tol * (abs(deviance) + self.tol):
+                converged = True
+                break
+        if not converged:
+            warnings.warn('Streaming IRLS did not converge after ' + str(n_iter) + ' iterations, with a deviance '
+                          'of ' + str(deviance) + ', increase max_iter or check the link function',
+                          ConvergenceWarning)
+
+        glm_model.fitted_model = StreamingFit(coef, float(intercept), n_iter, deviance, converged)
+        glm_model.compute_coefs(prediction_is_classification)
+        return glm_model
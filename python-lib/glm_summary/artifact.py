@@ -0,0 +1,102 @@
+"""
+Stores the Actual vs Expected tables, the model metrics and the feature list
+of a model version in a folder, so that the GLM Summary webapp loads them
+instead of scoring the test and train sets at every start.
+Each column of each table is a .npy file, memory mapped when loaded, and
+manifest.json indexes the stored model versions by full model id.
+"""
+
+import json
+import os
+import re
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype, is_bool_dtype
+
+MANIFEST_NAME = 'manifest.json'
+ARTIFACT_VERSION = 1
+TABLE_COLUMNS = ['weighted_target', 'weighted_prediction', 'weight', 'weighted_base']
+FEATURE_VALUES_NAME = 'values'
+
+
+def read_manifest(folder_path):
+    manifest_path = os.path.join(folder_path, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {'version': ARTIFACT_VERSION, 'models': {}}
+    with open(manifest_path) as manifest_file:
+        return json.load(manifest_file)
+
+
+def write_manifest(folder_path, manifest):
+    """
+    writes the manifest through a temporary file, so that a reader
+    never sees a partially written manifest
+    """
+    manifest_path = os.path.join(folder_path, MANIFEST_NAME)
+    temporary_path = manifest_path + '.tmp'
+    with open(temporary_path, 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    os.replace(temporary_path, manifest_path)
+
+
+def get_model_directory(full_model_id):
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', full_model_id)
+
+
+def get_feature_values(values):
+    """
+    returns the values of a feature as an array np.load can memory map,
+    non numeric values being stored as strings
+    """
+    if is_numeric_dtype(values.dtype) and not is_bool_dtype(values.dtype):
+        return values.to_numpy(), 'numeric'
+    return np.asarray(values.astype(str).to_numpy(), dtype=str), 'string'
+
+
+def save_ave_artifact(folder_path, full_model_id, ave_grouped, target, metrics):
+    """
+    writes the Actual vs Expected tables and metrics of a model version
+    and registers them in the manifest under its full model id
+    """
+    model_directory = get_model_directory(full_model_id)
+    tables = dict()
+    for index, (feature, table) in enumerate(ave_grouped.items()):
+        table_directory = os.path.join(model_directory, str(index))
+        os.makedirs(os.path.join(folder_path, table_directory), exist_ok=True)
+        feature_values, kind = get_feature_values(table[feature])
+        columns = [(FEATURE_VALUES_NAME, feature_values)] + [(column, table[column].to_numpy())
+                                                             for column in TABLE_COLUMNS]
+        for name, values in columns:
+            np.save(os.path.join(folder_path, table_directory, name + '.npy'), values, allow_pickle=False)
+        tables[feature] = {'directory': table_directory, 'kind': kind, 'rows': len(table)}
+
+    manifest = read_manifest(folder_path)
+    manifest['models'][full_model_id] = {
+        'target': target,
+        'features': list(ave_grouped.keys()),
+        'metrics': {name: float(value) for name, value in metrics.items()},
+        'tables': tables
+    }
+    write_manifest(folder_path, manifest)
+
+
+def load_ave_artifact(folder_path, full_model_id):
+    """
+    returns the Actual vs Expected tables, the target and the metrics
+    stored for a model version, None when the folder does not hold them
+    """
+    manifest = read_manifest(folder_path)
+    if manifest.get('version') != ARTIFACT_VERSION:
+        return None
+    entry = manifest['models'].get(full_model_id)
+    if entry is None:
+        return None
+
+    ave_grouped = dict()
+    for feature in entry['features']:
+        table_directory = os.path.join(folder_path, entry['tables'][feature]['directory'])
+        columns = {name: np.load(os.path.join(table_directory, name + '.npy'), mmap_mode='r', allow_pickle=False)
+                   for name in [FEATURE_VALUES_NAME] + TABLE_COLUMNS}
+        columns[feature] = columns.pop(FEATURE_VALUES_NAME)
+        ave_grouped[feature] = pd.DataFrame(columns, columns=[feature] + TABLE_COLUMNS, copy=False)
+    return ave_grouped, entry['target'], entry['metrics']
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+N_BINS = 20
+MAX_DISTINCT_VALUES = 20
+# rows looked at before the full cardinality check
+CARDINALITY_SAMPLE_SIZE = 1000
+
+
+def has_many_values(values, max_distinct_values=MAX_DISTINCT_VALUES):
+    """
+    returns True when values hold more than max_distinct_values distinct
+    values, missing values included, looking at a sample first
+    """
+    if len(pd.unique(values[:CARDINALITY_SAMPLE_SIZE])) > max_distinct_values:
+        return True
+    return len(pd.unique(values)) > max_distinct_values
+
+
+def compute_bin_edges(values, n_bins=N_BINS):
+    """
+    returns the edges pd.cut computes for an integer number of bins:
+    equal width bins, the first edge being moved left by 0.1% of the range
+    """
+    minimum, maximum = np.nanmin(values), np.nanmax(values)
+    edges = np.linspace(minimum, maximum, n_bins + 1, endpoint=True)
+    edges[0] -= (maximum - minimum) * 0.001
+    return edges
+
+
+def compute_bin_midpoints(edges):
+    """
+    returns the midpoints of the intervals pd.cut labels the bins with,
+    whose bounds are rounded for display
+    """
+    intervals = pd.cut(pd.Series([], dtype=np.float64), bins=edges).cat.categories
+    return np.asarray((intervals.left + intervals.right) / 2, dtype=np.float64)
+
+
+def bin_values(values, n_bins=N_BINS):
+    """
+    replaces each value by the midpoint of its bin,
+    missing values staying missing
+    """
+    values = np.asarray(values, dtype=np.float64)
+    edges = compute_bin_edges(values, n_bins)
+    # the bins are closed on the right, as with pd.cut
+    codes = np.searchsorted(edges, values, side='left') - 1
+    codes[np.isnan(values)] = n_bins
+    midpoints = np.append(compute_bin_midpoints(edges), np.nan)
+    return midpoints[codes]
+
+
+def bin_numeric_feature(series, n_bins=N_BINS, max_distinct_values=MAX_DISTINCT_VALUES):
+    """
+    returns the values of a numeric feature, binned into n_bins bin
+    midpoints when it has more than max_distinct_values distinct values,
+    with the same bins as pd.cut
+    """
+    if not has_many_values(series.to_numpy(), max_distinct_values):
+        return series
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    if np.isinf(values).any():
+        raise ValueError("cannot specify integer `bins` when input data contains infinity")
+    return pd.Series(bin_values(values, n_bins), index=series.index, name=series.name)
@@ -0,0 +1,66 @@
+"""
+Reduces the Actual vs Expected data, which holds the test set along with
+one column of base predictions per feature, to what the aggregations need:
+the integer codes of the binned values of each feature, the values the codes
+stand for and float32 vectors, so that the data kept by the webapp takes
+a few bytes per row and feature instead of Python objects.
+"""
+
+import numpy as np
+from glm_summary.graph_utils import prepare_ave_data, encode_feature, aggregate_codes
+
+SUMMED_COLUMNS = ['weighted_target', 'weighted_prediction', 'weight']
+
+
+def get_code_dtype(n_values):
+    """
+    returns the smallest of int16 and int32 holding the codes
+    of n_values distinct values, -1 marking missing values
+    """
+    if n_values <= np.iinfo(np.int16).max:
+        return np.int16
+    return np.int32
+
+
+class CompactAveData:
+    """
+    Codes and labels of each feature, with the summed vectors stored as float32
+    """
+    def __init__(self, codes, labels, summed_columns, weighted_bases, weight_dtype):
+        self.codes = codes
+        self.labels = labels
+        self.summed_columns = summed_columns
+        self.weighted_bases = weighted_bases
+        self.weight_dtype = weight_dtype
+
+    @classmethod
+    def from_ave_data(cls, ave_data, target, weight, class_map):
+        """
+        encodes the data returned by get_ave_data, which
+        can be released afterwards
+        """
+        features, summed_columns = prepare_ave_data(ave_data, target, weight, class_map)
+        codes, labels, weighted_bases = dict(), dict(), dict()
+        for feature in features:
+            feature_codes, labels[feature], weighted_base = encode_feature(ave_data, feature, summed_columns)
+            codes[feature] = feature_codes.astype(get_code_dtype(len(labels[feature])))
+            weighted_bases[feature] = weighted_base.astype(np.float32)
+        summed_columns = {column: summed_columns[column].astype(np.float32) for column in SUMMED_COLUMNS}
+        return cls(codes, labels, summed_columns, weighted_bases, ave_data['weight'].dtype)
+
+    @property
+    def features(self):
+        return list(self.codes.keys())
+
+    @property
+    def nbytes(self):
+        arrays = list(self.codes.values()) + list(self.summed_columns.values()) + list(self.weighted_bases.values())
+        return sum(array.nbytes for array in arrays)
+
+    def get_feature_ave(self, feature):
+        """
+        returns the Actual vs Expected table of a feature, as get_ave_grouped
+        up to the float32 rounding of the summed values
+        """
+        return aggregate_codes(self.codes[feature], self.labels[feature], feature, self.summed_columns,
+                               self.weighted_bases[feature], self.weight_dtype)
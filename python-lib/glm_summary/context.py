@@ -0,0 +1,56 @@
+"""
+Shares the model handler, the predictor and the DataFrames of a model
+version between the GLM Summary webapp and its utilities: each of them is
+loaded at most once, on first use, and the DataFrames can be released once
+the summary is computed.
+"""
+
+import threading
+
+
+class SummaryContext:
+    """
+    load_model_handler returns the PredictionModelInformationHandler
+    of a full model id
+    """
+    def __init__(self, full_model_id, load_model_handler):
+        self.full_model_id = full_model_id
+        self.load_model_handler = load_model_handler
+        # reentrant, loading the predictor loads the model handler
+        self.lock = threading.RLock()
+        self.loaded = dict()
+
+    def get(self, name, load):
+        with self.lock:
+            if name not in self.loaded:
+                self.loaded[name] = load()
+            return self.loaded[name]
+
+    @property
+    def model_handler(self):
+        return self.get('model_handler', lambda: self.load_model_handler(self.full_model_id))
+
+    @property
+    def predictor(self):
+        return self.get('predictor', lambda: self.model_handler.get_predictor())
+
+    def use_full_df(self):
+        return self.get('use_full_df', lambda: self.model_handler.use_full_df())
+
+    def get_full_df(self):
+        return self.get('full_df', lambda: self.model_handler.get_full_df()[0])
+
+    def get_train_df(self):
+        return self.get('train_df', lambda: self.model_handler.get_train_df()[0])
+
+    def get_test_df(self):
+        return self.get('test_df', lambda: self.model_handler.get_test_df()[0])
+
+    def release_data(self):
+        """
+        drops the DataFrames, the model handler and
+        the predictor being kept
+        """
+        with self.lock:
+            for name in ['full_df', 'train_df', 'test_df']:
+                self.loaded.pop(name, None)
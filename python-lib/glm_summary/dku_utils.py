@@ -3,28 +3,48 @@ from dataiku import pandasutils as pdu
 from dataiku.doctor.posttraining.model_information_handler import PredictionModelInformationHandler
 import pandas as pd
 from glm_summary.graph_utils import compute_base_predictions
+from glm_summary.metrics import compute_glm_metrics
+from glm_summary.context import SummaryContext
 
 
-def get_original_model_handler(webapp_config):
+def get_full_model_id(webapp_config):
     fmi = webapp_config.get("trainedModelFullModelId")
     if fmi is None:
         model = dataiku.Model(webapp_config["modelId"])
         version_id = webapp_config.get("versionId")
         fmi = "S-{project_key}-{model_id}-{version_id}".format(project_key=model.project_key, model_id=model.get_id(), version_id=version_id)
-    original_model_handler = PredictionModelInformationHandler.from_full_model_id(fmi)
-    return original_model_handler
+    return fmi
 
-def get_ave_data(webapp_config):
+
+def get_summary_context(webapp_config):
+    """
+    :return: the context sharing the model handler, predictor and
+    DataFrames of the model version of the webapp.
+    """
+    return SummaryContext(get_full_model_id(webapp_config), PredictionModelInformationHandler.from_full_model_id)
+
+
+def get_model_metrics(context):
+    """
+    :return: the metrics of the model on its train set, see compute_glm_metrics.
+    """
+    predictor = context.predictor
+    df = context.get_train_df()
+    transformed_X, _, _, valid_y = predictor.preprocessing.preprocess(df, with_target=True,)
+    return compute_glm_metrics(predictor._clf, transformed_X, valid_y)
+
+
+def get_ave_data(context):
     """
     :return: all the data necessary to build the
     Actual versus Expected graphs.
     """
-    model_handler = get_original_model_handler(webapp_config)
-    predictor = model_handler.get_predictor()
-    if model_handler.use_full_df():
-        test_df = model_handler.get_full_df()[0]
+    model_handler = context.model_handler
+    predictor = context.predictor
+    if context.use_full_df():
+        test_df = context.get_full_df()
     else:
-        test_df = model_handler.get_test_df()[0]
+        test_df = context.get_test_df()
     predicted = predictor.predict(test_df)
     class_map = None
     prediction_type = model_handler.get_prediction_type()
@@ -33,10 +53,10 @@ def get_ave_data(webapp_config):
         other_class = predicted.columns[2].split('_')[1]
         class_map = {base_class: 0, other_class: 1}
         predicted = pd.Series([class_map[prediction] for prediction in predicted['prediction']], name='prediction')
-    if model_handler.use_full_df():
-        train_df = model_handler.get_full_df()[0]
+    if context.use_full_df():
+        train_df = context.get_full_df()
     else:
-        train_df = model_handler.get_train_df()[0]
+        train_df = context.get_train_df()
     base_predictions = compute_base_predictions(train_df, test_df, predictor, class_map)
     ave_data = pd.concat([test_df, predicted, base_predictions], axis=1)
     target_variable = model_handler.get_target_variable()
@@ -0,0 +1,137 @@
+"""
+Builds the base, predicted and ratio graphs of the GLM Summary webapp and
+caches them per model version and feature, so that the three graphs of a
+feature are built once and switching back to a feature costs no rendering.
+When the graphs are rendered in the browser, the tables are encoded once
+for assets/ave_graphs.js instead.
+"""
+
+import base64
+import threading
+import numpy as np
+from pandas.api.types import is_numeric_dtype, is_bool_dtype
+from collections import OrderedDict
+from concurrent.futures import Future
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+PALETTE = '#D5D9D9', '#3075AE', '#ff7e0b'
+DEFAULT_CACHE_SIZE = 64
+ENCODED_COLUMNS = ['weighted_target', 'weighted_prediction', 'weight', 'weighted_base']
+
+
+def build_figure(data, feature, target, line_values, line_names, palette=PALETTE):
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(go.Bar(x=data[feature], y=data['weight'],
+                         name='weight',
+                         marker=dict(color=palette[0])),
+                  secondary_y=False)
+    for i, (name, values) in enumerate(zip(line_names, line_values)):
+        fig.add_trace(go.Scatter(x=data[feature], y=values,
+                                 mode='lines',
+                                 name=name,
+                                 line=dict(color=palette[i + 1])),
+                      secondary_y=True)
+    fig.update_layout(plot_bgcolor='rgba(0,0,0,0)')
+    fig.layout.yaxis.gridcolor = '#D7DBDE'
+    fig.layout.margin.t = 10
+    fig.update_xaxes(title=feature)
+    fig.update_yaxes(title='weight', secondary_y=False)
+    fig.update_yaxes(title=target, secondary_y=True)
+    return fig
+
+
+def build_feature_figures(feature_ave, feature, target, palette=PALETTE):
+    """
+    returns the base, predicted and ratio graphs of a feature
+    """
+    data = feature_ave.dropna()
+    base_figure = build_figure(data, feature, target, [data['weighted_target'], data['weighted_base']],
+                               ['target', 'base'], palette)
+    predicted_figure = build_figure(data, feature, target, [data['weighted_target'], data['weighted_prediction']],
+                                    ['target', 'prediction'], palette)
+    ratio_figure = build_figure(data, feature, target, [data['weighted_prediction'] / data['weighted_target']],
+                                ['actual/expected'], palette)
+    return {
+        'base': base_figure,
+        'predicted': predicted_figure,
+        'ratio': ratio_figure
+    }
+
+
+def encode_array(values, dtype):
+    """
+    returns the little endian bytes of the values in base64, which
+    the browser decodes into a typed array
+    """
+    return base64.b64encode(np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder('<')).tobytes()).decode()
+
+
+def encode_ave_tables(ave_grouped, target):
+    """
+    returns the tables of the features, without their incomplete rows, in
+    a compact columnar form: numeric feature values are sent as float64 and
+    the aggregates as float32, which is enough for display
+    """
+    tables = dict()
+    for feature, feature_ave in ave_grouped.items():
+        data = feature_ave.dropna()
+        values = data[feature]
+        is_numeric = is_numeric_dtype(values.dtype) and not is_bool_dtype(values.dtype)
+        table = {'numeric': is_numeric, 'x': encode_array(values, np.float64) if is_numeric else
+                 values.astype(str).tolist()}
+        table.update({column: encode_array(data[column], np.float32) for column in ENCODED_COLUMNS})
+        tables[feature] = table
+    return {'target': target, 'tables': tables}
+
+
+class FigureCache:
+    """
+    Least recently used cache of the figures of at most max_size keys.
+    A missing entry is built once, concurrent requests of the same key
+    waiting for the first one to build it
+    """
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.figures = OrderedDict()
+        self.pending = dict()
+        self.lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.figures
+
+    def __len__(self):
+        with self.lock:
+            return len(self.figures)
+
+    def get(self, key, build):
+        """
+        returns the cached figures of key, calling build when missing
+        """
+        with self.lock:
+            if key in self.figures:
+                self.figures.move_to_end(key)
+                return self.figures[key]
+            future = self.pending.get(key)
+            is_builder = future is None
+            if is_builder:
+                future = Future()
+                self.pending[key] = future
+        if not is_builder:
+            return future.result()
+
+        try:
+            figures = build()
+        except Exception as e:
+            with self.lock:
+                del self.pending[key]
+            future.set_exception(e)
+            raise
+        with self.lock:
+            del self.pending[key]
+            self.figures[key] = figures
+            while len(self.figures) > self.max_size:
+                self.figures.popitem(last=False)
+        future.set_result(figures)
+        return figures
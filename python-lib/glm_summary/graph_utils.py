@@ -1,5 +1,10 @@
+import numpy as np
 import pandas as pd
-from pandas.api.types import is_numeric_dtype
+from pandas.api.types import is_numeric_dtype, is_integer_dtype
+from generalized_linear_models.dku_glm import BaseGLM
+from glm_summary.binning import bin_numeric_feature
+
+DUMMY_PREFIX = 'dummy:'
 
 
 def compute_base_predictions(train_df, test_df, predictor, class_map=None):
@@ -8,13 +13,14 @@ def compute_base_predictions(train_df, test_df, predictor, class_map=None):
     all the features except the feature of interest are
     at their base value (the mode of their distribution)
     """
-    # categorize numeric variables
-    for feature in train_df.columns:
-        if is_numeric_dtype(train_df[feature].dtype):
-            if len(train_df[feature].unique()) > 20:
-                train_df[feature] = [(x.left + x.right) / 2 if isinstance(x, pd.Interval) else x for x in pd.cut(train_df[feature], bins=20)]
+    # categorize numeric variables, without modifying train_df
+    base_params = {col: (bin_numeric_feature(train_df[col]) if is_numeric_dtype(train_df[col].dtype) else
+                         train_df[col]).mode()[0] for col in train_df.columns}
 
-    base_params = {col: train_df[col].mode()[0] for col in train_df.columns}
+    if class_map is None:  # regression
+        base_predictions = compute_glm_base_predictions(base_params, test_df, predictor)
+        if base_predictions is not None:
+            return base_predictions
 
     # compute base predictions
     base_data = dict()
@@ -35,7 +41,74 @@ def compute_base_predictions(train_df, test_df, predictor, class_map=None):
     return base_predictions
 
 
+def get_label_feature(label, features):
+    """
+    returns the feature a preprocessed column is derived from, None when
+    the column is not the feature itself or one of its dummies
+    """
+    if label in features:
+        return label
+    if label.startswith(DUMMY_PREFIX):
+        # dummy labels are dummy:feature:value, where both the feature and the value may contain ':'
+        candidates = [feature for feature in features if label.startswith(DUMMY_PREFIX + feature + ':')]
+        if len(candidates) > 0:
+            return max(candidates, key=len)
+    return None
+
+
+def get_feature_column_groups(column_labels, features):
+    """
+    returns, for each feature, the indices of the preprocessed
+    columns derived from it, None when a column cannot be attributed
+    """
+    column_groups = {feature: [] for feature in features}
+    for index, label in enumerate(column_labels):
+        feature = get_label_feature(label, column_groups)
+        if feature is None:
+            return None
+        column_groups[feature].append(index)
+    return [column_groups[feature] for feature in features]
+
+
+def compute_glm_base_predictions(base_params, test_df, predictor):
+    """
+    computes the base predictions of a GLM from its linear predictor: with the
+    other features at their base value, the linear predictor is the one of the
+    base row plus the change of the contribution of the feature of interest.
+    Returns None when the predictor is not a GLM or when its preprocessed
+    columns cannot be attributed to the features, the predictions are then
+    computed by scoring
+    """
+    clf = getattr(predictor, '_clf', None)
+    if not isinstance(clf, BaseGLM) or clf.column_labels is None:
+        return None
+    column_groups = get_feature_column_groups(clf.column_labels, list(test_df.columns))
+    if column_groups is None:
+        return None
+
+    X = predictor.preprocessing.preprocess(test_df)[0]
+    base_df = pd.DataFrame({feature: [base_params[feature]] for feature in test_df.columns})
+    X_base = predictor.preprocessing.preprocess(base_df)[0]
+    if X.shape[0] != len(test_df) or X_base.shape[0] != 1:
+        # rows dropped by the preprocessing
+        return None
+
+    base_predictions = pd.DataFrame(clf.predict_base_targets(X, X_base, column_groups), index=test_df.index)
+    base_predictions.columns = 'base_' + test_df.columns
+    return base_predictions
+
+
 def get_ave_grouped(ave_data, target, weight, class_map):
+    feature_names, summed_columns = prepare_ave_data(ave_data, target, weight, class_map)
+    ave_grouped = {feature: get_feature_ave(ave_data, feature, summed_columns) for feature in feature_names}
+    return ave_grouped
+
+
+def prepare_ave_data(ave_data, target, weight, class_map):
+    """
+    adds the weighted columns to ave_data and returns the features
+    along with the columns summed by all of their aggregations
+    """
     if weight is None:
         ave_data['weight'] = 1
     else:
@@ -53,25 +126,65 @@ def get_ave_grouped(ave_data, target, weight, class_map):
                                                                                                      :5] == 'base_']
     feature_names = [feature for feature in ave_data.columns if feature not in excluded_columns]
 
-    # bin numerical features
-    for feature in feature_names:
-        ave_data['base_' + feature] = ave_data['base_' + feature] * ave_data['weight']
-        if is_numeric_dtype(ave_data[feature].dtype):
-            if len(ave_data[feature].unique()) > 20:
-                ave_data[feature] = [(x.left + x.right)/2 if isinstance(x, pd.Interval) else x for x in pd.cut(ave_data[feature], bins=20)]
-
-    ave_grouped = {feature: ave_data.rename(columns={'base_' + feature: 'weighted_base'}).groupby([feature]).agg(
-        {'weighted_target': 'sum',
-         'weighted_prediction': 'sum',
-         'weight': 'sum',
-         'weighted_base': 'sum'}).reset_index()
-                   for feature in feature_names}
-
-    for feature in ave_grouped:
-        ave_grouped[feature]['weighted_target'] = ave_grouped[feature]['weighted_target'] / ave_grouped[feature][
-            'weight']
-        ave_grouped[feature]['weighted_prediction'] = ave_grouped[feature]['weighted_prediction'] / \
-                                                      ave_grouped[feature]['weight']
-        ave_grouped[feature]['weighted_base'] = ave_grouped[feature]['weighted_base'] / ave_grouped[feature]['weight']
+    # the columns summed for every feature are extracted once
+    summed_columns = {column: get_summable_values(ave_data[column])
+                      for column in ['weighted_target', 'weighted_prediction', 'weight']}
+    return feature_names, summed_columns
 
-    return ave_grouped
+
+def get_feature_ave(ave_data, feature, summed_columns):
+    """
+    returns the Actual vs Expected table of a feature,
+    numerical features being binned first
+    """
+    codes, labels, weighted_base = encode_feature(ave_data, feature, summed_columns)
+    return aggregate_codes(codes, labels, feature, summed_columns, weighted_base, ave_data['weight'].dtype)
+
+
+def encode_feature(ave_data, feature, summed_columns):
+    """
+    returns the codes of the values of a feature in its sorted distinct
+    values, -1 for missing values, numerical features being binned first,
+    along with the sorted values and the weighted base predictions
+    """
+    feature_values = ave_data[feature]
+    if is_numeric_dtype(feature_values.dtype):
+        feature_values = bin_numeric_feature(feature_values)
+    codes, labels = pd.factorize(feature_values, sort=True)
+    return codes, labels, get_summable_values(ave_data['base_' + feature]) * summed_columns['weight']
+
+
+def get_summable_values(series):
+    """
+    returns the values as floats, missing values counting as 0 like in a pandas sum
+    """
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.where(np.isnan(values), 0., values)
+
+
+def aggregate_codes(codes, labels, feature, summed_columns, weighted_base, weight_dtype):
+    """
+    sums the columns for each code of the feature with bincount and divides
+    them by the summed weights, giving the same table as a groupby on the
+    feature, the codes indexing the sorted feature values labels and the
+    missing values, coded -1, being dropped
+    """
+    present = codes >= 0
+    has_missing = not present.all()
+    if has_missing:
+        codes = codes[present]
+    sums = dict()
+    for column, values in list(summed_columns.items()) + [('weighted_base', weighted_base)]:
+        if has_missing:
+            values = values[present]
+        sums[column] = np.bincount(codes, weights=values, minlength=len(labels))
+
+    weight = sums['weight']
+    grouped = pd.DataFrame({
+        feature: labels,
+        'weighted_target': sums['weighted_target'] / weight,
+        'weighted_prediction': sums['weighted_prediction'] / weight,
+        'weight': weight.astype(weight_dtype) if is_integer_dtype(weight_dtype) else weight,
+        'weighted_base': sums['weighted_base'] / weight
+    })
+    return grouped
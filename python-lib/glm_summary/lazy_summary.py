@@ -0,0 +1,153 @@
+"""
+Computes the data of the GLM Summary webapp in a background thread, so
+that the webapp serves its layout at once: the Actual vs Expected data and
+the model metrics are computed after startup, and the table of a feature is
+aggregated when the feature is first requested. The webapp polls the status
+to report the progress.
+"""
+
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from glm_summary.compact_data import CompactAveData
+
+
+class LazySummary:
+    """
+    load_ave_data returns (ave_data, target, weight, class_map) as
+    get_ave_data, compute_metrics returns the metrics of the model. Both
+    are run by a single background worker, along with the aggregations,
+    and release_data, when given, is called once both are done
+    """
+    def __init__(self, load_ave_data, compute_metrics, release_data=None):
+        self.load_ave_data = load_ave_data
+        self.compute_metrics = compute_metrics
+        self.release_data = release_data
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.lock = threading.Lock()
+        self.compact_data = None
+        self.features = None
+        self.target = None
+        self.metrics = None
+        self.ave_grouped = dict()
+        self.feature_futures = dict()
+        self.running_step = None
+        self.done_steps = 0
+        self.total_steps = 2
+        self.error = None
+        self.started = False
+        self.warmed_up = False
+
+    @classmethod
+    def from_tables(cls, ave_grouped, target, metrics):
+        """
+        returns a summary whose data is already computed
+        """
+        summary = cls(None, None)
+        summary.ave_grouped = dict(ave_grouped)
+        summary.features = list(ave_grouped.keys())
+        summary.target = target
+        summary.metrics = metrics
+        summary.done_steps = summary.total_steps
+        summary.started = True
+        return summary
+
+    def start(self):
+        with self.lock:
+            if self.started:
+                return
+            self.started = True
+        self.executor.submit(self.run_step, 'Scoring the test set', self.prepare_data)
+        self.executor.submit(self.run_step, 'Computing the model metrics', self.prepare_metrics)
+        if self.release_data is not None:
+            self.executor.submit(self.release_data)
+
+    def run_step(self, label, step):
+        with self.lock:
+            if self.error is not None:
+                return
+            self.running_step = label
+        try:
+            step()
+        except Exception as e:
+            traceback.print_exc()
+            with self.lock:
+                self.error = str(e)
+        with self.lock:
+            self.running_step = None
+            self.done_steps += 1
+
+    def prepare_data(self):
+        """
+        loads the AvE data and only keeps its compact encoding
+        """
+        ave_data, target, weight, class_map = self.load_ave_data()
+        compact_data = CompactAveData.from_ave_data(ave_data, target, weight, class_map)
+        with self.lock:
+            self.compact_data, self.target = compact_data, target
+            self.features = compact_data.features
+
+    def prepare_metrics(self):
+        metrics = {name: float(value) for name, value in self.compute_metrics().items()}
+        with self.lock:
+            self.metrics = metrics
+
+    def aggregate(self, feature):
+        feature_ave = self.compact_data.get_feature_ave(feature)
+        with self.lock:
+            self.ave_grouped[feature] = feature_ave
+
+    def request_feature(self, feature):
+        """
+        queues the aggregation of a feature, once for each feature
+        """
+        with self.lock:
+            if feature is None or feature in self.ave_grouped or feature in self.feature_futures:
+                return
+            if self.features is None or feature not in self.features:
+                return
+            self.total_steps += 1
+            self.feature_futures[feature] = self.executor.submit(self.run_step, 'Aggregating ' + str(feature),
+                                                                 lambda: self.aggregate(feature))
+
+    def warm_up(self, features, render=None):
+        """
+        queues the aggregation of the features followed, when render is
+        given, by a call to render for each of them, once the summary data
+        is ready. Only the first call has an effect
+        """
+        with self.lock:
+            if self.warmed_up:
+                return
+            self.warmed_up = True
+        for feature in features:
+            self.request_feature(feature)
+            if render is None:
+                continue
+            with self.lock:
+                if self.features is None or feature not in self.features:
+                    continue
+                self.total_steps += 1
+            self.executor.submit(self.run_step, 'Rendering ' + str(feature), lambda feature=feature: render(feature))
+
+    def get_feature_ave(self, feature):
+        """
+        returns the table of the feature, None while it is not computed
+        """
+        with self.lock:
+            return self.ave_grouped.get(feature)
+
+    def get_status(self):
+        """
+        returns the progress of the computations as a JSON serializable dict
+        """
+        with self.lock:
+            return {
+                'progress': int(100 * self.done_steps / self.total_steps),
+                'running_step': self.running_step,
+                'done': self.done_steps == self.total_steps or self.error is not None,
+                'error': self.error,
+                'features': self.features,
+                'ready_features': list(self.ave_grouped.keys()),
+                'metrics': self.metrics
+            }
@@ -0,0 +1,88 @@
+"""
+Computes the goodness of fit metrics of a fitted GLM, scoring the design
+matrix once, chunk by chunk: the deviance and the Pearson statistic are
+accumulated while scoring, then the log-likelihood, which needs the
+dispersion estimated on all the rows, and the null deviance are summed
+from the kept predictions without scoring again. AIC and BIC are derived
+from the log-likelihood as glum does.
+"""
+
+import numpy as np
+from scipy import sparse
+from generalized_linear_models.scorer import DEFAULT_CHUNK_SIZE
+
+
+def count_parameters(coef):
+    """
+    counts the nonzero coefficients and the intercept, as glum
+    does for the degrees of freedom of its information criteria
+    """
+    coef = np.asarray(coef)
+    return int(np.sum(np.abs(coef) > np.finfo(coef.dtype).eps)) + 1
+
+
+def iter_chunks(n_rows, chunk_size):
+    for start in range(0, n_rows, chunk_size):
+        yield slice(start, min(start + chunk_size, n_rows))
+
+
+def predict_chunks(glm_model, X, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    yields the row slice and the predicted mean of each chunk of X, X holding
+    the offset and exposure columns, which are applied to the predictions
+    """
+    if sparse.issparse(X):
+        X = sparse.csr_matrix(X)
+    column_plan = glm_model.get_column_plan()
+    scorer = glm_model.get_scorer()
+    for rows in iter_chunks(X.shape[0], chunk_size):
+        X_chunk = X[rows]
+        offsets, exposures = column_plan.get_offsets_and_exposures(X_chunk)
+        offset = glm_model.compute_aggregate_offset(offsets, exposures)
+        yield rows, scorer.predict(column_plan.remove_fixed_columns(X_chunk), offset)
+
+
+def compute_glm_metrics(glm_model, X, y, sample_weight=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    returns the log-likelihood, deviance, dispersion, null deviance, AIC and BIC
+    of a fitted GLM on the preprocessed design matrix X, the dispersion being
+    the Pearson estimate used by glum and the null model predicting the
+    weighted mean of y
+    """
+    family = glm_model.family_glum_class
+    y = np.asarray(y, dtype=np.float64)
+    n_rows = len(y)
+    sample_weight = np.ones(n_rows) if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)
+
+    # scores X once, keeping only the predicted means
+    mu = np.empty(n_rows)
+    deviance = 0.
+    pearson = 0.
+    for rows, mu_chunk in predict_chunks(glm_model, X, chunk_size):
+        mu[rows] = mu_chunk
+        y_chunk, weight_chunk, mu_chunk = y[rows], sample_weight[rows], mu[rows]
+        deviance += family.deviance(y_chunk, mu_chunk, sample_weight=weight_chunk)
+        pearson += weight_chunk @ ((y_chunk - mu_chunk) ** 2 / family.unit_variance(mu_chunk))
+    weight_sum = sample_weight.sum()
+    dispersion = pearson / (weight_sum - 1)
+    null_mean = sample_weight @ y / weight_sum
+
+    log_likelihood = 0.
+    null_deviance = 0.
+    for rows in iter_chunks(n_rows, chunk_size):
+        y_chunk, weight_chunk = y[rows], sample_weight[rows]
+        log_likelihood += family.log_likelihood(y_chunk, mu[rows], sample_weight=weight_chunk,
+                                                dispersion=dispersion)
+        null_deviance += family.deviance(y_chunk, np.full(len(y_chunk), null_mean), sample_weight=weight_chunk)
+
+    n_params = count_parameters(glm_model.fitted_model.coef_)
+    return {
+        'log_likelihood': log_likelihood,
+        'deviance': deviance,
+        'dispersion': dispersion,
+        'null_deviance': null_deviance,
+        'aic': -2 * log_likelihood + 2 * n_params,
+        'bic': -2 * log_likelihood + np.log(n_rows) * n_params,
+        'n_params': n_params,
+        'n_observations': n_rows
+    }
@@ -13,6 +13,12 @@ class CustomPredictionAlgorithm(BaseCustomPredictionAlgorithm):
     def __init__(self, prediction_type=None, params=None):
 
         self.params = check_params(params)
+        if params.get('regularization_path'):
+            # the path replaces the penalty grid, so a single penalty
+            # grid point is left to DSS for each l1_ratio
+            params['penalty_path'] = list(params['penalty'])
+            params['penalty'] = [max(params['penalty'])]
+            self.params.penalty = params['penalty']
         self.clf = RegressionGLM(**params)
         super(CustomPredictionAlgorithm, self).__init__(prediction_type, self.params)
 
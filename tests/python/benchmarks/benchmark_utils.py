@@ -0,0 +1,39 @@
+import os
+import timeit
+import numpy as np
+
+# raise to 10000000 to reproduce the figures quoted in the pull requests
+MAX_ROWS = int(os.environ.get('GLM_BENCHMARK_MAX_ROWS', 100000))
+
+
+def batch_sizes(sizes):
+    return [size for size in sizes if size <= MAX_ROWS]
+
+
+def best_time(func, repeat=5):
+    """
+    returns the best time of one call to func, in seconds
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def percentile_time(func, percentile=99, n_calls=2000):
+    """
+    returns the given percentile of the time of one call to func, in seconds
+    """
+    timings = np.empty(n_calls)
+    for i in range(n_calls):
+        start = timeit.default_timer()
+        func()
+        timings[i] = timeit.default_timer() - start
+    return np.percentile(timings, percentile)
+
+
+def report(title, header, rows):
+    print()
+    print(title)
+    print(' | '.join(f'{column:>14}' for column in header))
+    for row in rows:
+        print(' | '.join(f'{value:>14.6g}' if isinstance(value, float) else f'{value:>14}' for value in row))
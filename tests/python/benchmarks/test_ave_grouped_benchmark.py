@@ -0,0 +1,29 @@
+import timeit
+import numpy as np
+import pandas as pd
+from glm_summary.graph_utils import get_ave_grouped
+from testing_utils import groupby_ave_grouped
+from benchmark_utils import MAX_ROWS, report
+
+
+def test_bincount_aggregation_against_groupby():
+    rng = np.random.default_rng(0)
+    n_features = 100
+    columns = {'f' + str(i): rng.integers(0, 20, size=MAX_ROWS) for i in range(n_features)}
+    columns.update({'target': rng.poisson(1., size=MAX_ROWS), 'prediction': rng.uniform(size=MAX_ROWS)})
+    columns.update({'base_f' + str(i): rng.uniform(size=MAX_ROWS) for i in range(n_features)})
+    ave_data = pd.DataFrame(columns)
+
+    groupby_data = ave_data.copy()
+    start = timeit.default_timer()
+    expected = groupby_ave_grouped(groupby_data, 'target')
+    groupby_time = timeit.default_timer() - start
+
+    start = timeit.default_timer()
+    ave_grouped = get_ave_grouped(ave_data, 'target', None, None)
+    bincount_time = timeit.default_timer() - start
+
+    for feature in ave_grouped:
+        pd.testing.assert_frame_equal(ave_grouped[feature], expected[feature], check_exact=False, rtol=1e-12)
+    report(str(n_features) + ' features, ' + str(MAX_ROWS) + ' rows', ['groupby (s)', 'bincount (s)', 'speedup'],
+           [[groupby_time, bincount_time, groupby_time / bincount_time]])
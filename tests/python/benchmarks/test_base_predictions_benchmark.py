@@ -0,0 +1,48 @@
+import timeit
+import numpy as np
+import pandas as pd
+from generalized_linear_models.dku_glm import RegressionGLM
+from glm_summary.graph_utils import compute_base_predictions
+from benchmark_utils import MAX_ROWS, report
+
+
+class Preprocessing:
+    def preprocess(self, df):
+        return df.to_numpy(dtype=np.float64), df.index
+
+
+class Predictor:
+    def __init__(self, clf):
+        self._clf = clf
+        self.preprocessing = Preprocessing()
+
+    def predict(self, df):
+        return pd.DataFrame({'prediction': self._clf.predict(self.preprocessing.preprocess(df)[0])}, index=df.index)
+
+
+class ScoringPredictor:
+    def __init__(self, predictor):
+        self.predict = predictor.predict
+
+
+def test_analytical_base_predictions_against_scoring():
+    rng = np.random.default_rng(0)
+    n_rows, n_features = min(MAX_ROWS, 200000), 30
+    df = pd.DataFrame(rng.integers(0, 5, size=(n_rows, n_features)).astype(float),
+                      columns=['x' + str(i) for i in range(n_features)])
+    y = rng.poisson(np.exp(df.to_numpy() @ np.full(n_features, 0.02)))
+    clf = RegressionGLM(penalty=0.001, l1_ratio=0.5, family_name='poisson', poisson_link='log',
+                        column_labels=list(df.columns))
+    clf.fit(df.to_numpy(), y)
+    predictor = Predictor(clf)
+
+    start = timeit.default_timer()
+    scored = compute_base_predictions(df.copy(), df, ScoringPredictor(predictor))
+    scoring_time = timeit.default_timer() - start
+    start = timeit.default_timer()
+    analytical = compute_base_predictions(df.copy(), df, predictor)
+    analytical_time = timeit.default_timer() - start
+
+    pd.testing.assert_frame_equal(analytical, scored, rtol=1e-12)
+    report(str(n_features) + ' features, ' + str(n_rows) + ' rows', ['scoring (s)', 'analytical (s)', 'speedup'],
+           [[scoring_time, analytical_time, scoring_time / analytical_time]])
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+from glm_summary.compact_data import CompactAveData
+from benchmark_utils import MAX_ROWS, best_time, report
+
+
+def test_compact_data_memory():
+    rng = np.random.default_rng(0)
+    n_numeric, n_categorical = 10, 10
+    columns = {'num' + str(i): rng.normal(size=MAX_ROWS) for i in range(n_numeric)}
+    columns.update({'cat' + str(i): rng.choice(['level_' + str(j) for j in range(30)], size=MAX_ROWS).astype(object)
+                    for i in range(n_categorical)})
+    features = list(columns.keys())
+    columns.update({'target': rng.poisson(1., size=MAX_ROWS).astype(np.float64),
+                    'prediction': rng.uniform(size=MAX_ROWS)})
+    columns.update({'base_' + feature: rng.uniform(size=MAX_ROWS) for feature in features})
+    ave_data = pd.DataFrame(columns)
+    ave_data_bytes = ave_data.memory_usage(deep=True).sum()
+
+    compact_data = CompactAveData.from_ave_data(ave_data.copy(), 'target', None, None)
+    aggregation_time = best_time(lambda: [compact_data.get_feature_ave(feature) for feature in features], repeat=3)
+    report(str(len(features)) + ' features, ' + str(MAX_ROWS) + ' rows',
+           ['AvE data (MiB)', 'compact (MiB)', 'ratio', 'all tables (s)'],
+           [[ave_data_bytes / 2 ** 20, compact_data.nbytes / 2 ** 20, ave_data_bytes / compact_data.nbytes,
+             aggregation_time]])
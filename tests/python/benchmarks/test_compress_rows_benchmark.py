@@ -0,0 +1,30 @@
+import timeit
+import numpy as np
+from generalized_linear_models.dku_glm import RegressionGLM
+from benchmark_utils import MAX_ROWS, report
+
+
+def test_compressed_fit_against_uncompressed_fit():
+    rng = np.random.default_rng(0)
+    n_rows = min(MAX_ROWS * 10, 1000000)
+    # dummy encoded rating factors and a binned exposure
+    levels = [rng.integers(0, n_levels, n_rows) for n_levels in [5, 4, 6, 3]]
+    X = np.column_stack([level == value for level, n_levels in zip(levels, [5, 4, 6, 3])
+                         for value in range(1, n_levels)] + [rng.choice([0.25, 0.5, 1.0], n_rows)]).astype(float)
+    y = rng.poisson(np.exp(X[:, :-1] @ rng.normal(scale=0.2, size=X.shape[1] - 1)) * X[:, -1])
+    column_labels = ['x' + str(i) for i in range(X.shape[1] - 1)] + ['exposure']
+
+    times = []
+    models = []
+    for compress_rows in [False, True]:
+        model = RegressionGLM(penalty=0.001, l1_ratio=0.5, family_name='poisson', poisson_link='log',
+                              offset_mode='OFFSETS/EXPOSURES', exposure_columns=['exposure'],
+                              column_labels=column_labels, compress_rows=compress_rows)
+        start = timeit.default_timer()
+        model.fit(X, y)
+        times.append(timeit.default_timer() - start)
+        models.append(model)
+
+    np.testing.assert_almost_equal(models[0].coef_, models[1].coef_, decimal=4)
+    report(str(n_rows) + ' rows, 1080 distinct rows', ['uncompressed (s)', 'compressed (s)', 'speedup'],
+           [[times[0], times[1], times[0] / times[1]]])
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from plotly.io import to_json
+from glm_summary.figures import FigureCache, build_feature_figures
+from benchmark_utils import best_time, report
+
+
+def test_figure_cache_against_rebuild():
+    rng = np.random.default_rng(0)
+    n_features, n_bins = 20, 20
+    tables = {'f' + str(i): pd.DataFrame({
+        'f' + str(i): np.arange(n_bins),
+        'weighted_target': rng.uniform(size=n_bins),
+        'weighted_prediction': rng.uniform(size=n_bins),
+        'weight': rng.integers(1, 1000, size=n_bins),
+        'weighted_base': rng.uniform(size=n_bins)}) for i in range(n_features)}
+    features = list(tables.keys())
+    cache = FigureCache()
+
+    # both include the serialization of the three figures sent by dash
+    def switch_rebuild():
+        for feature in features:
+            figures = build_feature_figures(tables[feature], feature, 'target')
+            for graph in ['base', 'predicted', 'ratio']:
+                to_json(figures[graph])
+
+    def switch_cached():
+        for feature in features:
+            for graph in ['base', 'predicted', 'ratio']:
+                to_json(cache.get(('model', feature),
+                                  lambda: build_feature_figures(tables[feature], feature, 'target'))[graph])
+
+    switch_cached()
+    rebuild_time = best_time(switch_rebuild, repeat=3) / n_features
+    cached_time = best_time(switch_cached) / n_features
+    report('dropdown switch, ' + str(n_bins) + ' bins', ['rebuild (s)', 'cached (s)', 'speedup'],
+           [[rebuild_time, cached_time, rebuild_time / cached_time]])
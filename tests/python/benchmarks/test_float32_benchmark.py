@@ -0,0 +1,29 @@
+import timeit
+import tracemalloc
+import numpy as np
+from generalized_linear_models.dku_glm import RegressionGLM
+from benchmark_utils import MAX_ROWS, report
+
+
+def test_float32_fit_against_float64_fit():
+    rng = np.random.default_rng(0)
+    n_rows, n_features = min(MAX_ROWS, 200000), 200
+    # dummy columns as produced by the feature handling of categorical variables
+    X = (rng.uniform(size=(n_rows, n_features)) < 0.1).astype(np.float32)
+    y = rng.poisson(np.exp(X @ rng.normal(scale=0.05, size=n_features)))
+    column_labels = ['x' + str(i) for i in range(n_features)]
+
+    rows = []
+    for dtype in ['float64', 'float32']:
+        model = RegressionGLM(penalty=0.001, l1_ratio=0.5, family_name='poisson', poisson_link='log',
+                              column_labels=column_labels, dtype=dtype)
+        tracemalloc.start()
+        start = timeit.default_timer()
+        model.fit(X, y)
+        fit_time = timeit.default_timer() - start
+        peak_memory = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+        rows.append([dtype, fit_time, peak_memory])
+
+    report(str(n_rows) + ' rows, ' + str(n_features) + ' dummy columns, input in float32',
+           ['dtype', 'fit (s)', 'peak (MiB)'], rows)
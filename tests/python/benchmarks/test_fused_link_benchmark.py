@@ -0,0 +1,64 @@
+import functools
+import numpy as np
+from numpy.testing import assert_allclose
+import generalized_linear_models.link as link
+from generalized_linear_models.dku_glm import RegressionGLM
+from generalized_linear_models.streaming import StreamingIRLS
+from benchmark_utils import MAX_ROWS, best_time, report
+
+
+def separate_inverse_and_derivative(link_instance):
+    # the two calls StreamingIRLS made before the fused methods
+    return functools.partial(link.Logit.inverse_and_derivative, link_instance)
+
+
+def test_fused_inverse_and_derivative():
+    rng = np.random.default_rng(0)
+    rows = []
+    for link_instance, z in [(link.CLogLog(), rng.normal(size=MAX_ROWS)),
+                             (link.LogLog(), rng.normal(size=MAX_ROWS)),
+                             (link.InversePower(), rng.uniform(0.1, 5, MAX_ROWS)),
+                             (link.NegativeBinomial(), rng.uniform(-5, -0.1, MAX_ROWS))]:
+        separate = separate_inverse_and_derivative(link_instance)
+        for fused_value, separate_value in zip(link_instance.inverse_and_derivative(z), separate(z)):
+            assert_allclose(fused_value, separate_value, rtol=1e-10)
+        separate_time = best_time(lambda: separate(z), repeat=3)
+        fused_time = best_time(lambda: link_instance.inverse_and_derivative(z), repeat=3)
+        rows.append([type(link_instance).__name__, separate_time * 1e3, fused_time * 1e3, separate_time / fused_time])
+    report('inverse link and derivative, ' + str(MAX_ROWS) + ' elements',
+           ['link', 'separate (ms)', 'fused (ms)', 'speedup'], rows)
+
+
+def test_fused_streaming_irls_pass():
+    rng = np.random.default_rng(0)
+    n_features = 5
+    X = rng.uniform(0, 1, size=(MAX_ROWS, n_features))
+    mu = -1 / (1 - np.exp(-(-2 + X @ rng.uniform(-0.5, 0.5, n_features))))
+    y = rng.negative_binomial(1, 1 / (1 + mu)).astype(float)
+    column_labels = ['x' + str(i) for i in range(n_features)]
+
+    def get_chunks():
+        for start in range(0, MAX_ROWS, 65536):
+            yield X[start:start + 65536], y[start:start + 65536]
+
+    rows = []
+    for family_name, links in [('negative_binomial', {'negative_binomial_link': 'cloglog'}),
+                               ('negative_binomial', {'negative_binomial_link': 'negative_binomial'})]:
+        model = RegressionGLM(penalty=0.0, l1_ratio=0, family_name=family_name, offset_mode='BASIC',
+                              column_labels=column_labels, **links)
+        fused_irls = StreamingIRLS(model)
+        separate_irls = StreamingIRLS(model)
+        separate_irls.link.inverse_and_derivative = separate_inverse_and_derivative(separate_irls.link)
+        column_plan = model.build_column_plan(n_features)
+        coef, intercept = np.zeros(n_features), -2.
+
+        def irls_pass(irls):
+            return irls.accumulate(get_chunks, column_plan, coef, intercept)
+
+        assert_allclose(irls_pass(fused_irls)[1], irls_pass(separate_irls)[1], rtol=1e-10)
+        separate_time = best_time(lambda: irls_pass(separate_irls), repeat=3)
+        fused_time = best_time(lambda: irls_pass(fused_irls), repeat=3)
+        rows.append([family_name + '/' + links['negative_binomial_link'], separate_time * 1e3, fused_time * 1e3,
+                     separate_time / fused_time])
+    report('streaming IRLS pass, ' + str(MAX_ROWS) + ' rows',
+           ['family/link', 'separate (ms)', 'fused (ms)', 'speedup'], rows)
@@ -0,0 +1,48 @@
+import numpy as np
+import scipy.stats
+from numpy.testing import assert_allclose
+from statsmodels.tools.numdiff import _approx_fprime_scalar
+from generalized_linear_models.link import CDFLink, Probit, Cauchy
+from benchmark_utils import MAX_ROWS, batch_sizes, best_time, report
+
+
+def test_closed_form_second_derivatives_against_numdiff():
+    rng = np.random.default_rng(0)
+    p = rng.uniform(0.01, 0.99, MAX_ROWS)
+    z = rng.normal(size=MAX_ROWS)
+    rows = []
+    for link in [Probit(), Cauchy()]:
+        # the numerical differentiation the links used before the closed forms
+        def numdiff_derivative2():
+            return _approx_fprime_scalar(p, link.derivative, centered=True)
+
+        def numdiff_inverse_derivative2():
+            return _approx_fprime_scalar(z, link.dbn.pdf, centered=True)
+
+        assert_allclose(link.derivative2(p), numdiff_derivative2(), rtol=1e-4)
+        assert_allclose(link.inverse_derivative2(z), numdiff_inverse_derivative2(), rtol=1e-4, atol=1e-10)
+        for name, numdiff, closed_form in [('derivative2', numdiff_derivative2, lambda: link.derivative2(p)),
+                                           ('inverse_derivative2', numdiff_inverse_derivative2,
+                                            lambda: link.inverse_derivative2(z))]:
+            numdiff_time = best_time(numdiff, repeat=3)
+            closed_form_time = best_time(closed_form, repeat=3)
+            rows.append([type(link).__name__, name, numdiff_time, closed_form_time, numdiff_time / closed_form_time])
+    report('second derivatives of the links, ' + str(MAX_ROWS) + ' elements',
+           ['link', 'method', 'numdiff (s)', 'closed form (s)', 'speedup'], rows)
+
+
+def test_fast_paths_against_scipy_stats():
+    rows = []
+    for link, dbn in [(Probit(), scipy.stats.norm), (Cauchy(), scipy.stats.cauchy)]:
+        generic_link = CDFLink(dbn=dbn)
+        for size in batch_sizes([100, 10000, 1000000, 10000000]):
+            rng = np.random.default_rng(0)
+            p = rng.uniform(0.01, 0.99, size)
+            z = link.link(p)
+            for method, values in [('link', p), ('inverse', z), ('derivative', p), ('inverse_derivative', z)]:
+                generic_time = best_time(lambda: getattr(generic_link, method)(values), repeat=3)
+                fast_time = best_time(lambda: getattr(link, method)(values), repeat=3)
+                rows.append([type(link).__name__, method, size, generic_time * 1e6, fast_time * 1e6,
+                             size / fast_time / 1e6, generic_time / fast_time])
+    report('scipy.special fast paths against scipy.stats',
+           ['link', 'method', 'elements', 'scipy.stats (us)', 'fast path (us)', 'Melements/s', 'speedup'], rows)
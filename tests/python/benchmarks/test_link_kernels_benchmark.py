@@ -0,0 +1,32 @@
+import pytest
+import numpy as np
+from numpy.testing import assert_allclose
+import generalized_linear_models.link as link
+from generalized_linear_models import link_kernels
+from benchmark_utils import MAX_ROWS, best_time, report
+
+POWER_METHODS = ['link', 'inverse', 'derivative', 'inverse_derivative']
+COMPILED_METHODS = ([(link.InversePower(), method) for method in POWER_METHODS]
+                    + [(link.InverseSquared(), method) for method in POWER_METHODS]
+                    + [(link.Cauchy(), 'inverse_derivative'), (link.NegativeBinomial(), 'derivative')])
+
+
+@pytest.mark.skipif(not link_kernels.ENABLED, reason='numba is not installed')
+def test_compiled_link_kernels(monkeypatch):
+    rng = np.random.default_rng(0)
+    rows = []
+    for link_instance, method in COMPILED_METHODS:
+        values = rng.normal(size=MAX_ROWS) if isinstance(link_instance, link.Cauchy) else rng.uniform(0.1, 5, MAX_ROWS)
+        func = getattr(link_instance, method)
+        out = np.empty_like(values)
+        # compiles the kernel before timing it
+        compiled_value = func(values)
+        compiled_time = best_time(lambda: func(values, out=out), repeat=3)
+        with monkeypatch.context() as patch:
+            patch.setattr(link_kernels, 'ENABLED', False)
+            assert_allclose(compiled_value, func(values), rtol=1e-12)
+            numpy_time = best_time(lambda: func(values, out=out), repeat=3)
+        rows.append([type(link_instance).__name__ + '.' + method, numpy_time * 1e3, compiled_time * 1e3,
+                     numpy_time / compiled_time])
+    report('compiled link kernels, ' + str(MAX_ROWS) + ' elements, ' + str(link_kernels.N_THREADS) + ' threads',
+           ['link.method', 'numpy (ms)', 'compiled (ms)', 'speedup'], rows)
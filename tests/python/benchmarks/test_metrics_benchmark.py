@@ -0,0 +1,32 @@
+import timeit
+import numpy as np
+from numpy.testing import assert_allclose
+from generalized_linear_models.dku_glm import RegressionGLM
+from glm_summary.metrics import compute_glm_metrics
+from benchmark_utils import MAX_ROWS, report
+
+
+def test_single_pass_metrics_against_glum_calls():
+    rng = np.random.default_rng(0)
+    n_features = 50
+    X = rng.normal(size=(MAX_ROWS, n_features)) / np.sqrt(n_features)
+    y = rng.gamma(2., np.exp(0.5 + X @ rng.normal(size=n_features) * 0.1) / 2.)
+    regression_model = RegressionGLM(penalty=0.0, l1_ratio=0, family_name='gamma', gamma_link='log',
+                                     offset_mode='BASIC', column_labels=['x' + str(i) for i in range(n_features)])
+    regression_model.fit(X, y)
+    fitted_model = regression_model.fitted_model
+
+    # the metrics table of the webapp before the metrics module
+    start = timeit.default_timer()
+    bic = fitted_model.bic(X, y)
+    aic = fitted_model.aic(X, y)
+    deviance = regression_model.family_glum_class.deviance(y, fitted_model.predict(X))
+    glum_time = timeit.default_timer() - start
+
+    start = timeit.default_timer()
+    metrics = compute_glm_metrics(regression_model, X, y)
+    single_pass_time = timeit.default_timer() - start
+
+    assert_allclose([metrics['bic'], metrics['aic'], metrics['deviance']], [bic, aic, deviance], rtol=1e-10)
+    report('BIC, AIC and deviance, ' + str(MAX_ROWS) + ' rows', ['glum (s)', 'single pass (s)', 'speedup'],
+           [[glum_time, single_pass_time, glum_time / single_pass_time]])
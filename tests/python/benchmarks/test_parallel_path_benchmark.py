@@ -0,0 +1,32 @@
+import os
+import timeit
+import numpy as np
+import pytest
+from generalized_linear_models.dku_glm import RegressionGLM
+from benchmark_utils import MAX_ROWS, report
+
+N_JOBS = min(os.cpu_count() or 1, 8)
+
+
+@pytest.mark.skipif(N_JOBS < 2, reason="parallel fitting needs at least 2 cores")
+def test_parallel_path_against_serial_path():
+    rng = np.random.default_rng(0)
+    n_rows, n_features = min(MAX_ROWS, 200000), 50
+    X = rng.normal(size=(n_rows, n_features))
+    y = rng.poisson(np.exp(X[:, :5] @ np.full(5, 0.2)))
+    column_labels = ['x' + str(i) for i in range(n_features)]
+    penalties = list(np.geomspace(1, 1e-4, 20))
+    l1_ratios = [0.1, 0.5, 0.9]
+
+    times = []
+    for n_jobs in [1, N_JOBS]:
+        model = RegressionGLM(penalty=penalties[0], l1_ratio=l1_ratios, family_name='poisson', poisson_link='log',
+                              column_labels=column_labels, regularization_path=True, penalty_path=penalties,
+                              n_jobs=n_jobs)
+        start = timeit.default_timer()
+        model.fit(X, y)
+        times.append(timeit.default_timer() - start)
+        assert len(model.path_solutions_) == len(penalties) * len(l1_ratios)
+
+    report('60-point grid, ' + str(n_rows) + ' rows, ' + str(N_JOBS) + ' jobs', ['serial (s)', 'parallel (s)', 'speedup'],
+           [[times[0], times[1], times[0] / times[1]]])
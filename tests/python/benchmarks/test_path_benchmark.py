@@ -0,0 +1,29 @@
+import timeit
+import numpy as np
+from generalized_linear_models.dku_glm import RegressionGLM
+from benchmark_utils import MAX_ROWS, report
+
+
+def test_path_against_independent_fits():
+    rng = np.random.default_rng(0)
+    n_rows, n_features = min(MAX_ROWS, 200000), 50
+    X = rng.normal(size=(n_rows, n_features))
+    y = rng.poisson(np.exp(X[:, :5] @ np.full(5, 0.2)))
+    column_labels = ['x' + str(i) for i in range(n_features)]
+    penalties = list(np.geomspace(1, 1e-4, 20))
+
+    start = timeit.default_timer()
+    for penalty in penalties:
+        RegressionGLM(penalty=penalty, l1_ratio=0.5, family_name='poisson', poisson_link='log',
+                      column_labels=column_labels).fit(X, y)
+    independent_time = timeit.default_timer() - start
+
+    start = timeit.default_timer()
+    path_model = RegressionGLM(penalty=penalties[0], l1_ratio=0.5, family_name='poisson', poisson_link='log',
+                               column_labels=column_labels, regularization_path=True, penalty_path=penalties)
+    path_model.fit(X, y)
+    path_time = timeit.default_timer() - start
+
+    assert len(path_model.path_solutions_) == len(penalties)
+    report('20-point penalty grid, ' + str(n_rows) + ' rows', ['independent (s)', 'path (s)', 'speedup'],
+           [[independent_time, path_time, independent_time / path_time]])
@@ -0,0 +1,24 @@
+import numpy as np
+from glum import GeneralizedLinearRegressor
+from generalized_linear_models.scorer import GLMScorer
+from numpy.testing import assert_allclose
+from benchmark_utils import batch_sizes, best_time, report
+
+
+def test_scorer_against_glum_predict():
+    rng = np.random.default_rng(0)
+    n_features = 20
+    X_train = rng.normal(size=(2000, n_features))
+    y_train = rng.poisson(np.exp(0.1 * X_train[:, 0]))
+    model = GeneralizedLinearRegressor(family='poisson', link='log', alpha=0).fit(X_train, y_train)
+    scorer = GLMScorer(model.coef_, model.intercept_, 'log')
+
+    rows = []
+    for n_rows in batch_sizes([1, 10, 100, 1000, 10000, 100000, 1000000, 10000000]):
+        X = rng.normal(size=(n_rows, n_features))
+        assert_allclose(scorer.predict(X), model.predict(X), rtol=1e-12)
+        glum_time = best_time(lambda: model.predict(X))
+        native_time = best_time(lambda: scorer.predict(X))
+        rows.append([n_rows, glum_time * 1e6, native_time * 1e6, glum_time / native_time])
+
+    report('GLMScorer.predict vs glum predict', ['rows', 'glum (us)', 'native (us)', 'speedup'], rows)
@@ -0,0 +1,34 @@
+import numpy as np
+from generalized_linear_models.dku_glm import RegressionGLM
+from benchmark_utils import percentile_time, report
+
+
+def test_small_batch_latency():
+    rng = np.random.default_rng(0)
+    n_rows, n_features = 5000, 300
+    X = rng.binomial(1, 0.1, size=(n_rows, n_features)).astype(float)
+    X[:, 0] = rng.uniform(0.1, 1, size=n_rows)
+    y = rng.poisson(X[:, 0] * np.exp(0.2 * X[:, 1]))
+    column_labels = ['exposure'] + ['dummy:feature:' + str(i) for i in range(1, n_features - 1)] + ['dummy:feature:N/A']
+
+    regression_model = RegressionGLM(penalty=0.001, l1_ratio=1, family_name='poisson', poisson_link='log',
+                                     offset_mode='OFFSETS/EXPOSURES', exposure_columns=['exposure'],
+                                     column_labels=column_labels)
+    regression_model.fit(X, y)
+
+    def regular_path(batch):
+        column_plan = regression_model.get_column_plan()
+        offsets, exposures = column_plan.get_offsets_and_exposures(batch)
+        offset = regression_model.compute_aggregate_offset(offsets, exposures)
+        return regression_model.fitted_model.predict(column_plan.remove_fixed_columns(batch), offset=offset)
+
+    rows = []
+    for batch_size in [1, 8, 64]:
+        batch = X[:batch_size]
+        np.testing.assert_allclose(regression_model.predict(batch), regular_path(batch), rtol=1e-12)
+        glum_p99 = percentile_time(lambda: regular_path(batch))
+        fast_p99 = percentile_time(lambda: regression_model.predict(batch))
+        rows.append([batch_size, glum_p99 * 1e6, fast_p99 * 1e6])
+
+    report('p99 latency of predict on small batches', ['rows', 'glum (us)', 'fast path (us)'], rows)
+    assert rows[0][2] < 100
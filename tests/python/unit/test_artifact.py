@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+from numpy.testing import assert_array_equal
+from glm_summary.graph_utils import compute_base_predictions, get_ave_grouped
+from glm_summary.artifact import save_ave_artifact, load_ave_artifact, read_manifest
+from testing_utils import train_df, test_df, Predictor
+
+
+def build_ave_grouped():
+    predictor = Predictor()
+    predictor.fit(train_df)
+    base_predictions = compute_base_predictions(train_df.copy(), test_df, predictor)
+    predicted = predictor.predict(test_df)
+    ave_data = pd.concat([test_df, predicted, base_predictions], axis=1)
+    return get_ave_grouped(ave_data, 'Exposure', None, None)
+
+
+def test_artifact_round_trip(tmp_path):
+    ave_grouped = build_ave_grouped()
+    metrics = {'bic': 12.5, 'aic': np.float64(10.25), 'deviance': 3.}
+    save_ave_artifact(str(tmp_path), 'S-PROJECT-model-1', ave_grouped, 'Exposure', metrics)
+
+    loaded_grouped, target, loaded_metrics = load_ave_artifact(str(tmp_path), 'S-PROJECT-model-1')
+    assert target == 'Exposure'
+    assert loaded_metrics == {'bic': 12.5, 'aic': 10.25, 'deviance': 3.}
+    assert list(loaded_grouped.keys()) == list(ave_grouped.keys())
+    for feature, table in ave_grouped.items():
+        loaded_table = loaded_grouped[feature]
+        assert list(loaded_table.columns) == list(table.columns)
+        assert loaded_table[feature].astype(str).tolist() == table[feature].astype(str).tolist()
+        for column in table.columns[1:]:
+            assert_array_equal(np.asarray(loaded_table[column]), table[column].to_numpy())
+
+
+def test_artifact_several_models(tmp_path):
+    ave_grouped = build_ave_grouped()
+    save_ave_artifact(str(tmp_path), 'S-PROJECT-model-1', ave_grouped, 'Exposure', {'bic': 1.})
+    save_ave_artifact(str(tmp_path), 'S-PROJECT-model-2', {'Power': ave_grouped['Power']}, 'Exposure', {'bic': 2.})
+    assert set(read_manifest(str(tmp_path))['models']) == {'S-PROJECT-model-1', 'S-PROJECT-model-2'}
+    assert load_ave_artifact(str(tmp_path), 'S-PROJECT-model-1')[2] == {'bic': 1.}
+    assert list(load_ave_artifact(str(tmp_path), 'S-PROJECT-model-2')[0].keys()) == ['Power']
+
+
+def test_artifact_missing_model(tmp_path):
+    assert load_ave_artifact(str(tmp_path), 'S-PROJECT-model-1') is None
+    save_ave_artifact(str(tmp_path), 'S-PROJECT-model-1', build_ave_grouped(), 'Exposure', {})
+    assert load_ave_artifact(str(tmp_path), 'S-PROJECT-model-3') is None
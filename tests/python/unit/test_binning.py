@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from glm_summary.binning import bin_numeric_feature, has_many_values
+
+
+def pandas_binning(series):
+    if len(series.unique()) > 20:
+        return pd.Series([(x.left + x.right) / 2 if isinstance(x, pd.Interval) else x
+                          for x in pd.cut(series, bins=20)], index=series.index, name=series.name)
+    return series
+
+
+def test_binning_matches_pandas():
+    rng = np.random.default_rng(0)
+    with_missing = rng.normal(size=1000)
+    with_missing[::7] = np.nan
+    # values falling on the bin edges
+    on_edges = np.linspace(-3, 17, 21).repeat(3)
+    columns = {
+        'normal': rng.normal(size=1000),
+        'with_missing': with_missing,
+        'integers': rng.integers(0, 1000, size=1000),
+        'on_edges': on_edges,
+        'large': rng.lognormal(mean=10, sigma=2, size=1000),
+        'few_values': rng.integers(0, 20, size=1000).astype(float),
+        'few_values_with_missing': np.append(np.arange(20.), np.nan)
+    }
+    for name, values in columns.items():
+        series = pd.Series(values, name=name)
+        pd.testing.assert_series_equal(bin_numeric_feature(series), pandas_binning(series), check_dtype=False)
+
+
+def test_cardinality_check():
+    assert not has_many_values(np.arange(20))
+    assert has_many_values(np.arange(21))
+    assert has_many_values(np.append(np.zeros(5000), np.arange(21)))
+    assert has_many_values(np.append(np.arange(20.), np.nan))
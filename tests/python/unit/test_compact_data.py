@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+from glm_summary.compact_data import CompactAveData, get_code_dtype
+from glm_summary.graph_utils import compute_base_predictions, get_ave_grouped
+from testing_utils import train_df, test_df, Predictor
+
+
+def build_ave_data():
+    predictor = Predictor()
+    predictor.fit(train_df)
+    base_predictions = compute_base_predictions(train_df.copy(), test_df, predictor)
+    ave_data = pd.concat([test_df, predictor.predict(test_df), base_predictions], axis=1)
+    ave_data.loc[3, 'Region'] = None
+    ave_data.loc[5, 'prediction'] = None
+    ave_data.loc[7, 'base_Gas'] = None
+    return ave_data
+
+
+def test_compact_data_matches_ave_grouped():
+    ave_data = build_ave_data()
+    for weights in [None, 'DriverAge']:
+        compact_data = CompactAveData.from_ave_data(ave_data.copy(), 'Exposure', weights, None)
+        expected = get_ave_grouped(ave_data.copy(), 'Exposure', weights, None)
+        assert compact_data.features == list(expected.keys())
+        for feature in expected:
+            assert compact_data.codes[feature].dtype == np.int16
+            pd.testing.assert_frame_equal(compact_data.get_feature_ave(feature), expected[feature],
+                                          check_exact=False, rtol=1e-6)
+
+
+def test_compact_data_size():
+    ave_data = build_ave_data()
+    compact_data = CompactAveData.from_ave_data(ave_data.copy(), 'Exposure', None, None)
+    n_features = len(compact_data.features)
+    # 2 bytes of code and 4 bytes of base prediction per feature, 3 float32 vectors
+    assert compact_data.nbytes == len(ave_data) * (6 * n_features + 12)
+    assert compact_data.nbytes < ave_data.memory_usage(deep=True).sum() / 2
+
+
+def test_code_dtype():
+    assert get_code_dtype(20) == np.int16
+    assert get_code_dtype(32767) == np.int16
+    assert get_code_dtype(32768) == np.int32
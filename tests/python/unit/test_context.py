@@ -0,0 +1,67 @@
+import threading
+from glm_summary.context import SummaryContext
+from testing_utils import train_df, test_df
+
+
+class ModelHandler:
+    """
+    counts the loads of a PredictionModelInformationHandler
+    """
+    loads = []
+
+    def __init__(self, full_model_id, full_df=False):
+        self.full_model_id = full_model_id
+        self.full_df = full_df
+
+    def get_predictor(self):
+        self.loads.append('predictor')
+        return 'predictor'
+
+    def use_full_df(self):
+        return self.full_df
+
+    def get_train_df(self):
+        self.loads.append('train')
+        return train_df, True
+
+    def get_test_df(self):
+        self.loads.append('test')
+        return test_df, True
+
+    def get_full_df(self):
+        self.loads.append('full')
+        return train_df, True
+
+
+def test_context_loads_once():
+    ModelHandler.loads = []
+    handlers = []
+
+    def load_model_handler(full_model_id):
+        handlers.append(ModelHandler(full_model_id))
+        return handlers[-1]
+
+    context = SummaryContext('S-PROJECT-model-1', load_model_handler)
+    assert handlers == []
+    threads = [threading.Thread(target=lambda: (context.predictor, context.get_train_df(), context.get_test_df()))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(handlers) == 1
+    assert handlers[0].full_model_id == 'S-PROJECT-model-1'
+    assert sorted(ModelHandler.loads) == ['predictor', 'test', 'train']
+    assert context.get_train_df() is train_df
+
+
+def test_context_release_data():
+    ModelHandler.loads = []
+    context = SummaryContext('S-PROJECT-model-1', lambda full_model_id: ModelHandler(full_model_id, full_df=True))
+    assert context.use_full_df()
+    assert context.get_full_df() is context.get_full_df()
+    context.predictor
+    context.release_data()
+    context.predictor
+    context.get_full_df()
+    assert ModelHandler.loads == ['full', 'predictor', 'full']
@@ -0,0 +1,97 @@
+import base64
+import json
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.testing import assert_array_equal, assert_allclose
+from glm_summary.figures import FigureCache, build_feature_figures, encode_ave_tables
+
+feature_ave = pd.DataFrame({
+    'Power': ['d', 'e', 'f'],
+    'weighted_target': [0.5, 0.25, None],
+    'weighted_prediction': [0.4, 0.5, 0.6],
+    'weight': [10, 20, 30],
+    'weighted_base': [0.3, 0.3, 0.3]
+})
+
+
+def test_build_feature_figures():
+    figures = build_feature_figures(feature_ave, 'Power', 'Exposure')
+    assert [trace.name for trace in figures['base'].data] == ['weight', 'target', 'base']
+    assert [trace.name for trace in figures['predicted'].data] == ['weight', 'target', 'prediction']
+    assert [trace.name for trace in figures['ratio'].data] == ['weight', 'actual/expected']
+    # missing values are dropped
+    assert list(figures['base'].data[0].x) == ['d', 'e']
+    assert list(figures['ratio'].data[1].y) == [0.8, 2.]
+    assert figures['base'].layout.yaxis2.title.text == 'Exposure'
+
+
+def test_figure_cache_lru():
+    cache = FigureCache(max_size=2)
+    calls = []
+
+    def build(key):
+        calls.append(key)
+        return key
+    assert cache.get('a', lambda: build('a')) == 'a'
+    assert cache.get('b', lambda: build('b')) == 'b'
+    assert cache.get('a', lambda: build('a')) == 'a'
+    cache.get('c', lambda: build('c'))
+    assert len(cache) == 2
+    assert 'a' in cache and 'c' in cache and 'b' not in cache
+    assert calls == ['a', 'b', 'c']
+
+
+def test_figure_cache_builds_once():
+    cache = FigureCache()
+    calls = []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'figures'
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get('a', build))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['figures'] * 3
+    assert len(calls) == 1
+
+
+def test_figure_cache_failed_build():
+    cache = FigureCache()
+
+    def build():
+        raise ValueError('failed')
+    with pytest.raises(ValueError):
+        cache.get('a', build)
+    assert 'a' not in cache
+    assert cache.get('a', lambda: 'figures') == 'figures'
+
+
+def decode(encoded, dtype):
+    return np.frombuffer(base64.b64decode(encoded), dtype=np.dtype(dtype).newbyteorder('<'))
+
+
+def test_encode_ave_tables():
+    numeric_ave = pd.DataFrame({'CarAge': [1.5, 2.5, 3.5], 'weighted_target': [0.1, 0.2, 0.3],
+                                'weighted_prediction': [0.4, None, 0.6], 'weight': [10, 20, 30],
+                                'weighted_base': [0.3, 0.3, 0.3]})
+    encoded = encode_ave_tables({'Power': feature_ave, 'CarAge': numeric_ave}, 'Exposure')
+    assert encoded['target'] == 'Exposure'
+    json.dumps(encoded)
+
+    power = encoded['tables']['Power']
+    assert not power['numeric']
+    assert power['x'] == ['d', 'e']
+    assert_array_equal(decode(power['weight'], np.float32), [10, 20])
+    assert_allclose(decode(power['weighted_target'], np.float32), [0.5, 0.25], rtol=1e-7)
+
+    car_age = encoded['tables']['CarAge']
+    assert car_age['numeric']
+    assert_array_equal(decode(car_age['x'], np.float64), [1.5, 3.5])
+    assert_allclose(decode(car_age['weighted_prediction'], np.float32), [0.4, 0.6], rtol=1e-7)
@@ -1,6 +1,7 @@
 import pandas as pd
 from glm_summary.graph_utils import compute_base_predictions, get_ave_grouped
-from testing_utils import train_df, test_df, Predictor
+from testing_utils import train_df, test_df, Predictor, GLMPredictor, ScoringPredictor, groupby_ave_grouped
+from generalized_linear_models.dku_glm import RegressionGLM
 from numpy.testing import assert_almost_equal
 
 
@@ -61,3 +62,29 @@ def test_ave_grouped_weights():
                                      0.3129242680945556]}
     assert_almost_equal(ave_grouped['Power'].mean(numeric_only=True).tolist(), check_ave_grouped['Power'], decimal=12)
     assert_almost_equal(ave_grouped['Density'].mean(numeric_only=True).tolist(), check_ave_grouped['Density'], decimal=12)
+
+
+def test_glm_base_predictions():
+    clf = RegressionGLM(penalty=0.01, l1_ratio=0, family_name='gamma', gamma_link='log',
+                        offset_mode='OFFSETS/EXPOSURES', exposure_columns=['Density'])
+    predictor = GLMPredictor(clf, ['CarAge', 'DriverAge', 'Density'], ['Power', 'Gas', 'DriverAgeBin'], 'Exposure')
+    predictor.fit(train_df)
+    base_predictions = compute_base_predictions(train_df.copy(), test_df, predictor)
+    scored_base_predictions = compute_base_predictions(train_df.copy(), test_df, ScoringPredictor(predictor))
+    pd.testing.assert_frame_equal(base_predictions, scored_base_predictions, rtol=1e-12)
+
+
+def test_ave_grouped_matches_groupby():
+    predictor = Predictor()
+    predictor.fit(train_df)
+    base_predictions = compute_base_predictions(train_df.copy(), test_df, predictor)
+    ave_data = pd.concat([test_df, predictor.predict(test_df), base_predictions], axis=1)
+    ave_data.loc[3, 'Region'] = None
+    ave_data.loc[5, 'prediction'] = None
+    ave_data.loc[7, 'base_Gas'] = None
+    for weights in [None, 'DriverAge']:
+        ave_grouped = get_ave_grouped(ave_data.copy(), 'Exposure', weights, None)
+        expected = groupby_ave_grouped(ave_data.copy(), 'Exposure', weights)
+        assert list(ave_grouped.keys()) == list(expected.keys())
+        for feature in ave_grouped:
+            pd.testing.assert_frame_equal(ave_grouped[feature], expected[feature], check_exact=False, rtol=1e-12)
@@ -0,0 +1,61 @@
+import time
+import pandas as pd
+from glm_summary.graph_utils import compute_base_predictions, get_ave_grouped
+from glm_summary.lazy_summary import LazySummary
+from testing_utils import train_df, test_df, Predictor
+
+
+def load_ave_data():
+    predictor = Predictor()
+    predictor.fit(train_df)
+    base_predictions = compute_base_predictions(train_df.copy(), test_df, predictor)
+    ave_data = pd.concat([test_df, predictor.predict(test_df), base_predictions], axis=1)
+    return ave_data, 'Exposure', 'DriverAge', None
+
+
+def wait_until_done(summary, timeout=30):
+    start = time.time()
+    while not summary.get_status()['done']:
+        assert time.time() - start < timeout
+        time.sleep(0.01)
+    return summary.get_status()
+
+
+def test_lazy_summary():
+    summary = LazySummary(load_ave_data, lambda: {'bic': 1, 'aic': 2, 'deviance': 3})
+    assert summary.get_status()['features'] is None
+    summary.start()
+    status = wait_until_done(summary)
+    assert status['progress'] == 100
+    assert status['metrics'] == {'bic': 1., 'aic': 2., 'deviance': 3.}
+    assert status['ready_features'] == []
+    assert summary.get_feature_ave('Power') is None
+
+    expected = get_ave_grouped(*load_ave_data())
+    assert status['features'] == list(expected.keys())
+    summary.request_feature('Power')
+    summary.request_feature('Power')
+    summary.request_feature('unknown')
+    status = wait_until_done(summary)
+    assert status['ready_features'] == ['Power']
+    assert summary.total_steps == 3
+    pd.testing.assert_frame_equal(summary.get_feature_ave('Power'), expected['Power'], check_exact=False, rtol=1e-6)
+
+
+def test_lazy_summary_error():
+    def fail():
+        raise ValueError('GLM Summary is only available for GLMs')
+    summary = LazySummary(fail, lambda: {})
+    summary.start()
+    status = wait_until_done(summary)
+    assert status['error'] == 'GLM Summary is only available for GLMs'
+    assert status['features'] is None
+
+
+def test_lazy_summary_from_tables():
+    ave_grouped = get_ave_grouped(*load_ave_data())
+    summary = LazySummary.from_tables(ave_grouped, 'Exposure', {'bic': 1.})
+    summary.start()
+    status = summary.get_status()
+    assert status['done'] and status['progress'] == 100
+    assert status['ready_features'] == list(ave_grouped.keys())
@@ -0,0 +1,211 @@
+import sys
+import subprocess
+import tracemalloc
+import numpy as np
+import pytest
+import scipy.stats
+from numpy.testing import assert_allclose
+import generalized_linear_models.link as link
+from generalized_linear_models import link_kernels
+from generalized_linear_models.link import CDFLink, Probit, Cauchy
+
+P = np.linspace(0.01, 0.99, 99)
+Z = np.linspace(-5, 5, 101)
+
+
+def centered_difference(func, x, step=1e-6):
+    return (func(x + step) - func(x - step)) / (2 * step)
+
+
+def test_derivative2_against_finite_differences():
+    for link in [Probit(), Cauchy(), CDFLink(), CDFLink(dbn=scipy.stats.logistic)]:
+        assert_allclose(link.derivative2(P), centered_difference(link.derivative, P), rtol=1e-5, atol=1e-6)
+
+
+def test_inverse_derivative2_against_finite_differences():
+    for link in [Probit(), Cauchy(), CDFLink(), CDFLink(dbn=scipy.stats.logistic)]:
+        assert_allclose(link.inverse_derivative2(Z), centered_difference(link.inverse_derivative, Z),
+                        rtol=1e-5, atol=1e-10)
+
+
+def test_generic_inverse_derivative2_against_closed_form():
+    link = CDFLink(dbn=scipy.stats.logistic)
+    cdf = scipy.stats.logistic.cdf(Z)
+    assert_allclose(link.inverse_derivative2(Z), scipy.stats.logistic.pdf(Z) * (1 - 2 * cdf), rtol=1e-6, atol=1e-12)
+
+
+def test_derivatives2_of_scalars():
+    for link in [Probit(), Cauchy(), CDFLink()]:
+        assert_allclose(link.derivative2(0.3), link.derivative2(np.array([0.3]))[0])
+        assert_allclose(link.inverse_derivative2(0.5), link.inverse_derivative2(np.array([0.5]))[0])
+
+
+def test_fast_paths_match_scipy_stats():
+    p = np.concatenate([P, [1e-12, 1e-6, 1 - 1e-6, 1 - 1e-12]])
+    z = np.linspace(-30, 30, 121)
+    for link, dbn in [(Probit(), scipy.stats.norm), (Cauchy(), scipy.stats.cauchy)]:
+        generic_link = CDFLink(dbn=dbn)
+        assert_allclose(link.link(p), generic_link.link(p), rtol=1e-12, atol=1e-15)
+        assert_allclose(link.inverse(z), generic_link.inverse(z), rtol=1e-12)
+        assert_allclose(link.derivative(P), generic_link.derivative(P), rtol=1e-12)
+        assert_allclose(link.inverse_derivative(z), generic_link.inverse_derivative(z), rtol=1e-12)
+
+
+LINKS = [link.Logit(), link.Power(), link.Power(power=2.), link.InversePower(), link.Sqrt(), link.InverseSquared(),
+         link.Identity(), link.Log(), link.LogC(), CDFLink(), Probit(), Cauchy(), link.CLogLog(), link.LogLog(),
+         link.NegativeBinomial()]
+METHODS = ['link', 'derivative', 'derivative2', 'inverse', 'inverse_derivative', 'inverse_derivative2']
+
+
+def get_inputs(link_instance, method):
+    if method.startswith('inverse'):
+        if isinstance(link_instance, link.NegativeBinomial):
+            return np.linspace(-5, -0.1, 50)
+        if isinstance(link_instance, link.Power):
+            return np.linspace(0.1, 5, 50)
+        return np.linspace(-5, 5, 50)
+    if isinstance(link_instance, link.Logit) or isinstance(link_instance, link.LogC):
+        return np.linspace(0.01, 0.99, 50)
+    return np.linspace(0.1, 5, 50)
+
+
+def test_out_buffers_match_returned_arrays():
+    for link_instance in LINKS:
+        for method in METHODS:
+            values = get_inputs(link_instance, method)
+            expected = getattr(link_instance, method)(values.copy())
+            out = np.empty_like(values)
+            assert getattr(link_instance, method)(values, out=out) is out
+            assert_allclose(out, expected, rtol=1e-12)
+            # computing in place of the input
+            in_place = values.copy()
+            getattr(link_instance, method)(in_place, out=in_place)
+            assert_allclose(in_place, expected, rtol=1e-12)
+
+
+def test_scalar_and_float32_inputs():
+    for link_instance in LINKS:
+        for method in METHODS:
+            values = get_inputs(link_instance, method)
+            expected = getattr(link_instance, method)(values)
+            assert np.ndim(getattr(link_instance, method)(values[1])) == 0
+            assert_allclose(getattr(link_instance, method)(values[1]), expected[1], rtol=1e-12)
+            result = getattr(link_instance, method)(values.astype(np.float32))
+            if not isinstance(link_instance, CDFLink) or isinstance(link_instance, (Probit, Cauchy)):
+                assert result.dtype == np.float32
+            assert_allclose(result, expected, rtol=1e-4, atol=1e-6)
+
+
+def get_peak_allocation(func):
+    # separate tracing sessions, tracemalloc.reset_peak needs Python 3.9
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def test_out_buffers_lower_peak_allocations(monkeypatch):
+    # the compiled kernels allocate no temporaries
+    monkeypatch.setattr(link_kernels, 'ENABLED', False)
+    z = np.linspace(-5, 5, 100000)
+    out = np.empty_like(z)
+    for link_instance in [link.Logit(), link.CLogLog(), link.NegativeBinomial(), Cauchy()]:
+        for method in ['inverse', 'inverse_derivative']:
+            values = -np.abs(z) - 0.1 if isinstance(link_instance, link.NegativeBinomial) else z
+            func = getattr(link_instance, method)
+            allocating_peak = get_peak_allocation(lambda: func(values))
+            out_peak = get_peak_allocation(lambda: func(values, out=out))
+            # at most one temporary array besides the result, none with out
+            assert out_peak < allocating_peak <= 2 * z.nbytes + 4096
+            assert out_peak <= z.nbytes + 4096
+
+
+def test_inverse_and_derivative_match_separate_methods():
+    for link_instance in LINKS + [link.Sqrt()]:
+        values = get_inputs(link_instance, 'inverse')
+        mu, mu_derivative = link_instance.inverse_and_derivative(values)
+        assert_allclose(mu, link_instance.inverse(values), rtol=1e-12)
+        assert_allclose(mu_derivative, link_instance.inverse_derivative(values), rtol=1e-12)
+        out, derivative_out = np.empty_like(values), np.empty_like(values)
+        results = link_instance.inverse_and_derivative(values, out=out, derivative_out=derivative_out)
+        assert results[0] is out
+        assert results[1] is derivative_out
+        assert_allclose(out, mu, rtol=1e-12)
+        assert_allclose(derivative_out, mu_derivative, rtol=1e-12)
+
+
+def test_inverse_and_derivative_tails():
+    z = np.array([-800., -709.5, 0., 3., 20.])
+    for link_instance in [link.CLogLog(), link.LogLog()]:
+        with np.errstate(over='ignore'):
+            mu, mu_derivative = link_instance.inverse_and_derivative(z)
+            assert_allclose(mu, link_instance.inverse(z))
+            assert_allclose(mu_derivative, link_instance.inverse_derivative(z), rtol=1e-12)
+
+
+POWER_METHODS = ['link', 'inverse', 'derivative', 'inverse_derivative']
+COMPILED_METHODS = ([(link.InversePower(), method) for method in POWER_METHODS]
+                    + [(link.InverseSquared(), method) for method in POWER_METHODS]
+                    + [(link.Power(power=-1), 'link'), (Cauchy(), 'inverse_derivative'),
+                       (link.NegativeBinomial(), 'derivative'), (link.NegativeBinomial(alpha=0.5), 'derivative')])
+
+
+def get_large_inputs(link_instance, method, dtype=np.float64):
+    size = link_kernels.MIN_SIZE + 1
+    values = get_inputs(link_instance, method)
+    return np.interp(np.linspace(0, 1, size), np.linspace(0, 1, len(values)), values).astype(dtype)
+
+
+def compute_with_numpy(link_instance, method, values, monkeypatch):
+    with monkeypatch.context() as patch:
+        patch.setattr(link_kernels, 'ENABLED', False)
+        return getattr(link_instance, method)(values)
+
+
+@pytest.mark.skipif(not link_kernels.ENABLED, reason='numba is not installed')
+def test_compiled_kernels_match_numpy(monkeypatch):
+    for link_instance, method in COMPILED_METHODS:
+        values = get_large_inputs(link_instance, method)
+        expected = compute_with_numpy(link_instance, method, values, monkeypatch)
+        assert_allclose(getattr(link_instance, method)(values), expected, rtol=1e-12)
+        out = np.empty_like(values)
+        assert getattr(link_instance, method)(values, out=out) is out
+        assert_allclose(out, expected, rtol=1e-12)
+        float32_result = getattr(link_instance, method)(values.astype(np.float32))
+        assert float32_result.dtype == np.float32
+        assert_allclose(float32_result, expected, rtol=1e-5)
+    for link_instance in [link.InversePower(), link.InverseSquared()]:
+        values = get_large_inputs(link_instance, 'inverse')
+        separate_values = [link_instance.inverse(values), link_instance.inverse_derivative(values)]
+        for compiled_value, separate_value in zip(link_instance.inverse_and_derivative(values), separate_values):
+            assert_allclose(compiled_value, separate_value, rtol=1e-12)
+
+
+def test_numpy_fallback(monkeypatch):
+    monkeypatch.setattr(link_kernels, 'ENABLED', False)
+    assert link_kernels.run_kernel('inverse_power_link', np.ones(link_kernels.MIN_SIZE), []) is None
+    values = get_large_inputs(link.InverseSquared(), 'inverse')
+    assert_allclose(link.InverseSquared().inverse(values), values ** -0.5, rtol=1e-12)
+
+
+def test_links_without_kernels():
+    assert link_kernels.run_kernel('inverse_power_link', np.ones(link_kernels.MIN_SIZE - 1), []) is None
+    assert link_kernels.run_kernel('cauchy_inverse', np.ones(link_kernels.MIN_SIZE), []) is None
+    values = get_large_inputs(link.Power(power=2.), 'link')
+    assert_allclose(link.Power(power=2.).link(values), values ** 2, rtol=1e-12)
+
+
+@pytest.mark.skipif(not link_kernels.ENABLED, reason='numba is not installed')
+def test_compiled_kernels_in_blocks(monkeypatch):
+    monkeypatch.setattr(link_kernels, 'N_THREADS', 4)
+    values = np.linspace(0.1, 5, 6 * link_kernels.MIN_SIZE + 3)
+    assert_allclose(link.InverseSquared().inverse(values), values ** -0.5, rtol=1e-12)
+    assert_allclose(link.InverseSquared().inverse(values.reshape(-1, 3)), values.reshape(-1, 3) ** -0.5,
+                    rtol=1e-12)
+
+
+def test_numba_imported_lazily():
+    # importing the links does not import Numba before a kernel is compiled
+    code = 'import sys, generalized_linear_models.link; assert "numba" not in sys.modules'
+    subprocess.run([sys.executable, '-c', code], check=True)
@@ -0,0 +1,59 @@
+import numpy as np
+import statsmodels.api as sm
+from numpy.testing import assert_almost_equal
+from scipy import sparse
+from generalized_linear_models.dku_glm import RegressionGLM
+from glm_summary.metrics import compute_glm_metrics
+
+
+def fit_scotland(**params):
+    data = sm.datasets.scotland.load()
+    X = data.exog.to_numpy()
+    y = data.endog.to_numpy()
+    regression_model = RegressionGLM(penalty=0.0, l1_ratio=1, offset_mode='BASIC', column_labels=data.exog_name,
+                                     **params)
+    regression_model.fit(X, y)
+    return regression_model, X, y
+
+
+def test_metrics_match_glum():
+    for params in [{'family_name': 'gamma', 'gamma_link': 'inverse_power'},
+                   {'family_name': 'gaussian', 'gaussian_link': 'identity'},
+                   {'family_name': 'poisson', 'poisson_link': 'log'}]:
+        regression_model, X, y = fit_scotland(**params)
+        fitted_model = regression_model.fitted_model
+        family = regression_model.family_glum_class
+        predictions = fitted_model.predict(X)
+        metrics = compute_glm_metrics(regression_model, X, y, chunk_size=7)
+
+        assert_almost_equal(metrics['bic'], fitted_model.bic(X, y), decimal=8)
+        assert_almost_equal(metrics['aic'], fitted_model.aic(X, y), decimal=8)
+        assert_almost_equal(metrics['deviance'], family.deviance(y, predictions), decimal=8)
+        assert_almost_equal(metrics['dispersion'], family.dispersion(y, predictions), decimal=8)
+        assert_almost_equal(metrics['log_likelihood'], family.log_likelihood(y, predictions), decimal=8)
+        assert_almost_equal(metrics['null_deviance'], family.deviance(y, np.full(len(y), y.mean())), decimal=8)
+        assert metrics['n_observations'] == len(y)
+
+
+def test_metrics_offsets_and_weights():
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.normal(size=500), rng.uniform(1, 2, size=500)])
+    y = rng.poisson(X[:, 1] * np.exp(0.3 * X[:, 0])).astype(np.float64)
+    sample_weight = rng.uniform(0.5, 2, size=500)
+    regression_model = RegressionGLM(penalty=0.0, l1_ratio=0, family_name='poisson', poisson_link='log',
+                                     offset_mode='OFFSETS/EXPOSURES', exposure_columns=['exposure'],
+                                     column_labels=['x', 'exposure'])
+    regression_model.fit(X, y, sample_weight=sample_weight)
+    family = regression_model.family_glum_class
+    predictions = regression_model.predict(X)
+
+    metrics = compute_glm_metrics(regression_model, X, y, sample_weight=sample_weight, chunk_size=64)
+    log_likelihood = family.log_likelihood(y, predictions, sample_weight=sample_weight)
+    assert_almost_equal(metrics['log_likelihood'], log_likelihood, decimal=8)
+    assert_almost_equal(metrics['aic'], -2 * log_likelihood + 2 * 2, decimal=8)
+    assert_almost_equal(metrics['bic'], -2 * log_likelihood + np.log(500) * 2, decimal=8)
+    assert_almost_equal(metrics['deviance'], family.deviance(y, predictions, sample_weight=sample_weight), decimal=8)
+
+    sparse_metrics = compute_glm_metrics(regression_model, sparse.csc_matrix(X), y, sample_weight=sample_weight)
+    for name in metrics:
+        assert_almost_equal(sparse_metrics[name], metrics[name], decimal=8)
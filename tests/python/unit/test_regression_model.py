@@ -3,7 +3,13 @@ import statsmodels.api as sm
 from testing_utils import testing_dict
 import generalized_linear_models.link as link
 from glum import GammaDistribution
+import numpy as np
 from numpy.testing import assert_almost_equal
+from scipy import sparse
+import multiprocessing
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from generalized_linear_models import link_kernels, parallel
 
 
 def test_link_function():
@@ -232,3 +238,234 @@ def test_regression_prediction():
 
     for act, exp in zip(actual_predictions, expected_predictions):
         assert_almost_equal(act, exp, decimal=8)
+
+def test_regression_sparse():
+    data = sm.datasets.scotland.load()
+    X = data.exog.to_numpy()
+    y = data.endog.to_numpy()
+
+    models = []
+    for X_input in [X, sparse.csr_matrix(X)]:
+        regression_model = RegressionGLM(
+            penalty=0.0,
+            offset_mode='OFFSETS/EXPOSURES',
+            family_name='poisson',
+            binomial_link=None,
+            gamma_link=None,
+            gaussian_link=None,
+            inverse_gaussian_link=None,
+            poisson_link='log',
+            negative_binomial_link=None,
+            tweedie_link=None,
+            alpha=1,
+            l1_ratio=1,
+            power=1,
+            var_power=1,
+            offset_columns=['UNEMPF'],
+            exposure_columns=['COUTAX'])
+        regression_model.column_labels = data.exog_name
+        regression_model.fit(X_input, y)
+        models.append(regression_model)
+
+    dense_model, sparse_model = models
+    assert_almost_equal(sparse_model.intercept_, dense_model.intercept_, decimal=8)
+    assert_almost_equal(sparse_model.coef_, dense_model.coef_, decimal=8)
+    assert_almost_equal(sparse_model.predict(sparse.csr_matrix(X)), dense_model.predict(X), decimal=8)
+
+def test_regression_column_plan():
+    data = sm.datasets.scotland.load()
+    X = data.exog.to_numpy()
+    y = data.endog.to_numpy()
+
+    regression_model = RegressionGLM(
+        penalty=0.0,
+        offset_mode='OFFSETS/EXPOSURES',
+        family_name='poisson',
+        binomial_link=None,
+        gamma_link=None,
+        gaussian_link=None,
+        inverse_gaussian_link=None,
+        poisson_link='log',
+        negative_binomial_link=None,
+        tweedie_link=None,
+        alpha=1,
+        l1_ratio=1,
+        power=1,
+        var_power=1,
+        offset_columns=['UNEMPF'],
+        exposure_columns=['COUTAX'])
+    regression_model.column_labels = data.exog_name
+
+    regression_model.fit(X, y)
+    column_plan = regression_model.column_plan
+    assert column_plan.offset_indices.tolist() == [1]
+    assert column_plan.exposure_indices.tolist() == [0]
+    assert column_plan.kept_indices.tolist() == [2, 3, 4, 5, 6]
+    assert not column_plan.kept_indices.flags.writeable
+
+    first_predictions = regression_model.predict(X)
+    for _ in range(3):
+        predictions = regression_model.predict(X)
+    assert_almost_equal(predictions, first_predictions, decimal=12)
+    assert regression_model.removed_indices == [0, 1]
+    assert regression_model.column_plan is column_plan
+
+def test_regression_path():
+    data = sm.datasets.scotland.load()
+    X = data.exog.to_numpy()
+    y = data.endog.to_numpy()
+    penalties = [0.001, 0.1, 0.01, 1.0]
+
+    path_model = RegressionGLM(
+        penalty=0.1,
+        offset_mode='BASIC',
+        family_name='gamma',
+        gamma_link='log',
+        l1_ratio=1,
+        regularization_path=True,
+        penalty_path=penalties)
+    path_model.column_labels = data.exog_name
+    path_model.fit(X, y)
+
+    assert [solution['penalty'] for solution in path_model.path_solutions_] == [1.0, 0.1, 0.01, 0.001]
+    for solution in path_model.path_solutions_:
+        cold_model = RegressionGLM(penalty=solution['penalty'], offset_mode='BASIC', family_name='gamma',
+                                   gamma_link='log', l1_ratio=1)
+        cold_model.column_labels = data.exog_name
+        cold_model.fit(X, y)
+        # warm and cold starts stop at different points within the solver tolerance
+        assert_almost_equal(X @ solution['coef'] + solution['intercept'], X @ cold_model.coef_ + cold_model.intercept_,
+                            decimal=2)
+
+    best_solution = min(path_model.path_solutions_, key=lambda solution: solution['bic'])
+    assert_almost_equal(path_model.coef_, best_solution['coef'], decimal=12)
+
+
+def test_regression_path_parallel():
+    data = sm.datasets.scotland.load()
+    X = data.exog.to_numpy()
+    y = data.endog.to_numpy()
+    penalties = [0.001, 0.1, 0.01, 1.0]
+
+    def fit_path(X, n_jobs):
+        model = RegressionGLM(penalty=0.1, offset_mode='BASIC', family_name='gamma', gamma_link='log',
+                              l1_ratio=[0.5, 1], regularization_path=True, penalty_path=penalties, n_jobs=n_jobs)
+        model.column_labels = data.exog_name
+        model.fit(X, y)
+        return model
+
+    serial_model = fit_path(X, n_jobs=1)
+    for parallel_model in [fit_path(X, n_jobs=4), fit_path(sparse.csr_matrix(X), n_jobs=4)]:
+        assert ([(solution['l1_ratio'], solution['penalty']) for solution in parallel_model.path_solutions_] ==
+                [(solution['l1_ratio'], solution['penalty']) for solution in serial_model.path_solutions_])
+        for parallel_solution, serial_solution in zip(parallel_model.path_solutions_, serial_model.path_solutions_):
+            # the segments of the parallel path start from a coarse path instead of the previous penalty
+            assert_almost_equal(X @ parallel_solution['coef'] + parallel_solution['intercept'],
+                                X @ serial_solution['coef'] + serial_solution['intercept'], decimal=3)
+
+
+def get_link_kernel_threads(_):
+    return link_kernels.N_THREADS
+
+
+def test_regression_path_parallel_link_kernels(monkeypatch):
+    # large enough for the inverse power link to run its compiled kernels in the workers
+    rng = np.random.default_rng(0)
+    n_rows = link_kernels.MIN_SIZE + 1000
+    X = rng.uniform(0, 1, size=(n_rows, 3))
+    y = rng.gamma(2., (1 / (1 + X @ np.array([0.5, -0.2, 0.3]))) / 2.)
+    penalties = [0.1, 0.01, 0.001, 0.0001]
+    monkeypatch.setattr(link_kernels, 'N_THREADS', 8)
+
+    def fit_path(n_jobs):
+        model = RegressionGLM(penalty=0.1, offset_mode='BASIC', family_name='gamma', gamma_link='inverse_power',
+                              l1_ratio=[0.5], regularization_path=True, penalty_path=penalties, n_jobs=n_jobs,
+                              blas_threads=2)
+        model.column_labels = ['a', 'b', 'c']
+        model.fit(X, y)
+        return model
+
+    serial_model = fit_path(n_jobs=1)
+    parallel_model = fit_path(n_jobs=2)
+    for parallel_solution, serial_solution in zip(parallel_model.path_solutions_, serial_model.path_solutions_):
+        assert_almost_equal(parallel_solution['coef'], serial_solution['coef'], decimal=3)
+
+    # the workers run the link kernels on their BLAS threads, not on cpu_count threads each
+    with ProcessPoolExecutor(max_workers=2, initializer=parallel.attach_arrays, initargs=({}, 2)) as executor:
+        assert set(executor.map(get_link_kernel_threads, range(4))) == {2}
+    with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context('fork')) as executor:
+        assert set(executor.map(get_link_kernel_threads, range(4))) == {1}
+
+
+def test_regression_compress_rows():
+    rng = np.random.default_rng(0)
+    n_rows = 5000
+    X = np.column_stack([rng.integers(0, 2, n_rows), rng.integers(0, 2, n_rows), rng.integers(0, 4, n_rows),
+                         rng.choice([0.5, 1.0], n_rows)]).astype(float)
+    y = rng.poisson(np.exp(X[:, :3] @ np.array([0.3, -0.2, 0.1])) * X[:, 3])
+    sample_weight = rng.uniform(0.5, 1.5, n_rows)
+    column_labels = ['a', 'b', 'c', 'exposure']
+
+    def fit(compress_rows, **params):
+        model = RegressionGLM(family_name='poisson', poisson_link='log', offset_mode='OFFSETS/EXPOSURES',
+                              exposure_columns=['exposure'], column_labels=column_labels,
+                              compress_rows=compress_rows, **params)
+        model.fit(X, y, sample_weight=sample_weight)
+        return model
+
+    for params in [{'penalty': 0.0, 'l1_ratio': 0}, {'penalty': 0.001, 'l1_ratio': 0.5},
+                   {'penalty': 0.1, 'l1_ratio': 0.5, 'regularization_path': True, 'penalty_path': [0.1, 0.01, 0.001]}]:
+        compressed_model = fit(True, **params)
+        uncompressed_model = fit(False, **params)
+        assert_almost_equal(compressed_model.coef_, uncompressed_model.coef_, decimal=5)
+        assert_almost_equal(compressed_model.intercept_, uncompressed_model.intercept_, decimal=5)
+
+    compressed_X, compressed_y, compressed_weight, compressed_offset = uncompressed_model.compress_duplicate_rows(
+        X[:, :3], y, sample_weight, np.log(X[:, 3]))
+    assert compressed_X.shape[0] == 32
+    assert_almost_equal(compressed_weight.sum(), sample_weight.sum(), decimal=8)
+    assert_almost_equal(compressed_weight @ compressed_y, sample_weight @ y, decimal=8)
+
+
+def test_regression_float32():
+    data = sm.datasets.scotland.load()
+    X = data.exog.to_numpy()
+    y = data.endog.to_numpy()
+
+    def fit(dtype):
+        model = RegressionGLM(penalty=0.001, l1_ratio=0.5, family_name='gamma', gamma_link='log',
+                              offset_mode='OFFSETS/EXPOSURES', offset_columns=['UNEMPF'],
+                              exposure_columns=['COUTAX'], dtype=dtype)
+        model.column_labels = data.exog_name
+        model.fit(X, y)
+        return model
+
+    float32_model = fit('float32')
+    float64_model = fit('float64')
+    # float32 coefficients are documented to stay within 1e-3 of the float64 fit
+    assert_almost_equal(float32_model.coef_, float64_model.coef_, decimal=3)
+    np.testing.assert_allclose(float32_model.intercept_, float64_model.intercept_, rtol=1e-3)
+    predictions = float32_model.predict(X)
+    assert predictions.dtype == np.float32
+    # the features of this dataset reach the thousands, which amplifies the coefficient differences
+    np.testing.assert_allclose(predictions, float64_model.predict(X), rtol=5e-3)
+
+
+def test_regression_float32_scoring_memory():
+    rng = np.random.default_rng(0)
+    n_rows = 500000
+    X = np.column_stack([rng.uniform(size=(n_rows, 8)), rng.uniform(0.5, 2, n_rows)])
+    y = rng.poisson(np.exp(X[:, :8] @ rng.normal(scale=0.1, size=8)) * X[:, 8])
+    model = RegressionGLM(penalty=0.0, l1_ratio=0, family_name='poisson', poisson_link='log',
+                          offset_mode='OFFSETS/EXPOSURES', exposure_columns=['exposure'], dtype='float32')
+    model.column_labels = ['x' + str(i) for i in range(8)] + ['exposure']
+    model.fit(X[:1000], y[:1000])
+
+    tracemalloc.start()
+    predictions = model.predict(X)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert predictions.dtype == np.float32
+    # the float64 input is cast one chunk of rows at a time
+    assert peak < X.nbytes / 4
+    np.testing.assert_allclose(predictions[:1000], model.predict(X[:1000]), rtol=1e-6)
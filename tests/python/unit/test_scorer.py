@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+import statsmodels.api as sm
+from generalized_linear_models.dku_glm import RegressionGLM, BinaryClassificationGLM
+from generalized_linear_models.scorer import GLMScorer
+from numpy.testing import assert_allclose
+from scipy import sparse
+
+
+def fit_scotland_model(family_name, **links):
+    data = sm.datasets.scotland.load()
+    X = data.exog.to_numpy()
+    y = data.endog.to_numpy()
+    regression_model = RegressionGLM(
+        penalty=0.0,
+        offset_mode='OFFSETS',
+        family_name=family_name,
+        l1_ratio=1,
+        offset_columns=['UNEMPF'],
+        **links)
+    regression_model.column_labels = data.exog_name
+    regression_model.fit(X, y)
+    return regression_model, X
+
+
+def glum_predictions(model, X):
+    offsets, exposures = model.get_offsets_and_exposures(X)
+    offset = model.compute_aggregate_offset(offsets, exposures)
+    return model.fitted_model.predict(model.process_fixed_columns(X), offset=offset)
+
+
+def test_scorer_matches_glum_regression():
+    for family_name, links in [('gaussian', {'gaussian_link': 'identity'}),
+                               ('gamma', {'gamma_link': 'log'}),
+                               ('gamma', {'gamma_link': 'inverse_power'}),
+                               ('poisson', {'poisson_link': 'log'})]:
+        regression_model, X = fit_scotland_model(family_name, **links)
+        assert_allclose(regression_model.predict(X), glum_predictions(regression_model, X), rtol=1e-12)
+        assert_allclose(regression_model.predict(sparse.csr_matrix(X)), glum_predictions(regression_model, X),
+                        rtol=1e-12)
+
+
+def test_scorer_matches_glum_classification():
+    data = sm.datasets.ccard.load()
+    X = data.exog.to_numpy()[:, :3]
+    y = data.exog.to_numpy()[:, 3]
+    for binomial_link in ['logit', 'cloglog']:
+        binary_model = BinaryClassificationGLM(penalty=0.0, family_name='binomial', binomial_link=binomial_link,
+                                               l1_ratio=1)
+        binary_model.column_labels = data.exog_name
+        binary_model.fit(X, y)
+        probas = binary_model.predict_proba(X)
+        assert_allclose(probas[:, 1], binary_model.fitted_model.predict(X), rtol=1e-12)
+
+
+def test_scorer_chunks():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1000, 5))
+    coef = rng.normal(size=5)
+    offset = rng.normal(size=1000)
+    expected = np.exp(X @ coef + 0.5 + offset)
+    scorer = GLMScorer(coef, 0.5, 'log', chunk_size=7)
+    assert_allclose(scorer.predict(X, offset), expected, rtol=1e-12)
+
+
+def test_small_batch_scorer():
+    data = sm.datasets.scotland.load()
+    X = data.exog.to_numpy()
+    y = data.endog.to_numpy()
+    regression_model = RegressionGLM(
+        penalty=0.0,
+        offset_mode='OFFSETS/EXPOSURES',
+        family_name='poisson',
+        poisson_link='log',
+        l1_ratio=1,
+        offset_columns=['UNEMPF'],
+        exposure_columns=['COUTAX'])
+    regression_model.column_labels = data.exog_name
+    regression_model.fit(X, y)
+
+    expected = glum_predictions(regression_model, X)
+    for n_rows in [1, 8, 32]:
+        assert_allclose(regression_model.predict(X[:n_rows]), expected[:n_rows], rtol=1e-12)
+    assert_allclose(regression_model.predict(X[3:4]), expected[3:4], rtol=1e-12)
+
+    X_negative_exposure = X[:1].copy()
+    X_negative_exposure[0, 0] = -1
+    with pytest.raises(ValueError):
+        regression_model.predict(X_negative_exposure)
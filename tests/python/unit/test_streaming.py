@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+import statsmodels.api as sm
+from generalized_linear_models.dku_glm import RegressionGLM, BinaryClassificationGLM
+from generalized_linear_models.streaming import StreamingIRLS
+from numpy.testing import assert_allclose
+from scipy import sparse
+from sklearn.exceptions import ConvergenceWarning
+
+
+def get_chunks_function(X, y, chunk_size, sample_weight=None):
+    def get_chunks():
+        for start in range(0, X.shape[0], chunk_size):
+            weights = None if sample_weight is None else sample_weight[start:start + chunk_size]
+            yield X[start:start + chunk_size], y[start:start + chunk_size], weights
+    return get_chunks
+
+
+def test_streaming_matches_in_memory_fit():
+    data = sm.datasets.scotland.load()
+    X = data.exog.to_numpy()
+    y = data.endog.to_numpy()
+    sample_weight = np.linspace(0.5, 2, len(y))
+    for family_name, links, penalty in [('gaussian', {'gaussian_link': 'identity'}, 0.0),
+                                        ('gamma', {'gamma_link': 'log'}, 0.0),
+                                        ('gamma', {'gamma_link': 'log'}, 0.01),
+                                        ('poisson', {'poisson_link': 'log'}, 0.0)]:
+        def build_model():
+            model = RegressionGLM(penalty=penalty, offset_mode='OFFSETS/EXPOSURES', family_name=family_name,
+                                  l1_ratio=0, offset_columns=['UNEMPF'], exposure_columns=['COUTAX'], **links)
+            model.column_labels = data.exog_name
+            return model
+
+        in_memory_model = build_model()
+        in_memory_model.fit(X, y, sample_weight=sample_weight)
+        streaming_model = StreamingIRLS(build_model(), tol=1e-12).fit(
+            get_chunks_function(X, y, 7, sample_weight), X.shape[1])
+
+        assert streaming_model.fitted_model.converged_
+        assert_allclose(streaming_model.coef_, in_memory_model.coef_, rtol=1e-4, atol=1e-6)
+        assert_allclose(streaming_model.predict(X), in_memory_model.predict(X), rtol=1e-4)
+
+
+def test_streaming_custom_links():
+    data = sm.datasets.scotland.load()
+    X = data.exog.to_numpy()
+    y = data.endog.to_numpy()
+    for family_name, links in [('gamma', {'gamma_link': 'inverse_power'}),
+                               ('gamma', {'gamma_link': 'inverse_squared'}),
+                               ('negative_binomial', {'negative_binomial_link': 'negative_binomial'})]:
+        def build_model():
+            model = RegressionGLM(penalty=0.0, offset_mode='BASIC', family_name=family_name, l1_ratio=0, **links)
+            model.column_labels = data.exog_name
+            return model
+
+        in_memory_model = build_model()
+        in_memory_model.fit(X, y)
+        streaming_model = StreamingIRLS(build_model(), tol=1e-12).fit(get_chunks_function(X, y, 7), X.shape[1])
+
+        assert streaming_model.fitted_model.converged_
+        assert_allclose(streaming_model.predict(X), in_memory_model.predict(X), rtol=1e-6)
+
+
+def test_streaming_step_halving():
+    # the full first step of these links leaves the domain of the gamma family
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 2, size=(2000, 1))
+    y = rng.gamma(2., np.exp(2 * X[:, 0]) / 2.)
+    for gamma_link in ['inverse_power', 'inverse_squared']:
+        def build_model():
+            model = RegressionGLM(penalty=0.0, offset_mode='BASIC', family_name='gamma', gamma_link=gamma_link,
+                                  l1_ratio=0)
+            model.column_labels = ['x']
+            return model
+
+        in_memory_model = build_model()
+        with np.errstate(invalid='ignore'):
+            in_memory_model.fit(X, y)
+        streaming_model = StreamingIRLS(build_model(), tol=1e-12).fit(get_chunks_function(X, y, 500), X.shape[1])
+
+        assert streaming_model.fitted_model.converged_
+        assert np.isfinite(streaming_model.fitted_model.deviance_)
+        assert_allclose(streaming_model.predict(X), in_memory_model.predict(X), rtol=1e-4)
+
+
+def test_streaming_warns_when_not_converged():
+    data = sm.datasets.scotland.load()
+    X = data.exog.to_numpy()
+    y = data.endog.to_numpy()
+    model = RegressionGLM(penalty=0.0, offset_mode='BASIC', family_name='gamma', gamma_link='log', l1_ratio=0)
+    model.column_labels = data.exog_name
+    with pytest.warns(ConvergenceWarning):
+        model = StreamingIRLS(model, max_iter=1).fit(get_chunks_function(X, y, 7), X.shape[1])
+    assert not model.fitted_model.converged_
+
+
+def test_streaming_sparse_classification():
+    data = sm.datasets.ccard.load()
+    X = data.exog.to_numpy()[:, :3]
+    y = data.exog.to_numpy()[:, 3]
+    streaming_model = BinaryClassificationGLM(penalty=0.0, family_name='binomial', binomial_link='logit', l1_ratio=0)
+    streaming_model.column_labels = data.exog_name
+    StreamingIRLS(streaming_model, tol=1e-12).fit(get_chunks_function(sparse.csr_matrix(X), y, 10), X.shape[1],
+                                                   prediction_is_classification=True)
+
+    # glum stops at its gradient tolerance, statsmodels iterates to the exact maximum likelihood
+    statsmodels_results = sm.GLM(y, sm.add_constant(X), family=sm.families.Binomial()).fit()
+    assert_allclose(streaming_model.intercept_[0], statsmodels_results.params[0], rtol=1e-6)
+    assert_allclose(streaming_model.coef_[0], statsmodels_results.params[1:], rtol=1e-6)
+    assert_allclose(streaming_model.predict_proba(X)[:, 1], statsmodels_results.predict(sm.add_constant(X)),
+                    rtol=1e-6)
+
+def test_streaming_rejects_lasso():
+    model = RegressionGLM(penalty=0.1, family_name='gaussian', gaussian_link='identity', l1_ratio=0.5)
+    with pytest.raises(ValueError):
+        StreamingIRLS(model)
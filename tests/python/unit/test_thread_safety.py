@@ -0,0 +1,64 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import statsmodels.api as sm
+from generalized_linear_models.dku_glm import RegressionGLM, BinaryClassificationGLM
+from numpy.testing import assert_almost_equal
+
+
+def hammer(score, batches, n_threads=8, n_rounds=20):
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        futures = [executor.submit(score, batch) for _ in range(n_rounds) for batch in batches]
+        return [future.result() for future in futures]
+
+
+def test_concurrent_regression_scoring():
+    data = sm.datasets.scotland.load()
+    X = data.exog.to_numpy()
+    y = data.endog.to_numpy()
+
+    regression_model = RegressionGLM(
+        penalty=0.0,
+        offset_mode='OFFSETS/EXPOSURES',
+        family_name='poisson',
+        poisson_link='log',
+        l1_ratio=1,
+        offset_columns=['UNEMPF'],
+        exposure_columns=['COUTAX'])
+    regression_model.column_labels = data.exog_name
+    regression_model.fit(X, y)
+
+    batches = [X[i:i + 4] for i in range(0, len(X), 4)]
+    expected = [regression_model.predict(batch) for batch in batches]
+    state_before = pickle.dumps(regression_model)
+
+    results = hammer(regression_model.predict, batches)
+
+    assert pickle.dumps(regression_model) == state_before
+    for i, result in enumerate(results):
+        assert_almost_equal(result, expected[i % len(batches)], decimal=12)
+
+
+def test_concurrent_classification_scoring():
+    data = sm.datasets.ccard.load()
+    X = data.exog.to_numpy()[:, :3]
+    y = data.exog.to_numpy()[:, 3]
+
+    binary_model = BinaryClassificationGLM(
+        penalty=0.0,
+        offset_mode='BASIC',
+        family_name='binomial',
+        binomial_link='logit',
+        l1_ratio=1)
+    binary_model.column_labels = data.exog_name
+    binary_model.fit(X, y)
+
+    batches = np.array_split(X, 9)
+    expected = [binary_model.predict_proba(batch) for batch in batches]
+    state_before = pickle.dumps(binary_model)
+
+    results = hammer(binary_model.predict_proba, batches)
+
+    assert pickle.dumps(binary_model) == state_before
+    for i, result in enumerate(results):
+        assert_almost_equal(result, expected[i % len(batches)], decimal=12)
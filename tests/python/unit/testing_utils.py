@@ -1,7 +1,10 @@
 import pandas as pd
+import numpy as np
 from io import StringIO
 from sklearn.linear_model import LinearRegression, LogisticRegression
 from sklearn.preprocessing import OneHotEncoder
+from pandas.api.types import is_numeric_dtype
+from glm_summary.binning import bin_numeric_feature
 
 testing_dict = {
     'test1': {
@@ -219,3 +222,71 @@ class PredictorClassif:
         return pd.DataFrame({'proba_True': proba,
                              'proba_False': 1-proba,
                              'prediction': [str(prob > 0.5) for prob in proba]})
+
+
+class GLMPreprocessing:
+    """
+    numerical features kept as is and categorical features dummy
+    encoded with the first category dropped, labelled like DSS does
+    """
+    def __init__(self, df, numerical_features, categorical_features):
+        self.numerical_features = numerical_features
+        self.categories = {feature: sorted(df[feature].unique())[1:] for feature in categorical_features}
+        self.column_labels = numerical_features + ['dummy:' + feature + ':' + str(value)
+                                                   for feature, values in self.categories.items()
+                                                   for value in values]
+
+    def preprocess(self, df):
+        columns = [df[feature].astype(float).to_numpy() for feature in self.numerical_features]
+        columns += [(df[feature] == value).astype(float).to_numpy() for feature, values in self.categories.items()
+                    for value in values]
+        return np.column_stack(columns), df.index
+
+
+class GLMPredictor:
+    def __init__(self, clf, numerical_features, categorical_features, target):
+        self._clf = clf
+        self.numerical_features = numerical_features
+        self.categorical_features = categorical_features
+        self.target = target
+        self.preprocessing = None
+
+    def fit(self, df):
+        self.preprocessing = GLMPreprocessing(df, self.numerical_features, self.categorical_features)
+        self._clf.column_labels = self.preprocessing.column_labels
+        self._clf.fit(self.preprocessing.preprocess(df)[0], df[self.target].to_numpy())
+
+    def predict(self, df):
+        return pd.DataFrame({'prediction': self._clf.predict(self.preprocessing.preprocess(df)[0])}, index=df.index)
+
+
+class ScoringPredictor:
+    """
+    hides the GLM of a predictor so that it can only be scored
+    """
+    def __init__(self, predictor):
+        self.predict = predictor.predict
+
+
+def groupby_ave_grouped(ave_data, target, weight=None):
+    """
+    get_ave_grouped before the bincount aggregation, with one groupby per feature,
+    the reference of the unit tests and of the benchmark
+    """
+    ave_data['weight'] = 1 if weight is None else ave_data[weight]
+    ave_data['weighted_target'] = ave_data[target] * ave_data['weight']
+    ave_data['weighted_prediction'] = ave_data['prediction'] * ave_data['weight']
+    excluded_columns = [target, 'prediction', 'weight', 'weighted_target', 'weighted_prediction'] + [
+        feature for feature in ave_data if feature[:5] == 'base_']
+    feature_names = [feature for feature in ave_data.columns if feature not in excluded_columns]
+    for feature in feature_names:
+        ave_data['base_' + feature] = ave_data['base_' + feature] * ave_data['weight']
+        if is_numeric_dtype(ave_data[feature].dtype):
+            ave_data[feature] = bin_numeric_feature(ave_data[feature])
+    ave_grouped = {feature: ave_data.rename(columns={'base_' + feature: 'weighted_base'}).groupby([feature]).agg(
+        {'weighted_target': 'sum', 'weighted_prediction': 'sum', 'weight': 'sum', 'weighted_base': 'sum'}).reset_index()
+        for feature in feature_names}
+    for feature in ave_grouped:
+        for column in ['weighted_target', 'weighted_prediction', 'weighted_base']:
+            ave_grouped[feature][column] = ave_grouped[feature][column] / ave_grouped[feature]['weight']
+    return ave_grouped
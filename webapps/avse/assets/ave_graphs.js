@@ -0,0 +1,81 @@
+// Builds the Actual vs Expected graphs in the browser, from the tables
+// encoded once by glm_summary.figures.encode_ave_tables, when the webapp
+// is configured to render on the client side.
+(function () {
+    var PALETTE = ['#D5D9D9', '#3075AE', '#ff7e0b'];
+
+    function decode(encoded, ArrayType) {
+        var binary = window.atob(encoded);
+        var bytes = new Uint8Array(binary.length);
+        for (var i = 0; i < binary.length; i++) {
+            bytes[i] = binary.charCodeAt(i);
+        }
+        return Array.from(new ArrayType(bytes.buffer));
+    }
+
+    function getColumns(data, feature) {
+        if (!data || !feature || !(feature in data.tables)) {
+            throw window.dash_clientside.PreventUpdate;
+        }
+        var table = data.tables[feature];
+        return {
+            x: table.numeric ? decode(table.x, Float64Array) : table.x,
+            weight: decode(table.weight, Float32Array),
+            weighted_target: decode(table.weighted_target, Float32Array),
+            weighted_prediction: decode(table.weighted_prediction, Float32Array),
+            weighted_base: decode(table.weighted_base, Float32Array)
+        };
+    }
+
+    // same layout as glm_summary.figures.build_figure
+    function buildFigure(columns, feature, target, lines) {
+        var traces = [{
+            type: 'bar', x: columns.x, y: columns.weight, name: 'weight',
+            marker: {color: PALETTE[0]}, xaxis: 'x', yaxis: 'y'
+        }];
+        lines.forEach(function (line, i) {
+            traces.push({
+                type: 'scatter', mode: 'lines', x: columns.x, y: line.values, name: line.name,
+                line: {color: PALETTE[i + 1]}, xaxis: 'x', yaxis: 'y2'
+            });
+        });
+        return {
+            data: traces,
+            layout: {
+                plot_bgcolor: 'rgba(0,0,0,0)',
+                margin: {t: 10},
+                xaxis: {anchor: 'y', domain: [0.0, 0.94], title: {text: feature}},
+                yaxis: {anchor: 'x', domain: [0.0, 1.0], gridcolor: '#D7DBDE', title: {text: 'weight'}},
+                yaxis2: {anchor: 'x', overlaying: 'y', side: 'right', title: {text: target}}
+            }
+        };
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        avse: {
+            base_graph: function (feature, data) {
+                var columns = getColumns(data, feature);
+                return buildFigure(columns, feature, data.target, [
+                    {name: 'target', values: columns.weighted_target},
+                    {name: 'base', values: columns.weighted_base}
+                ]);
+            },
+            predicted_graph: function (feature, data) {
+                var columns = getColumns(data, feature);
+                return buildFigure(columns, feature, data.target, [
+                    {name: 'target', values: columns.weighted_target},
+                    {name: 'prediction', values: columns.weighted_prediction}
+                ]);
+            },
+            ratio_graph: function (feature, data) {
+                var columns = getColumns(data, feature);
+                var ratio = columns.weighted_prediction.map(function (prediction, i) {
+                    return prediction / columns.weighted_target[i];
+                });
+                return buildFigure(columns, feature, data.target, [
+                    {name: 'actual/expected', values: ratio}
+                ]);
+            }
+        }
+    });
+})();
@@ -2,26 +2,53 @@ from dataiku.customwebapp import *
 from dash import html
 import dash_bootstrap_components as dbc
 from dash import dcc
-from dash.dependencies import Input, Output
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from dash.dependencies import Input, Output, State, ClientsideFunction
+from dash.exceptions import PreventUpdate
+import dash
 import numpy as np
-from glm_summary.graph_utils import get_ave_grouped
-from glm_summary.dku_utils import get_ave_data, get_original_model_handler
+import dataiku
+from glm_summary.dku_utils import get_ave_data, get_summary_context, get_model_metrics
+from glm_summary.artifact import load_ave_artifact
+from glm_summary.lazy_summary import LazySummary
+from glm_summary.figures import FigureCache, build_feature_figures, encode_ave_tables, DEFAULT_CACHE_SIZE
 from generalized_linear_models.dku_glm import BaseGLM
 from shutil import copytree
 from dataiku.customwebapp import get_webapp_config
 
 webapp_config = get_webapp_config()
-palette = '#D5D9D9', '#3075AE', '#ff7e0b'
-ave_data, target, weight, class_map = get_ave_data(webapp_config)
-ave_grouped = get_ave_grouped(ave_data, target, weight, class_map)
-features = [k for k in ave_grouped.keys()]
+# the model handler, predictor and DataFrames are loaded at most once, when first needed
+context = get_summary_context(webapp_config)
+full_model_id = context.full_model_id
+figure_cache = FigureCache(webapp_config.get("figure_cache_size") or DEFAULT_CACHE_SIZE)
+warm_up_features = webapp_config.get("warm_up_features") or []
+# the graphs are built by assets/ave_graphs.js from tables sent once to the browser
+client_rendering = webapp_config.get("rendering_mode") == "CLIENT"
 
-model_handler = get_original_model_handler(webapp_config)
-predictor = model_handler.get_predictor()
-if not isinstance(predictor._clf, BaseGLM):
-    raise ValueError('GLM Summary is only available for GLMs')
+# the summary precomputed by the GLM Summary Artifact recipe is loaded when available
+artifact = None
+artifact_folder = webapp_config.get("artifact_folder")
+if artifact_folder:
+    artifact = load_ave_artifact(dataiku.Folder(artifact_folder).get_path(), full_model_id)
+    if artifact is None:
+        print("No summary of this model version in the artifact folder, computing it")
+
+
+def load_ave_data():
+    if not isinstance(context.predictor._clf, BaseGLM):
+        raise ValueError('GLM Summary is only available for GLMs')
+    return get_ave_data(context)
+
+
+def compute_metrics():
+    return get_model_metrics(context)
+
+
+# without artifact, the layout is served at once and the summary is computed in the background
+if artifact is not None:
+    summary = LazySummary.from_tables(*artifact)
+else:
+    summary = LazySummary(load_ave_data, compute_metrics, release_data=context.release_data)
+summary.start()
 
 FA = "https://use.fontawesome.com/releases/v5.12.1/css/all.css"
 
@@ -38,21 +65,32 @@ app.config.external_stylesheets = ['dss_style.css', dbc.themes.BOOTSTRAP, FA]
 
 feature_choice = dcc.Dropdown(
     id='feature-choice',
-    options=[{'label': f, 'value': f}
-             for f in features],
-    value=features[0], style={'display': 'inline-block', 'width': '60%'}
+    options=[],
+    placeholder='Loading the features...',
+    value=None, style={'display': 'inline-block', 'width': '60%'}
 )
 
-df = model_handler.get_train_df()[0]
-transformed_X, _, _, valid_y = predictor.preprocessing.preprocess(df, with_target=True,)
-transformed_X = predictor._clf.process_fixed_columns(transformed_X)
-predictions = predictor._clf.fitted_model.predict(transformed_X)
+progress = html.Div([
+    dbc.Progress(id='progress-bar', value=0, striped=True, animated=True),
+    html.P(id='progress-message', className="explanation")
+], id='progress-container')
+
+# polls the background computations until they are done
+progress_interval = dcc.Interval(id='progress-interval', interval=500)
+summary_status = dcc.Store(id='summary-status')
+ready_features = dcc.Store(id='ready-features', data=[])
+ave_tables = dcc.Store(id='ave-tables')
 
 app.layout = dbc.Row([
     dbc.Col([
         dbc.Container(
             [
                 html.H3("Generalized Linear Model Analysis"),
+                progress,
+                progress_interval,
+                summary_status,
+                ready_features,
+                ave_tables,
                 html.Hr(),
                 dbc.Row([
                     dbc.Col([
@@ -62,21 +100,21 @@ app.layout = dbc.Row([
                                 html.Td(["Bayesian Information Criterion (BIC) ",
                                          html.I(className="fa fa-question-circle mr-2",
                                                 title="Criterion for model selection, models with lower BIC are generally preferred")]),
-                                html.Th(f"{np.round(predictor._clf.fitted_model.bic(transformed_X, valid_y), 2):,}",
+                                html.Th("...", id='bic-value',
                                             className="table-metric")
                             ]),
                                 html.Tr([
                                     html.Td(["Akaike Information Criterion (AIC) ",
                                              html.I(className="fa fa-question-circle mr-2",
                                                     title="Criterion for model selection, models with lower AIC are generally preferred")]),
-                                    html.Th(f"{np.round(predictor._clf.fitted_model.aic(transformed_X, valid_y), 2):,}",
+                                    html.Th("...", id='aic-value',
                                             className="table-metric")
                                 ]),
                                 html.Tr([
                                     html.Td(["Deviance ",
                                              html.I(className="fa fa-question-circle mr-2",
                                                     title="Measure of the error, using the likelihood function")]),
-                                    html.Th(f"{np.round(predictor._clf.family_glum_class.deviance(valid_y, predictions), 2):,}",
+                                    html.Th("...", id='deviance-value',
                                             className="table-metric")
                                 ])
                             ],
@@ -158,85 +196,104 @@ app.layout = dbc.Row([
 ])
 
 @app.callback(
-    Output('AvE', 'figure'),
-    Input('feature-choice', 'value')
+    Output('summary-status', 'data'),
+    Output('ready-features', 'data'),
+    Output('progress-interval', 'disabled'),
+    Output('ave-tables', 'data'),
+    Input('progress-interval', 'n_intervals'),
+    Input('feature-choice', 'value'),
+    State('ready-features', 'data'),
+    State('ave-tables', 'data')
 )
-def base_graph(feature):
-    data = ave_grouped[feature].dropna()
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-    fig.add_trace(go.Bar(x=data[feature], y=data['weight'],
-                         name='weight',
-                         marker=dict(color=palette[0])),
-                  secondary_y=False)
-    fig.add_trace(go.Scatter(x=data[feature], y=data['weighted_target'],
-                             mode='lines',
-                             name='target',
-                             line=dict(color=palette[1])),
-                  secondary_y=True)
-    fig.add_trace(go.Scatter(x=data[feature], y=data['weighted_base'],
-                             mode='lines',
-                             name='base',
-                             line=dict(color=palette[2])),
-                  secondary_y=True)
-    fig.update_layout(plot_bgcolor='rgba(0,0,0,0)')
-    fig.layout.yaxis.gridcolor = '#D7DBDE'
-    fig.layout.margin.t = 10
-    fig.update_xaxes(title=feature)
-    fig.update_yaxes(title='weight', secondary_y=False)
-    fig.update_yaxes(title=target, secondary_y=True)
-    return fig
+def poll_summary(n_intervals, feature, ready, tables):
+    summary.request_feature(feature)
+    status = summary.get_status()
+    if status['features'] is not None and not summary.warmed_up:
+        if client_rendering:
+            # every table is sent to the browser
+            summary.warm_up(status['features'])
+        else:
+            # the graphs of the most used features are rendered ahead of their selection
+            summary.warm_up(warm_up_features, get_feature_figures)
+        status = summary.get_status()
+    # the graphs are only redrawn when a feature becomes ready
+    new_ready = status['ready_features'] if status['ready_features'] != ready else dash.no_update
+    new_tables = dash.no_update
+    if client_rendering and tables is None and status['features'] is not None and \
+            len(status['ready_features']) == len(status['features']):
+        new_tables = encode_ave_tables({f: summary.get_feature_ave(f) for f in status['features']}, summary.target)
+    return status, new_ready, status['done'], new_tables
 
 
 @app.callback(
-    Output('predicted_graph', 'figure'),
-    Input('feature-choice', 'value')
+    Output('progress-bar', 'value'),
+    Output('progress-bar', 'label'),
+    Output('progress-message', 'children'),
+    Output('progress-container', 'style'),
+    Input('summary-status', 'data')
 )
-def predicted_graph(feature):
-    data = ave_grouped[feature].dropna()
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-    fig.add_trace(go.Bar(x=data[feature], y=data['weight'],
-                         name='weight',
-                         marker=dict(color=palette[0])),
-                  secondary_y=False)
-    fig.add_trace(go.Scatter(x=data[feature], y=data['weighted_target'],
-                             mode='lines',
-                             name='target',
-                             line=dict(color=palette[1])),
-                  secondary_y=True)
-    fig.add_trace(go.Scatter(x=data[feature], y=data['weighted_prediction'],
-                             mode='lines',
-                             name='prediction',
-                             line=dict(color=palette[2])),
-                  secondary_y=True)
-    fig.update_layout(plot_bgcolor='rgba(0,0,0,0)')
-    fig.layout.yaxis.gridcolor = '#D7DBDE'
-    fig.layout.margin.t = 10
-    fig.update_xaxes(title=feature)
-    fig.update_yaxes(title='weight', secondary_y=False)
-    fig.update_yaxes(title=target, secondary_y=True)
-    return fig
+def show_progress(status):
+    if status is None:
+        raise PreventUpdate
+    if status['error'] is not None:
+        return 100, '', 'The summary could not be computed: ' + status['error'], {'display': 'block'}
+    if status['done']:
+        return 100, '', '', {'display': 'none'}
+    return status['progress'], f"{status['progress']}%", status['running_step'] or '', {'display': 'block'}
 
 
 @app.callback(
-    Output('ratio_graph', 'figure'),
-    Input('feature-choice', 'value')
+    Output('feature-choice', 'options'),
+    Output('feature-choice', 'value'),
+    Input('summary-status', 'data'),
+    State('feature-choice', 'options'),
+    State('feature-choice', 'value')
 )
-def ratio_graph(feature):
-    data = ave_grouped[feature].dropna()
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-    fig.add_trace(go.Bar(x=data[feature], y=data['weight'],
-                         name='weight',
-                         marker=dict(color=palette[0])),
-                  secondary_y=False)
-    fig.add_trace(go.Scatter(x=data[feature], y=data['weighted_prediction'] / data['weighted_target'],
-                             mode='lines',
-                             name='actual/expected',
-                             line=dict(color=palette[1])),
-                  secondary_y=True)
-    fig.update_layout(plot_bgcolor='rgba(0,0,0,0)')
-    fig.layout.yaxis.gridcolor = '#D7DBDE'
-    fig.layout.margin.t = 10
-    fig.update_xaxes(title=feature)
-    fig.update_yaxes(title='weight', secondary_y=False)
-    fig.update_yaxes(title=target, secondary_y=True)
-    return fig
+def show_features(status, options, feature):
+    if status is None or status['features'] is None or len(options) > 0:
+        raise PreventUpdate
+    return [{'label': f, 'value': f} for f in status['features']], feature or status['features'][0]
+
+
+@app.callback(
+    Output('bic-value', 'children'),
+    Output('aic-value', 'children'),
+    Output('deviance-value', 'children'),
+    Input('summary-status', 'data')
+)
+def show_metrics(status):
+    if status is None or status['metrics'] is None:
+        raise PreventUpdate
+    return tuple(f"{np.round(status['metrics'][name], 2):,}" for name in ['bic', 'aic', 'deviance'])
+
+
+def get_feature_figures(feature):
+    """
+    returns the three graphs of a feature, built once for this model version
+    """
+    return figure_cache.get((full_model_id, feature),
+                            lambda: build_feature_figures(summary.get_feature_ave(feature), feature, summary.target))
+
+
+def build_server_graph(graph):
+    def server_graph(feature, ready):
+        if feature not in ready:
+            raise PreventUpdate
+        return get_feature_figures(feature)[graph]
+    return server_graph
+
+
+for graph_id, graph in [('AvE', 'base'), ('predicted_graph', 'predicted'), ('ratio_graph', 'ratio')]:
+    if client_rendering:
+        app.clientside_callback(
+            ClientsideFunction(namespace='avse', function_name=graph + '_graph'),
+            Output(graph_id, 'figure'),
+            Input('feature-choice', 'value'),
+            Input('ave-tables', 'data')
+        )
+    else:
+        app.callback(
+            Output(graph_id, 'figure'),
+            Input('feature-choice', 'value'),
+            Input('ready-features', 'data')
+        )(build_server_graph(graph))